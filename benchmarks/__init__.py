@@ -0,0 +1,13 @@
+# benchmarks/__init__.py - Performance Benchmark Suite
+"""
+Microbenchmarks for the pricing/scoring kernels and artifact I/O
+(micro.py), and end-to-end timings of the pipeline stages on generated or
+saved artifacts (stages.py), measured by harness.py. baseline.py keeps
+per-machine baselines and flags regressions against them.
+
+    python3 -m benchmarks list
+    python3 -m benchmarks run --micro
+    python3 -m benchmarks run --stages --scales 1 10 --out benchmark_results.json
+    python3 -m benchmarks baseline benchmark_results.json
+    python3 -m benchmarks run --compare
+"""
@@ -0,0 +1,197 @@
+# benchmarks/__main__.py - Benchmark CLI
+"""
+    python3 -m benchmarks list
+    python3 -m benchmarks run [--micro | --stages | --only NAME ...] [--sizes N ...] [--scales X ...]
+                              [--artifacts DIR] [--out benchmark_results.json] [--compare]
+    python3 -m benchmarks baseline RESULTS [RESULTS ...] [--label NAME]
+    python3 -m benchmarks compare RESULTS [RESULTS ...] [--baseline FILE] [--tolerance 0.10]
+
+RESULTS are run outputs or master.py --timings files; several runs of the
+same cases pool their samples.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from benchmarks.baseline import (BASELINE_DIR, DEFAULT_CONFIDENCE, DEFAULT_TOLERANCE, RUNTIME_TARGET_SECONDS,
+                                 build_baseline, compare, format_report, latest_baseline, load_payload,
+                                 report_failed, save_baseline)
+from benchmarks.harness import ARTIFACTS, load_benchmarks, run_suite
+
+def _number(value):
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+def select_cases(benchmarks, args):
+    """[(name, size)] to run, in registry order"""
+    if args.only:
+        unknown = [name for name in args.only if name not in benchmarks]
+        if unknown:
+            raise SystemExit(f"❌ Unknown benchmark(s): {', '.join(unknown)} (see: python3 -m benchmarks list)")
+        names = args.only
+    else:
+        kinds = {"micro"} if args.micro else {"stage"} if args.stages else {"micro", "stage"}
+        names = [name for name, benchmark in benchmarks.items() if benchmark.kind in kinds]
+
+    cases = []
+    for name in names:
+        benchmark = benchmarks[name]
+        if benchmark.kind == "stage":
+            sizes = args.scales or ([] if args.artifacts else list(benchmark.sizes))
+            if args.artifacts:
+                sizes = sizes + [ARTIFACTS]
+        else:
+            sizes = args.sizes or list(benchmark.sizes)
+        cases.extend((name, size) for size in sizes)
+    return cases
+
+def format_row(result):
+    if result.get("error"):
+        return f"  ❌ {result['name']:<38} {str(result['size']):>9}  {result['error']}"
+    latency = result["latency_ms"]
+    throughput = result["throughput"]
+    return (f"  {result['name']:<40} {str(result['size']):>9} {result['items']:>10,} "
+            f"{latency['p50']:>11.4f} {latency['p99']:>11.4f} "
+            f"{(f'{throughput:,.0f}' if throughput else '-'):>13} {result['unit']:<9} "
+            f"{result['peak_rss_mb'] or 0:>8.1f}")
+
+def print_summary(payload):
+    print(f"\n  {'BENCHMARK':<40} {'SIZE':>9} {'ITEMS':>10} {'P50 ms':>11} {'P99 ms':>11} "
+          f"{'THROUGHPUT/s':>13} {'':<9} {'RSS MB':>8}")
+    print("  " + "-" * 118)
+    for result in payload["results"]:
+        print(format_row(result))
+    print("\n  P50/P99 are per operation for micro benchmarks (per repetition for stages)")
+
+def cmd_list(args):
+    for name, benchmark in load_benchmarks().items():
+        sizes = ", ".join(str(size) for size in benchmark.sizes)
+        print(f"  {name:<40} {benchmark.kind:<6} {benchmark.unit:<10} [{sizes}]  {benchmark.description.strip()}")
+
+def cmd_run(args):
+    # Generated stage inputs need the simulated feed; a DXLINK_REPLAY recording still takes precedence
+    os.environ["MARKET_PROVIDER"] = args.provider
+    benchmarks = load_benchmarks()
+    cases = select_cases(benchmarks, args)
+    if not cases:
+        print("❌ Nothing to run")
+        return 1
+
+    options = {
+        "mode": args.mode,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "warmup": args.warmup,
+        "artifacts": args.artifacts,
+        "provider": args.provider,
+        "replay": os.environ.get("DXLINK_REPLAY"),
+        "quiet": not args.verbose,
+    }
+
+    print(f"⏱️  Running {len(cases)} benchmark case(s) "
+          f"({'isolated processes' if not args.no_isolate else 'in-process'}, provider {args.provider})")
+    start = time.time()
+
+    def progress(i, total, result):
+        status = "❌" if result.get("error") else "✅"
+        print(f"  {status} [{i}/{total}] {result['name']} @ {result['size']}")
+
+    payload = run_suite(cases, options, isolate=not args.no_isolate, progress=progress)
+    with open(args.out, "w") as f:
+        json.dump(payload, f, indent=2)
+
+    print_summary(payload)
+    print(f"\n📁 Saved {args.out} ({time.time() - start:.1f}s)")
+    failed = any(result.get("error") for result in payload["results"])
+    if args.compare:
+        baseline_file = latest_baseline(args.baseline_dir)
+        if baseline_file is None:
+            print(f"⚠️ No baseline for this machine in {args.baseline_dir}/ "
+                  f"(create one: python3 -m benchmarks baseline {args.out})")
+        else:
+            failed = _compare(baseline_file, [payload], args) or failed
+    return 1 if failed else 0
+
+def _compare(baseline_file, payloads, args):
+    report = compare(load_payload(baseline_file), payloads, args.tolerance, args.confidence, args.target)
+    print(format_report(report, baseline_file))
+    return report_failed(report)
+
+def cmd_baseline(args):
+    payloads = [load_payload(path) for path in args.results]
+    try:
+        baseline = build_baseline(payloads, sources=args.results, label=args.label)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    path = save_baseline(baseline, args.baseline_dir)
+    samples = sum(len(case["samples"]) for case in baseline["cases"].values())
+    print(f"📌 Baseline: {len(baseline['cases'])} cases, {samples} samples "
+          f"(machine {baseline['machine']['id']}, commit {(baseline['git'].get('commit') or '?')[:7]})")
+    print(f"📁 Saved {path}")
+    return 0
+
+def cmd_compare(args):
+    payloads = [load_payload(path) for path in args.results]
+    baseline_file = args.baseline or latest_baseline(args.baseline_dir, payloads[0].get("machine", {}).get("id"))
+    if baseline_file is None:
+        print(f"❌ No baseline for this machine in {args.baseline_dir}/ "
+              f"(create one: python3 -m benchmarks baseline RESULTS)")
+        return 2
+    return 1 if _compare(baseline_file, payloads, args) else 0
+
+def _add_compare_options(parser):
+    parser.add_argument("--baseline-dir", default=BASELINE_DIR, help="Where baselines are kept, per machine")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Slowdown (fraction) a case may show before it counts as a regression")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE,
+                        help="Bootstrap confidence level for the slowdown interval")
+    parser.add_argument("--target", type=float, default=RUNTIME_TARGET_SECONDS,
+                        help="Pipeline runtime target in seconds for master.py timings (0 = off)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks", description="Pipeline performance benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="List registered benchmarks")
+
+    run = subparsers.add_parser("run", help="Run benchmarks and save a results JSON")
+    group = run.add_mutually_exclusive_group()
+    group.add_argument("--micro", action="store_true", help="Kernel and artifact I/O benchmarks only")
+    group.add_argument("--stages", action="store_true", help="Pipeline stage benchmarks only")
+    group.add_argument("--only", nargs="+", metavar="NAME", help="Run these benchmarks")
+    run.add_argument("--sizes", nargs="+", type=int, help="Sizes for micro benchmarks (default: each one's own)")
+    run.add_argument("--scales", nargs="+", type=_number,
+                     help="Stage inputs as multiples of the mode's tickers (default: 1)")
+    run.add_argument("--artifacts", metavar="DIR",
+                     help="Also run the stages on the mode's saved artifacts in DIR (e.g. . after master.py)")
+    run.add_argument("--mode", default="gpt", choices=["gpt", "grok", "merged"])
+    run.add_argument("--repeat", type=int, default=None, help="Measured repetitions (default: 5 micro, 3 stage)")
+    run.add_argument("--warmup", type=int, default=None, help="Unmeasured repetitions (default: 1 micro, 0 stage)")
+    run.add_argument("--seed", type=int, default=0, help="Seed for generated inputs")
+    run.add_argument("--provider", default="sim", choices=["sim", "tastytrade"],
+                     help="Market provider for streaming stages (default: sim)")
+    run.add_argument("--no-isolate", action="store_true", help="Run every case in this process")
+    run.add_argument("--verbose", action="store_true", help="Keep the stages' own progress output")
+    run.add_argument("--out", default="benchmark_results.json", help="Results file")
+    run.add_argument("--compare", action="store_true", help="Compare with this machine's latest baseline")
+    _add_compare_options(run)
+
+    baseline = subparsers.add_parser("baseline", help="Save results as this machine's new baseline")
+    baseline.add_argument("results", nargs="+", help="Results files to pool (repeated runs of the same cases)")
+    baseline.add_argument("--label", default=None, help="Suffix for the baseline file name")
+    baseline.add_argument("--baseline-dir", default=BASELINE_DIR, help="Where baselines are kept, per machine")
+
+    comparison = subparsers.add_parser("compare", help="Flag cases that slowed down against a baseline")
+    comparison.add_argument("results", nargs="+", help="Results files to pool (repeated runs of the same cases)")
+    comparison.add_argument("--baseline", default=None,
+                            help="Baseline file (default: the newest one recorded on this machine)")
+    _add_compare_options(comparison)
+
+    args = parser.parse_args(argv)
+    commands = {"list": cmd_list, "run": cmd_run, "baseline": cmd_baseline, "compare": cmd_compare}
+    return commands[args.command](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
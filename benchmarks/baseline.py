@@ -0,0 +1,229 @@
+# benchmarks/baseline.py - Regression Baselines & Comparison
+"""
+A baseline merges one or more results files (benchmark runs or master.py
+--timings) into per-case samples and is saved, versioned by time and git
+commit, under benchmark_baselines/<machine id>/. compare() checks new
+results against the newest baseline recorded on the same machine.
+
+Samples are wall seconds per item for every measured repetition, so runs
+of the same case with different item counts still compare. A case counts
+as regressed when its median slowed by more than the tolerance and the
+bootstrap confidence interval of the current/baseline median ratio lies
+entirely above 1, i.e. the slowdown is not just run-to-run noise; a median
+past the tolerance whose interval still includes 1 is reported as noisy.
+The pipeline total is also held to the 20 minute runtime target
+(build_universe.py).
+"""
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+from benchmarks.harness import PIPELINE_TOTAL, RESULTS_FORMAT, git_revision, machine_fingerprint
+
+BASELINE_FORMAT = "benchmark-baseline"
+BASELINE_VERSION = 1
+BASELINE_DIR = "benchmark_baselines"
+
+DEFAULT_TOLERANCE = 0.10
+DEFAULT_CONFIDENCE = 0.95
+MIN_SAMPLES = 3
+BOOTSTRAP_RESAMPLES = 2000
+RUNTIME_TARGET_SECONDS = 20 * 60
+
+# Results produced under different settings measure different work
+COMPARABLE_OPTIONS = ("mode", "seed", "provider", "artifacts", "sim_tickers", "replay")
+
+STATUS_ICONS = {
+    "regressed": "🔴",
+    "improved": "🟢",
+    "ok": "✅",
+    "noisy": "🟡",
+    "few samples": "⚪",
+    "new": "🆕",
+    "missing": "➖",
+}
+
+def case_key(name, size):
+    return f"{name}@{size}"
+
+def load_payload(path):
+    """A results or baseline file"""
+    with open(path, "r") as f:
+        payload = json.load(f)
+    if payload.get("format") not in (RESULTS_FORMAT, BASELINE_FORMAT):
+        raise ValueError(f"{path} is not a benchmark results or baseline file")
+    if payload["format"] == BASELINE_FORMAT and payload.get("version", 0) > BASELINE_VERSION:
+        raise ValueError(f"{path} is baseline version {payload['version']}; this code reads up to {BASELINE_VERSION}")
+    return payload
+
+def merge_cases(payloads):
+    """{key: case} with every successful repetition's seconds-per-item sample pooled across payloads"""
+    cases = {}
+    for payload in payloads:
+        if payload["format"] == BASELINE_FORMAT:
+            for key, case in payload["cases"].items():
+                merged = cases.setdefault(key, {**case, "samples": [], "runs": 0})
+                merged["samples"].extend(case["samples"])
+                merged["runs"] += case["runs"]
+            continue
+        for result in payload["results"]:
+            if result.get("error") or not result.get("wall_seconds") or not result.get("items"):
+                continue
+            key = case_key(result["name"], result["size"])
+            case = cases.setdefault(key, {"name": result["name"], "kind": result["kind"], "unit": result["unit"],
+                                          "size": result["size"], "items": result["items"],
+                                          "samples": [], "runs": 0})
+            case["items"] = result["items"]
+            case["samples"].extend(round(wall / result["items"], 12) for wall in result["wall_seconds"])
+            case["runs"] += 1
+    return cases
+
+def option_differences(a, b):
+    return {name: (a.get(name), b.get(name)) for name in COMPARABLE_OPTIONS if a.get(name) != b.get(name)}
+
+def build_baseline(payloads, sources=(), label=None):
+    """Baseline dict from results payloads (all from one machine and one set of options)"""
+    machines = {payload.get("machine", {}).get("id") for payload in payloads}
+    if len(machines) > 1:
+        raise ValueError(f"Results come from different machines ({', '.join(str(m) for m in machines)})")
+    options = payloads[0].get("options", {})
+    for payload in payloads[1:]:
+        differences = option_differences(options, payload.get("options", {}))
+        if differences:
+            raise ValueError(f"Results were run with different options: {differences}")
+
+    return {
+        "format": BASELINE_FORMAT,
+        "version": BASELINE_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "label": label,
+        "git": git_revision(),
+        "machine": payloads[0].get("machine") or machine_fingerprint(),
+        "options": options,
+        "sources": [str(source) for source in sources],
+        "cases": merge_cases(payloads),
+    }
+
+def baseline_path(baseline, directory=BASELINE_DIR):
+    """<dir>/<machine id>/<UTC timestamp>_<commit>[_<label>].json"""
+    stamp = datetime.fromisoformat(baseline["created"]).strftime("%Y%m%d-%H%M%S")
+    parts = [stamp, (baseline["git"].get("commit") or "nogit")[:7]]
+    if baseline.get("label"):
+        parts.append(baseline["label"])
+    return Path(directory) / baseline["machine"]["id"] / ("_".join(parts) + ".json")
+
+def save_baseline(baseline, directory=BASELINE_DIR):
+    path = baseline_path(baseline, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+    return path
+
+def latest_baseline(directory=BASELINE_DIR, machine_id=None):
+    """Newest baseline file for this machine (None if there is none)"""
+    machine_id = machine_id or machine_fingerprint()["id"]
+    candidates = sorted((Path(directory) / machine_id).glob("*.json"))
+    return candidates[-1] if candidates else None
+
+def bootstrap_ratio(base, current, confidence, rng):
+    """Median ratio current/base and its bootstrap confidence interval"""
+    base, current = np.asarray(base, dtype=np.float64), np.asarray(current, dtype=np.float64)
+    ratio = float(np.median(current) / np.median(base))
+    base_medians = np.median(rng.choice(base, (BOOTSTRAP_RESAMPLES, base.size)), axis=1)
+    current_medians = np.median(rng.choice(current, (BOOTSTRAP_RESAMPLES, current.size)), axis=1)
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(current_medians / base_medians, [tail, 1 - tail])
+    return ratio, float(low), float(high)
+
+def compare_case(base, current, tolerance, confidence, rng):
+    row = {"key": case_key((base or current)["name"], (base or current)["size"]),
+           "unit": (base or current)["unit"], "base": base, "current": current,
+           "ratio": None, "low": None, "high": None}
+    if current is None:
+        return {**row, "status": "missing"}
+    if base is None:
+        return {**row, "status": "new"}
+
+    ratio, low, high = bootstrap_ratio(base["samples"], current["samples"], confidence, rng)
+    row.update(ratio=ratio, low=low, high=high)
+    if min(len(base["samples"]), len(current["samples"])) < MIN_SAMPLES:
+        status = "few samples"
+    elif ratio > 1 + tolerance:
+        status = "regressed" if low > 1 else "noisy"
+    elif ratio < 1 - tolerance:
+        status = "improved" if high < 1 else "noisy"
+    else:
+        status = "ok"
+    return {**row, "status": status}
+
+def compare(baseline, current_payloads, tolerance=DEFAULT_TOLERANCE, confidence=DEFAULT_CONFIDENCE,
+            target_seconds=RUNTIME_TARGET_SECONDS, seed=0):
+    """Comparison report: one row per case in either side, plus machine/option warnings and the runtime target"""
+    base_cases = baseline["cases"]
+    current_cases = merge_cases(current_payloads)
+    rng = np.random.default_rng(seed)
+    rows = [compare_case(base_cases.get(key), current_cases.get(key), tolerance, confidence, rng)
+            for key in list(base_cases) + [k for k in current_cases if k not in base_cases]]
+
+    current_machine = current_payloads[0].get("machine", {})
+    warnings = []
+    if baseline["machine"].get("id") != current_machine.get("id"):
+        changed = [field for field in baseline["machine"]
+                   if field not in ("id", "hostname") and baseline["machine"][field] != current_machine.get(field)]
+        warnings.append(f"Baseline was recorded on another machine (differs in: {', '.join(changed) or 'id'})")
+    differences = option_differences(baseline.get("options", {}), current_payloads[0].get("options", {}))
+    if differences:
+        warnings.append(f"Options differ from the baseline: {differences}")
+
+    target = None
+    total = current_cases.get(case_key(PIPELINE_TOTAL, 1))
+    if total and target_seconds:
+        seconds = float(np.median(total["samples"])) * total["items"]
+        target = {"seconds": seconds, "target_seconds": target_seconds, "met": seconds <= target_seconds}
+
+    return {
+        "tolerance": tolerance,
+        "confidence": confidence,
+        "rows": rows,
+        "warnings": warnings,
+        "target": target,
+        "regressions": [row["key"] for row in rows if row["status"] == "regressed"],
+    }
+
+def _median_ms(case):
+    return float(np.median(case["samples"])) * case["items"] * 1000
+
+def format_report(report, baseline_name=""):
+    """The comparison as a printable diff table"""
+    lines = [f"\n📊 Benchmark comparison vs {baseline_name or 'baseline'} "
+             f"(tolerance ±{report['tolerance']:.0%}, {report['confidence']:.0%} bootstrap CI)"]
+    for warning in report["warnings"]:
+        lines.append(f"⚠️ {warning}")
+    lines.append(f"\n  {'CASE':<48} {'BASE ms':>12} {'NOW ms':>12} {'CHANGE':>8} {'CI':>17} {'N':>7}  STATUS")
+    lines.append("  " + "-" * 120)
+    for row in report["rows"]:
+        base, current = row["base"], row["current"]
+        base_ms = f"{_median_ms(base):,.3f}" if base else "-"
+        now_ms = f"{_median_ms(current):,.3f}" if current else "-"
+        change = f"{row['ratio'] - 1:+.1%}" if row["ratio"] is not None else "-"
+        interval = f"[{row['low'] - 1:+.0%}, {row['high'] - 1:+.0%}]" if row["low"] is not None else "-"
+        samples = f"{len(base['samples']) if base else 0}/{len(current['samples']) if current else 0}"
+        note = ""
+        if base and current and base["items"] != current["items"]:
+            note = f"  (items {base['items']:,} -> {current['items']:,}; change is per item)"
+        lines.append(f"  {row['key']:<48} {base_ms:>12} {now_ms:>12} {change:>8} {interval:>17} {samples:>7}  "
+                     f"{STATUS_ICONS[row['status']]} {row['status']}{note}")
+
+    target = report["target"]
+    if target:
+        icon = "✅" if target["met"] else "❌"
+        lines.append(f"\n{icon} Pipeline total {target['seconds'] / 60:.1f} min "
+                     f"(target {target['target_seconds'] / 60:.3g} min)")
+    if report["regressions"]:
+        lines.append(f"\n🔴 {len(report['regressions'])} regression(s): {', '.join(report['regressions'])}")
+    else:
+        lines.append("\n✅ No significant regressions")
+    return "\n".join(lines)
+
+def report_failed(report):
+    return bool(report["regressions"]) or (report["target"] is not None and not report["target"]["met"])
@@ -0,0 +1,218 @@
+# benchmarks/harness.py - Benchmark Registry & Measurement
+"""
+Benchmarks register a prepare(size, options) function that builds its
+inputs and returns a Case: a run() callable for one repetition and the
+number of items (calls, contracts, tickers) it processes. run() may return
+a list of per-operation latencies; otherwise the repetition's wall time is
+the sample.
+
+Each (benchmark, size) case runs in a fresh spawned process by default, so
+peak RSS belongs to that case alone and one case's caches or garbage never
+leak into the next. Results are plain JSON-serializable dicts.
+"""
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+
+RESULTS_FORMAT = "benchmark-results"
+RESULTS_VERSION = 1
+ARTIFACTS = "artifacts"  # stage size: read saved artifacts instead of generating inputs
+PIPELINE_TOTAL = "pipeline.total"
+
+BENCHMARKS = {}
+
+Benchmark = namedtuple("Benchmark", ["name", "kind", "unit", "sizes", "prepare", "description"])
+Case = namedtuple("Case", ["run", "items"])
+
+def register(name, kind, unit, sizes, description=""):
+    """Decorator: add prepare(size, options) -> Case to the registry"""
+    def decorator(prepare):
+        BENCHMARKS[name] = Benchmark(name, kind, unit, tuple(sizes), prepare, description or prepare.__doc__ or "")
+        return prepare
+    return decorator
+
+def load_benchmarks():
+    """Import the modules that register benchmarks"""
+    import benchmarks.micro  # noqa: F401
+    import benchmarks.stages  # noqa: F401
+    return BENCHMARKS
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def latency_summary(samples):
+    """Percentiles and moments of latency samples, in milliseconds"""
+    values = np.asarray(samples, dtype=np.float64) * 1000
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        "count": int(values.size),
+        "min": round(float(values.min()), 6),
+        "p50": round(float(p50), 6),
+        "p90": round(float(p90), 6),
+        "p99": round(float(p99), 6),
+        "max": round(float(values.max()), 6),
+        "mean": round(float(values.mean()), 6),
+        "stdev": round(float(values.std(ddof=1)), 6) if values.size > 1 else 0.0,
+    }
+
+def measure(case, repeat, warmup):
+    """Run a case warmup + repeat times; wall seconds per repetition plus latency samples"""
+    for _ in range(warmup):
+        case.run()
+
+    wall, ops = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        latencies = case.run()
+        wall.append(time.perf_counter() - start)
+        if isinstance(latencies, list):  # stages return their own result payloads
+            ops.extend(latencies)
+
+    median_wall = statistics.median(wall)
+    return {
+        "wall_seconds": [round(w, 6) for w in wall],
+        "latency_ms": latency_summary(ops or wall),
+        "latency_scope": "operation" if ops else "repetition",
+        "throughput": round(case.items / median_wall, 3) if median_wall > 0 else None,
+    }
+
+@contextlib.contextmanager
+def _quiet(enabled):
+    # Pipeline stages print progress for every ticker and batch
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+def run_case(name, size, options):
+    """Prepare and measure one (benchmark, size) case in the current process"""
+    benchmark = load_benchmarks()[name]
+    repeat = options.get("repeat") or (3 if benchmark.kind == "stage" else 5)
+    warmup = options.get("warmup")
+    if warmup is None:
+        warmup = 0 if benchmark.kind == "stage" else 1
+
+    result = {"name": name, "kind": benchmark.kind, "unit": benchmark.unit, "size": size,
+              "repeat": repeat, "warmup": warmup}
+    try:
+        with _quiet(options.get("quiet", True)):
+            start = time.perf_counter()
+            case = benchmark.prepare(size, options)
+            result["setup_seconds"] = round(time.perf_counter() - start, 3)
+            result["setup_rss_mb"] = peak_rss_mb()
+            result["items"] = case.items
+            result.update(measure(case, repeat, warmup))
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc(limit=5)
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+def run_isolated(name, size, options):
+    """run_case() in a fresh spawned process (clean caches and peak RSS)"""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_case, name, size, options).result()
+
+def _cpu_model():
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/cpuinfo", "r") as f:
+                for line in f:
+                    if line.startswith("model name"):
+                        return line.split(":", 1)[1].strip()
+        elif sys.platform == "darwin":
+            return subprocess.run(["sysctl", "-n", "machdep.cpu.brand_string"],
+                                  capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return platform.processor() or None
+
+def _memory_gb():
+    try:
+        return round(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 ** 3, 1)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def machine_fingerprint():
+    """Hardware and runtime that timings depend on; `id` hashes the fields that make runs comparable"""
+    info = {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu_model": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "memory_gb": _memory_gb(),
+        "python": ".".join(platform.python_version_tuple()[:2]),
+        "numpy": np.__version__,
+    }
+    info["id"] = hashlib.sha256(json.dumps(info, sort_keys=True).encode()).hexdigest()[:12]
+    info["hostname"] = platform.node()  # informational: renamed hosts keep their baselines
+    return info
+
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, timeout=5).stdout.strip())
+        return {"commit": commit or None, "dirty": dirty}
+    except (OSError, subprocess.SubprocessError):
+        return {"commit": None, "dirty": None}
+
+def results_payload(results, options):
+    """Wrap result dicts in the results file format"""
+    return {
+        "format": RESULTS_FORMAT,
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "git": git_revision(),
+        "python": sys.version.split()[0],
+        "machine": machine_fingerprint(),
+        "options": {k: v for k, v in options.items() if k != "quiet"},
+        "results": results,
+    }
+
+def run_suite(cases, options, isolate=True, progress=None):
+    """Measure [(name, size)] cases; returns the results payload"""
+    results = []
+    for i, (name, size) in enumerate(cases, 1):
+        result = run_isolated(name, size, options) if isolate else run_case(name, size, options)
+        results.append(result)
+        if progress:
+            progress(i, len(cases), result)
+    return results_payload(results, options)
+
+def timing_result(name, seconds, kind="pipeline", unit="runs", items=1):
+    """A result entry for one externally timed run (e.g. a master.py step)"""
+    return {"name": name, "kind": kind, "unit": unit, "size": 1, "repeat": 1, "warmup": 0, "items": items,
+            "wall_seconds": [round(seconds, 6)], "latency_ms": latency_summary([seconds]),
+            "latency_scope": "repetition", "throughput": round(items / seconds, 3) if seconds > 0 else None}
+
+def pipeline_results(step_times, step_results, total_seconds, options):
+    """master.py step wall times as a results payload, so runs can be baselined and compared.
+    Cached or failed steps did no comparable work and are left out, as is the total then."""
+    results = [timing_result(f"pipeline.{Path(script).stem}", seconds)
+               for script, seconds in step_times.items() if step_results.get(script) == "SUCCESS"]
+    if results and len(results) == len(step_times):
+        results.append(timing_result(PIPELINE_TOTAL, total_seconds))
+    return results_payload(results, options)
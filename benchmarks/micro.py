@@ -0,0 +1,174 @@
+# benchmarks/micro.py - Kernel Microbenchmarks
+"""
+Per-call latency of the scoring and pricing kernels, and artifact
+load/dump throughput. Inputs come from simulator/dataset.py (seeded), so a
+size always means the same data. Sizes: calls for the scalar kernels, legs
+per batch for the batch PoP, strikes per expiration for spread
+construction, tickers for the artifact benchmarks.
+"""
+import ast
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.harness import Case, register
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+IV_LIQUIDITY_SCRIPT = REPO_ROOT / "daily-credit-spread-screener_iv_liquidity.py"
+SPREAD_TICKERS = 8
+BATCH_CALLS = 50
+
+def load_function(path, name):
+    """One top-level function from a repo script without importing (or running) the rest of it.
+    Handles the daily-*.py scripts, whose code sits in a markdown code fence."""
+    source = Path(path).read_text()
+    if "```" in source:
+        source = source.split("```", 2)[1].split("\n", 1)[1]
+    tree = ast.parse(source)
+    node = next(n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == name)
+    namespace = {}
+    exec(compile(ast.Module(body=[node], type_ignores=[]), str(path), "exec"), namespace)
+    return namespace[name]
+
+def timed_calls(fn, args_list):
+    """Call fn(*args) for each args tuple; per-call latencies in seconds"""
+    latencies = []
+    clock = time.perf_counter
+    for args in args_list:
+        start = clock()
+        fn(*args)
+        latencies.append(clock() - start)
+    return latencies
+
+def _dataset(options, tickers, strikes=None):
+    from simulator.dataset import DEFAULT_STRIKES, generate_dataset
+    return generate_dataset(options.get("mode", "gpt"), tickers, options.get("expirations", 6),
+                            strikes or options.get("strikes", DEFAULT_STRIKES), options.get("seed", 0))
+
+def _pop_inputs(count, seed):
+    rng = random.Random(seed)
+    inputs = []
+    for _ in range(count):
+        spot = rng.uniform(20, 800)
+        inputs.append((spot, round(spot * rng.uniform(0.75, 1.25), 1), rng.randint(7, 60),
+                       rng.uniform(0.12, 0.9), rng.choice("CP")))
+    return inputs
+
+@register("bs_pop", "micro", "calls", (1000, 10000))
+def bench_bs_pop(size, options):
+    """spread_analyzer.calculate_black_scholes_pop, one contract per call"""
+    from spread_analyzer import calculate_black_scholes_pop
+    inputs = _pop_inputs(size, options.get("seed", 0))
+    return Case(lambda: timed_calls(calculate_black_scholes_pop, inputs), size)
+
+@register("bs_pop_batch", "micro", "legs", (10, 100, 1000, 10000))
+def bench_bs_pop_batch(size, options):
+    """spread_analyzer.calculate_black_scholes_pop_batch over `size` legs"""
+    import numpy as np
+    from spread_analyzer import calculate_black_scholes_pop_batch
+    spot, strike, dte, iv, option_type = (np.array(column) for column in
+                                          zip(*_pop_inputs(size, options.get("seed", 0))))
+    args = [(spot, strike, dte, iv, option_type)] * BATCH_CALLS
+    return Case(lambda: timed_calls(calculate_black_scholes_pop_batch, args), size * BATCH_CALLS)
+
+def _spread_case(size, options, exhaustive):
+    from spread_analyzer import construct_credit_spreads
+    _, greeks_data = _dataset(options, SPREAD_TICKERS, strikes=size)
+    tickers = [greeks_data.by_ticker[ticker] for ticker in greeks_data.by_ticker]
+    contracts = sum(len(ticker_data["contracts"]) for ticker_data in tickers)
+    args = [(ticker_data, 10, exhaustive) for ticker_data in tickers]
+    return Case(lambda: timed_calls(construct_credit_spreads, args), contracts)
+
+@register("construct_credit_spreads", "micro", "contracts", (10, 40, 160))
+def bench_construct_credit_spreads(size, options):
+    """spread_analyzer.construct_credit_spreads per ticker (size = strikes per expiration)"""
+    return _spread_case(size, options, exhaustive=False)
+
+@register("construct_credit_spreads_exhaustive", "micro", "contracts", (10, 40, 160))
+def bench_construct_credit_spreads_exhaustive(size, options):
+    """construct_credit_spreads(exhaustive=True) per ticker (size = strikes per expiration)"""
+    return _spread_case(size, options, exhaustive=True)
+
+@register("credit_spread_liquidity_score", "micro", "calls", (10000, 100000))
+def bench_credit_spread_liquidity_score(size, options):
+    """ticker_ranker.calculate_credit_spread_liquidity_score on random sample metrics"""
+    from ticker_ranker import calculate_credit_spread_liquidity_score
+    rng = random.Random(options.get("seed", 0))
+    inputs = [({
+        "atm_spread_pct": rng.uniform(0.2, 12),
+        "avg_open_interest": rng.uniform(0, 5000),
+        "avg_volume": rng.uniform(0, 1200),
+        "contracts_analyzed": rng.randint(0, 60),
+    },) for _ in range(size)]
+    return Case(lambda: timed_calls(calculate_credit_spread_liquidity_score, inputs), size)
+
+@register("iv_liquidity_score", "micro", "calls", (10000, 100000))
+def bench_iv_liquidity_score(size, options):
+    """calculate_liquidity_score from the daily iv_liquidity screener"""
+    calculate_liquidity_score = load_function(IV_LIQUIDITY_SCRIPT, "calculate_liquidity_score")
+    rng = random.Random(options.get("seed", 0))
+    tickers = ["SPY", "AAPL", "NFLX", "COP", "SIM0001"]
+    inputs = []
+    for _ in range(size):
+        spread = rng.uniform(0.01, 1.5)
+        inputs.append((rng.randint(0, 5000), rng.randint(0, 1500), spread, spread / rng.uniform(0.5, 20) * 100,
+                       rng.choice(tickers)))
+    return Case(lambda: timed_calls(calculate_liquidity_score, inputs), size)
+
+def _artifact_case(size, options, columnar, load):
+    import numpy as np
+    from columnar import columns_path, read_table
+    from greeks import save_greeks_data
+    from greeks_store import as_greeks_data, greeks_from_table, save_greeks_table
+
+    _, greeks_data = _dataset(options, size)
+    contracts = len(greeks_data["contracts"]["symbol"])
+    workdir = tempfile.TemporaryDirectory(prefix="bench_artifacts_")
+    path = Path(workdir.name) / "greeks_data_bench.json"
+
+    def dump():
+        if columnar:
+            save_greeks_table(greeks_data, path)
+        else:
+            save_greeks_data(greeks_data, path, columnar=False)
+
+    def read():
+        # Touch one full column so lazily mapped tables pay for their reads too
+        if columnar:
+            data = greeks_from_table(read_table(columns_path(path)))
+        else:
+            with open(path, "r") as f:
+                data = as_greeks_data(json.load(f))
+        return np.nansum(np.asarray(data["market"]["mid"], dtype=np.float64))
+
+    if load:
+        dump()
+
+    def run(workdir=workdir):  # the default keeps the temp directory alive with the case
+        if load:
+            read()
+        else:
+            dump()
+
+    return Case(run, contracts)
+
+@register("artifact_dump_json", "micro", "contracts", (27, 270))
+def bench_artifact_dump_json(size, options):
+    """Write greeks_data_*.json for `size` tickers"""
+    return _artifact_case(size, options, columnar=False, load=False)
+
+@register("artifact_load_json", "micro", "contracts", (27, 270))
+def bench_artifact_load_json(size, options):
+    """Read greeks_data_*.json for `size` tickers and scan its mid column"""
+    return _artifact_case(size, options, columnar=False, load=True)
+
+@register("artifact_dump_columnar", "micro", "contracts", (27, 270))
+def bench_artifact_dump_columnar(size, options):
+    """Write the greeks_data .columns/ table for `size` tickers"""
+    return _artifact_case(size, options, columnar=True, load=False)
+
+@register("artifact_load_columnar", "micro", "contracts", (27, 270))
+def bench_artifact_load_columnar(size, options):
+    """Memory-map the greeks_data .columns/ table for `size` tickers and scan its mid column"""
+    return _artifact_case(size, options, columnar=True, load=True)
@@ -0,0 +1,89 @@
+# benchmarks/stages.py - Pipeline Stage Benchmarks
+"""
+End-to-end timings of spot, ticker_ranker, greeks and spread_analyzer,
+each fed the previous stage's artifact. A numeric size is a scale factor
+on the mode's ticker count and uses generated inputs (simulator/dataset.py);
+the size "artifacts" reads the mode's saved artifacts from the --artifacts
+directory instead (through the columnar tables when they are current, as
+the pipeline does). Streaming stages get their events from whatever
+streaming.create_streamer() returns: the simulator (MARKET_PROVIDER=sim,
+the benchmark default), a DXLINK_REPLAY recording, or the live feed.
+"""
+import asyncio
+import json
+from pathlib import Path
+from benchmarks.harness import ARTIFACTS, Case, register
+
+def stage_tickers(size, options):
+    """Ticker count for a scale factor on the mode's universe"""
+    from simulator.dataset import dataset_tickers
+    return max(1, round(len(dataset_tickers(options.get("mode", "gpt"))) * float(size)))
+
+def load_artifact(options, name):
+    path = Path(options["artifacts"]) / name.format(mode=options.get("mode", "gpt"))
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _generated(size, options):
+    return size != ARTIFACTS
+
+@register("stage.spot", "stage", "tickers", (1,))
+def bench_spot(size, options):
+    """spot.collect_quotes_for_validated_tickers over a universe"""
+    from simulator.dataset import generate_universe
+    from spot import collect_quotes_for_validated_tickers
+
+    mode = options.get("mode", "gpt")
+    universe = (generate_universe(mode, stage_tickers(size, options)) if _generated(size, options)
+                else load_artifact(options, "universe_{mode}.json"))
+    tickers = len([item for item in universe if item.get("status") == "ok"])
+    return Case(lambda: asyncio.run(collect_quotes_for_validated_tickers(mode, universe_data=universe, save=False)),
+                tickers)
+
+@register("stage.ticker_ranker", "stage", "tickers", (1,))
+def bench_ticker_ranker(size, options):
+    """ticker_ranker.rank_all_tickers_for_credit_spreads over spot quotes"""
+    from simulator.dataset import generate_spot_quotes
+    from ticker_ranker import rank_all_tickers_for_credit_spreads
+
+    mode = options.get("mode", "gpt")
+    quotes = (generate_spot_quotes(mode, stage_tickers(size, options), options.get("seed", 0))
+              if _generated(size, options) else load_artifact(options, "spot_quotes_{mode}.json"))
+    return Case(lambda: asyncio.run(rank_all_tickers_for_credit_spreads(mode, quotes_data=quotes, save=False)),
+                len(quotes["quotes"]))
+
+@register("stage.greeks", "stage", "contracts", (1,))
+def bench_greeks(size, options):
+    """greeks.collect_greeks_for_credit_spreads over discovered contracts"""
+    from columnar import load_contracts_data
+    from greeks import collect_greeks_for_credit_spreads
+    from simulator.dataset import DEFAULT_STRIKES, generate_contracts_data
+
+    mode = options.get("mode", "gpt")
+    if _generated(size, options):
+        contracts, _ = generate_contracts_data(mode, stage_tickers(size, options), options.get("expirations", 6),
+                                               options.get("strikes", DEFAULT_STRIKES), options.get("seed", 0))
+    else:
+        contracts = load_contracts_data(mode, options["artifacts"])
+    count = sum(len(exp["contracts"]) for ticker in contracts["contracts_by_ticker"].values()
+                for exp in ticker["expiration_dates"].values())
+    return Case(lambda: asyncio.run(collect_greeks_for_credit_spreads(
+        mode, verbose=False, contracts_data=contracts, save=False)), count)
+
+@register("stage.spread_analyzer", "stage", "contracts", (1,))
+def bench_spread_analyzer(size, options):
+    """spread_analyzer.analyze_credit_spreads_for_mode over greeks_data"""
+    from greeks_store import load_greeks_data
+    from simulator.dataset import DEFAULT_STRIKES, generate_dataset
+    from spread_analyzer import analyze_credit_spreads_for_mode
+
+    mode = options.get("mode", "gpt")
+    if _generated(size, options):
+        _, greeks_data = generate_dataset(mode, stage_tickers(size, options), options.get("expirations", 6),
+                                          options.get("strikes", DEFAULT_STRIKES), options.get("seed", 0))
+    else:
+        greeks_data = load_greeks_data(mode, options["artifacts"])
+    spread_options = {"exhaustive": options.get("exhaustive", False)}
+    return Case(lambda: analyze_credit_spreads_for_mode(mode, verbose=False, greeks_data=greeks_data, save=False,
+                                                        **spread_options),
+                len(greeks_data["contracts"]["symbol"]))
@@ -1,18 +1,20 @@
 # build_universe.py - Optimized Universe Builder
 """
 KEEP - optimize for 20min runtime target.
-Validates options chains with early exit at 95% success.
+Validates options chains for every ticker (and its aliases) in parallel.
 """
 import json
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
-from tastytrade import Session
-from tastytrade.instruments import get_option_chain
-from config import USERNAME, PASSWORD
+from chain_cache import get_option_chain
+from session_provider import get_session
 from sectors import get_sectors, alias_candidates, PORTFOLIO_MODE, PerfTimer
 
 BUILD_MODES = ["gpt", "grok"]
+MAX_VALIDATION_WORKERS = 16
 
 def validate_chain_fast(sess, sym, timeout=3):
     """Fast chain validation with timeout"""
@@ -34,11 +36,96 @@ def validate_chain_fast(sess, sym, timeout=3):
     print(f"  ⚠️ {sym} -> NO CHAIN")
     return None
 
-def build_universe_optimized(sess, mode):
+def _chain_exists(sess, alias):
+    chain = get_option_chain(sess, alias)
+    return bool(chain and len(chain) > 0)
+
+def validate_chains_parallel(sess, tickers, max_workers=MAX_VALIDATION_WORKERS, timeout=10):
+    """Validate all tickers and their aliases concurrently.
+    
+    Each ticker tries its aliases in preference order: a fallback alias is
+    only requested after the preferred one failed, and an alias shared by
+    several tickers is requested once. At most max_workers requests are in
+    flight; each one gets its own timeout from submission and counts as
+    failed (and is cancelled) when it runs past it. A request stuck behind
+    timed-out ones that still hold their worker times out the same way.
+    """
+    candidates = {ticker: list(dict.fromkeys(alias_candidates(ticker))) for ticker in tickers}
+    remaining = {ticker: iter(options) for ticker, options in candidates.items()}
+    
+    alias_ok = {}
+    waiting = {}  # alias -> tickers waiting on its request
+    queue = deque()
+    validated = {}
+    
+    def advance(ticker):
+        # Move the ticker on to its next untried alias
+        for alias in remaining[ticker]:
+            if alias in alias_ok:
+                if alias_ok[alias]:
+                    validated[ticker] = alias
+                    return
+                continue
+            if alias not in waiting:
+                waiting[alias] = []
+                queue.append(alias)
+            waiting[alias].append(ticker)
+            return
+        validated[ticker] = None
+    
+    for ticker in candidates:
+        advance(ticker)
+    
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    running = {}  # future -> (alias, deadline)
+    try:
+        while queue or running:
+            while queue and len(running) < max_workers:
+                alias = queue.popleft()
+                running[executor.submit(_chain_exists, sess, alias)] = (alias, time.monotonic() + timeout)
+            
+            next_deadline = min(deadline for _, deadline in running.values())
+            done, _ = wait(running, timeout=max(0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for future, (alias, deadline) in list(running.items()):
+                if future in done:
+                    try:
+                        ok = future.result()
+                    except Exception as e:
+                        ok = False
+                        print(f"  ❌ {alias} ({str(e)[:30]})")
+                elif deadline <= now:
+                    future.cancel()
+                    ok = False
+                    print(f"  ⏱️ {alias} timed out after {timeout}s")
+                else:
+                    continue
+                del running[future]
+                alias_ok[alias] = ok
+                for ticker in waiting.pop(alias):
+                    if ok:
+                        validated[ticker] = alias
+                    else:
+                        advance(ticker)
+    finally:
+        for future in running:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    validated = {ticker: validated.get(ticker) for ticker in candidates}
+    for ticker, alias in validated.items():
+        if alias:
+            print(f"  ✅ {ticker} -> {alias}")
+        else:
+            print(f"  ⚠️ {ticker} -> NO CHAIN")
+    
+    return validated
+
+def build_universe_optimized(sess, mode, parallel=True, max_workers=MAX_VALIDATION_WORKERS):
     """Build universe with optimized validation"""
     print(f"\n🔨 Building {mode.upper()} universe...")
     
-    with PerfTimer(f"{mode.upper()} universe build"):
+    with PerfTimer(f"{mode.upper()} universe build", "mode", mode=mode):
         sectors = get_sectors(mode)
         validated_tickers = []
         failed_tickers = []
@@ -53,11 +140,17 @@ def build_universe_optimized(sess, mode):
         
         print(f"📋 Validating {len(all_tickers)} tickers...")
         
-        # Process with early exit
-        for i, ticker in enumerate(all_tickers, 1):
-            print(f"[{i}/{len(all_tickers)}] {ticker}:")
-            
-            validated_alias = validate_chain_fast(sess, ticker)
+        if parallel:
+            print(f"⚡ Parallel validation: {max_workers} workers")
+            validated = validate_chains_parallel(sess, all_tickers, max_workers=max_workers)
+        else:
+            validated = {}
+            for i, ticker in enumerate(all_tickers, 1):
+                print(f"[{i}/{len(all_tickers)}] {ticker}:")
+                validated[ticker] = validate_chain_fast(sess, ticker)
+        
+        for ticker in all_tickers:
+            validated_alias = validated.get(ticker)
             
             record = {
                 "ticker": validated_alias or ticker,
@@ -70,12 +163,6 @@ def build_universe_optimized(sess, mode):
                 validated_tickers.append(record)
             else:
                 failed_tickers.append(record)
-            
-            # Early exit at 95% if we have enough
-            success_rate = len(validated_tickers) / i
-            if i >= 20 and success_rate >= 0.95:
-                print(f"🚀 Early exit at 95% success rate ({i} processed)")
-                break
     
     all_results = validated_tickers + failed_tickers
     
@@ -86,32 +173,56 @@ def build_universe_optimized(sess, mode):
     
     return all_results
 
+def universe_for_mode(results, mode):
+    """Slice a universe validated for a superset of tickers down to one mode"""
+    by_requested = {record["requested"]: record for record in results}
+    validated_tickers = []
+    failed_tickers = []
+    
+    for sector, meta in get_sectors(mode).items():
+        for ticker in meta["tickers"]:
+            record = by_requested.get(ticker)
+            if record is None:
+                record = {"ticker": ticker, "requested": ticker, "status": "no_chain"}
+            record = {**record, "sector": sector}
+            if record["status"] == "ok":
+                validated_tickers.append(record)
+            else:
+                failed_tickers.append(record)
+    
+    return validated_tickers + failed_tickers
+
+def save_universe(mode, results):
+    """Write universe_{mode}.json"""
+    filename = f"universe_{mode}.json"
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Saved: {filename}")
+
+def set_active_universe(mode=PORTFOLIO_MODE):
+    """Copy universe_{mode}.json to universe_active.json"""
+    active_file = f"universe_{mode}.json"
+    if Path(active_file).exists():
+        with open(active_file, "r") as f:
+            active_data = f.read()
+        with open("universe_active.json", "w") as f:
+            f.write(active_data)
+        print(f"🔗 Active: universe_active.json -> {mode}")
+
 def main():
     """Main universe builder"""
     start_time = time.time()
     print("🚀 Optimized Universe Builder")
     print(f"📅 Target: 20min runtime | Mode: {PORTFOLIO_MODE}")
     
-    sess = Session(USERNAME, PASSWORD)
+    sess = get_session()
     
     for mode in BUILD_MODES:
         results = build_universe_optimized(sess, mode)
-        
-        # Save results
-        filename = f"universe_{mode}.json"
-        with open(filename, "w") as f:
-            json.dump(results, f, indent=2)
-        
-        print(f"💾 Saved: {filename}")
+        save_universe(mode, results)
     
     # Set active universe
-    active_file = f"universe_{PORTFOLIO_MODE}.json"
-    if Path(active_file).exists():
-        with open(active_file, "r") as f:
-            active_data = f.read()
-        with open("universe_active.json", "w") as f:
-            f.write(active_data)
-        print(f"🔗 Active: universe_active.json -> {PORTFOLIO_MODE}")
+    set_active_universe()
     
     total_time = time.time() - start_time
     print(f"\n⏱️ Total time: {total_time:.1f}s")
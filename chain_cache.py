@@ -0,0 +1,210 @@
+# chain_cache.py - On-Disk Option Chain Cache
+"""
+Drop-in replacement for tastytrade's get_option_chain shared by
+build_universe.py, ticker_ranker.py and options_chains.py.
+Chains are stored per symbol per trading date as columnar .npz files,
+so a full pipeline run makes one chain request per underlying per day.
+Recording runs (DXLINK_RECORD) also snapshot every chain they use into
+<recording>.chains/, which replays read before the cache, so a recording
+replays on its own on any machine and with any provider.
+"""
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime, timezone
+from pathlib import Path
+from urllib.parse import quote
+import numpy as np
+from stream_replay import record_path, recording_chains_dir, recording_trading_date, replay_path
+from simulator import sim_option_chain, simulated
+
+CACHE_DIR = Path(".chain_cache")
+CACHE_TTL_SECONDS = 6 * 3600  # Chains only change on new listings
+
+# Carries the attributes the pipeline reads from tastytrade Option objects
+CachedOption = namedtuple("CachedOption", ["symbol", "streamer_symbol", "strike_price", "option_type", "expiration_date"])
+
+_memory_cache = {}  # (symbol, cache file name or recorded chain path) -> (chain, written at)
+_lock = threading.Lock()
+_pinned_date = None
+
+def trading_date() -> date:
+    if _pinned_date is None and replay_path():
+        pin_trading_date(recording_trading_date(replay_path()))
+    return _pinned_date or datetime.now(timezone.utc).date()
+
+def pin_trading_date(day: date = None):
+    """Serve chains cached on `day` regardless of age (replays); None unpins"""
+    global _pinned_date
+    _pinned_date = day
+
+def safe_symbol(symbol: str) -> str:
+    """Percent-encoded symbol for file names: BRK.B, BRK/B and BRK_B stay distinct"""
+    return quote(symbol, safe="")
+
+def cache_path(symbol: str, day: date = None) -> Path:
+    return CACHE_DIR / f"{safe_symbol(symbol)}_{(day or trading_date()).isoformat()}.npz"
+
+def _is_stale(written_at: float, ttl: float) -> bool:
+    # A pinned (replay) date serves its chains however old they are
+    return _pinned_date is None and time.time() - written_at > ttl
+
+def _to_columns(chain):
+    """Flatten {expiration: [Option]} into one row per contract"""
+    rows = [(exp_date, opt) for exp_date in sorted(chain.keys()) for opt in chain[exp_date]]
+    return {
+        "expiration": np.array([exp_date.toordinal() for exp_date, _ in rows], dtype=np.int32),
+        "strike": np.array([float(opt.strike_price) for _, opt in rows], dtype=np.float64),
+        "option_type": np.array([opt.option_type.value for _, opt in rows], dtype="<U1"),
+        "symbol": np.array([opt.symbol for _, opt in rows], dtype=str),
+        "streamer_symbol": np.array([opt.streamer_symbol for _, opt in rows], dtype=str),
+    }
+
+def _option_type():
+    try:
+        from tastytrade.instruments import OptionType
+    except ImportError:  # offline replays don't need the SDK
+        from simulator.market import OptionType
+    return OptionType
+
+def _from_columns(columns):
+    """Rebuild {expiration: [CachedOption]} from stored columns"""
+    OptionType = _option_type()
+    chain = {}
+    for ordinal, strike, option_type, symbol, streamer_symbol in zip(
+        columns["expiration"].tolist(),
+        columns["strike"].tolist(),
+        columns["option_type"].tolist(),
+        columns["symbol"].tolist(),
+        columns["streamer_symbol"].tolist()
+    ):
+        exp_date = date.fromordinal(ordinal)
+        chain.setdefault(exp_date, []).append(
+            CachedOption(symbol, streamer_symbol, strike, OptionType(option_type), exp_date)
+        )
+    return chain
+
+def _read_chain(key, path: Path, ttl: float = None):
+    """Chain from an .npz file (memory-cached under `key`), or None if missing/stale"""
+    with _lock:
+        if key in _memory_cache:
+            chain, written_at = _memory_cache[key]
+            if ttl is None or not _is_stale(written_at, ttl):
+                return chain
+            del _memory_cache[key]
+
+    try:
+        written_at = path.stat().st_mtime
+        if ttl is not None and _is_stale(written_at, ttl):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            chain = _from_columns(data)
+    except (OSError, ValueError, KeyError):
+        return None
+
+    with _lock:
+        _memory_cache[key] = (chain, written_at)
+    return chain
+
+def _write_chain(key, path: Path, chain):
+    """Write a chain to `path` atomically"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npz")
+    np.savez_compressed(tmp_path, **_to_columns(chain))
+    os.replace(tmp_path, path)
+
+    with _lock:
+        _memory_cache[key] = (chain, time.time())
+
+def load_cached_chain(symbol: str, ttl: float = CACHE_TTL_SECONDS):
+    """Return a cached chain for today's trading date, or None if missing/stale"""
+    path = cache_path(symbol)
+    return _read_chain((symbol, path.name), path, ttl)
+
+def store_chain(symbol: str, chain):
+    """Write a chain to the cache atomically"""
+    path = cache_path(symbol)
+    _write_chain((symbol, path.name), path, chain)
+
+def recorded_chain_path(symbol: str, recording) -> Path:
+    return recording_chains_dir(recording) / cache_path(symbol).name
+
+def load_recorded_chain(symbol: str, recording):
+    """Chain snapshot saved alongside a recording, or None (recordings never go stale)"""
+    path = recorded_chain_path(symbol, recording)
+    return _read_chain((symbol, str(path)), path)
+
+def record_chain(symbol: str, chain, recording):
+    """Snapshot a chain next to a recording, once per symbol per trading date"""
+    path = recorded_chain_path(symbol, recording)
+    if not path.exists():
+        _write_chain((symbol, str(path)), path, chain)
+
+def invalidate(symbol: str = None):
+    """Drop cached chains for one symbol, or all symbols when None"""
+    with _lock:
+        for key in [k for k in _memory_cache if symbol is None or k[0] == symbol]:
+            del _memory_cache[key]
+
+    if not CACHE_DIR.exists():
+        return
+    # Exactly <safe symbol>_<date>.npz, so BRK never matches BRK_B's files
+    name = None if symbol is None else re.compile(re.escape(safe_symbol(symbol)) + r"_\d{4}-\d{2}-\d{2}\.npz")
+    for path in CACHE_DIR.glob("*.npz"):
+        if name is None or name.fullmatch(path.name):
+            path.unlink(missing_ok=True)
+
+def get_option_chain(sess, symbol: str, ttl: float = CACHE_TTL_SECONDS, refresh: bool = False):
+    """Cached drop-in for tastytrade.instruments.get_option_chain"""
+    if replay_path():
+        chain = _replayed_chain(symbol)
+    elif simulated():
+        # Synthetic chains are deterministic and cheap to rebuild; keep them out of the cache
+        chain = sim_option_chain(symbol, trading_date())
+    else:
+        chain = None if refresh else load_cached_chain(symbol, ttl)
+        if chain is None:
+            chain = _fetch_chain(sess, symbol)
+
+    if chain and record_path():
+        try:
+            record_chain(symbol, chain, record_path())
+        except OSError as e:
+            print(f"  ⚠️ Chain snapshot failed for {symbol}: {e}")
+    return chain
+
+def _replayed_chain(symbol: str):
+    # The recording's own snapshot, then the cache (recordings made before snapshots existed)
+    chain = load_recorded_chain(symbol, replay_path())
+    if chain is None:
+        chain = load_cached_chain(symbol)
+    if chain is None and simulated():
+        chain = sim_option_chain(symbol, trading_date())
+    if chain is None:
+        # Replays are offline (get_session() returns None), so a miss can't be fetched
+        raise LookupError(f"{symbol} chain not in recording/cache for {trading_date().isoformat()} "
+                          f"(expected {recorded_chain_path(symbol, replay_path())})")
+    return chain
+
+def _fetch_chain(sess, symbol: str):
+    from tastytrade.instruments import get_option_chain as fetch_option_chain
+    chain = fetch_option_chain(sess, symbol)
+    if chain:
+        try:
+            store_chain(symbol, chain)
+        except OSError as e:
+            print(f"  ⚠️ Chain cache write failed for {symbol}: {e}")
+    return chain
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "--clear":
+        invalidate(sys.argv[2] if len(sys.argv) > 2 else None)
+        print("🧹 Chain cache cleared")
+    else:
+        files = sorted(CACHE_DIR.glob("*.npz")) if CACHE_DIR.exists() else []
+        print(f"📦 {len(files)} cached chains in {CACHE_DIR}/")
+        for path in files:
+            print(f"  {path.name} ({path.stat().st_size:,} bytes)")
@@ -0,0 +1,175 @@
+# columnar.py - Columnar Contract & Greeks Store
+"""
+Binary one-row-per-contract tables written next to options_contracts_*.json
+and greeks_data_*.json (see greeks_store.py). Each table is a
+<artifact>.columns/ directory with one .npy file per column plus meta.json,
+so readers memory-map only the columns they touch instead of parsing the
+whole JSON document.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+import numpy as np
+
+TABLE_VERSION = 1
+
+CONTRACT_COLUMNS = (
+    "ticker", "sector", "current_price", "liquidity_score", "expiration", "dte",
+    "strike", "option_type", "symbol", "streamer_symbol", "distance_from_current", "moneyness"
+)
+# Per-contract keys of an options_contracts record (the rest is per ticker/expiration)
+CONTRACT_FIELDS = ("symbol", "streamer_symbol", "strike", "option_type", "dte", "distance_from_current", "moneyness")
+
+STRING_COLUMNS = {"ticker", "sector", "expiration", "expiration_date", "option_type", "symbol",
+                  "streamer_symbol", "moneyness", "timestamp", "premium_quality", "iv_rank"}
+INT_COLUMNS = {"dte", "ticker_id", "contract_id"}
+BOOL_COLUMNS = {"suitable_for_selling"}
+
+class ColumnTable:
+    """Read-only table of equal-length column arrays (memory-mapped when loaded)"""
+
+    def __init__(self, columns, meta=None):
+        self.columns = columns
+        self.meta = meta or {}
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def row(self, index):
+        """One row as a {column: python value} dict"""
+        return {name: column[index].item() for name, column in self.columns.items()}
+
+def columns_path(artifact) -> Path:
+    return Path(artifact).with_suffix(".columns")
+
+def table_is_current(artifact) -> bool:
+    """True when the artifact's table exists and is at least as new as its JSON export"""
+    json_path = Path(artifact)
+    meta_path = columns_path(json_path) / "meta.json"
+    if not meta_path.exists():
+        return False
+    try:
+        return not json_path.exists() or meta_path.stat().st_mtime >= json_path.stat().st_mtime
+    except OSError:
+        return False
+
+def _column_array(name, values):
+    if name in STRING_COLUMNS:
+        return np.array(["" if v is None else str(v) for v in values], dtype=str)
+    if name in INT_COLUMNS:
+        return np.array([int(v) if v is not None else -1 for v in values], dtype=np.int32)
+    if name in BOOL_COLUMNS:
+        return np.array([bool(v) for v in values], dtype=bool)
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+def write_table(path, columns, meta=None):
+    """Write {name: values} as one .npy per column, replacing any old table atomically"""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir()
+
+    arrays = {name: _column_array(name, values) for name, values in columns.items()}
+    for name, array in arrays.items():
+        np.save(tmp_path / f"{name}.npy", array, allow_pickle=False)
+    with open(tmp_path / "meta.json", "w") as f:
+        json.dump({"version": TABLE_VERSION, "columns": list(arrays), "meta": meta or {}}, f)
+
+    # Directories can't be os.replace()d over a non-empty target
+    old_path = path.with_name(f"{path.name}.{os.getpid()}.old")
+    if path.exists():
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return path
+
+def read_table(path, columns=None, mmap=True):
+    """Load a table; only the requested columns are opened"""
+    path = Path(path)
+    with open(path / "meta.json", "r") as f:
+        header = json.load(f)
+    if header.get("version") != TABLE_VERSION:
+        raise ValueError(f"{path} has table version {header.get('version')}, expected {TABLE_VERSION}")
+
+    names = header["columns"] if columns is None else [c for c in columns if c in header["columns"]]
+    arrays = {
+        name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None, allow_pickle=False)
+        for name in names
+    }
+    return ColumnTable(arrays, header["meta"])
+
+def contracts_to_columns(contracts_data):
+    """Flatten options_contracts contracts_by_ticker into one row per contract"""
+    columns = {name: [] for name in CONTRACT_COLUMNS}
+    for ticker, ticker_data in contracts_data["contracts_by_ticker"].items():
+        for exp_date, exp_data in ticker_data["expiration_dates"].items():
+            for contract in exp_data["contracts"]:
+                row = {
+                    **contract,
+                    "ticker": ticker,
+                    "sector": ticker_data.get("sector"),
+                    "current_price": ticker_data.get("current_price"),
+                    "liquidity_score": ticker_data.get("liquidity_score"),
+                    "expiration": exp_date,
+                }
+                for name in CONTRACT_COLUMNS:
+                    columns[name].append(row.get(name))
+    return columns
+
+def save_contracts_table(contracts_data, artifact):
+    """Columnar copy of an options_contracts_{mode}.json payload"""
+    meta = {k: v for k, v in contracts_data.items() if k != "contracts_by_ticker"}
+    meta["ticker_summaries"] = {
+        ticker: {k: v for k, v in ticker_data.items() if k != "expiration_dates"}
+        for ticker, ticker_data in contracts_data["contracts_by_ticker"].items()
+    }
+    meta["expiration_summaries"] = {
+        ticker: {exp_date: {k: v for k, v in exp_data.items() if k != "contracts"}
+                 for exp_date, exp_data in ticker_data["expiration_dates"].items()}
+        for ticker, ticker_data in contracts_data["contracts_by_ticker"].items()
+    }
+    return write_table(columns_path(artifact), contracts_to_columns(contracts_data), meta)
+
+def contracts_from_table(table):
+    """Rebuild the options_contracts payload (plain Python values) from its table"""
+    meta = dict(table.meta)
+    tickers, expirations = meta.pop("ticker_summaries"), meta.pop("expiration_summaries")
+    contracts_by_ticker = {
+        ticker: {**summary, "expiration_dates": {exp_date: {**exp_summary, "contracts": []}
+                                                 for exp_date, exp_summary in expirations[ticker].items()}}
+        for ticker, summary in tickers.items()
+    }
+    columns = [table[name].tolist() for name in ("ticker", "expiration") + CONTRACT_FIELDS]
+    for ticker, exp_date, *values in zip(*columns):
+        contracts_by_ticker[ticker]["expiration_dates"][exp_date]["contracts"].append(dict(zip(CONTRACT_FIELDS, values)))
+    return {**meta, "contracts_by_ticker": contracts_by_ticker}
+
+def load_contracts_data(mode, directory="."):
+    """Load options_contracts for a mode, preferring the columnar table when it is current"""
+    json_path = Path(directory) / f"options_contracts_{mode}.json"
+    if table_is_current(json_path):
+        try:
+            return contracts_from_table(read_table(columns_path(json_path)))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Could not read {columns_path(json_path)}: {e}")
+
+    with open(json_path, "r") as f:
+        return json.load(f)
+
+if __name__ == "__main__":
+    import sys
+    for artifact in sys.argv[1:] or ["greeks_data_gpt.json", "greeks_data_grok.json"]:
+        path = columns_path(artifact)
+        if not path.exists():
+            print(f"⚠️ {path} not found")
+            continue
+        table = read_table(path)
+        size = sum(p.stat().st_size for p in path.glob("*.npy"))
+        print(f"📦 {path}: {len(table):,} rows, {len(table.columns)} columns, {size:,} bytes")
@@ -11,9 +11,11 @@ Uses live Greeks data from TastyTrade for accurate IV values.
 import asyncio
 import json
 from datetime import datetime, timezone
-from tastytrade import Session, DXLinkStreamer
 from tastytrade.dxfeed import Greeks
-from config import USERNAME, PASSWORD
+from session_provider import get_session
+from streaming import collect_events, create_streamer
+from quote_book import GREEKS, QuoteBook
+from symbol_registry import SymbolRegistry
 
 async def collect_iv_data(mode, verbose=True):
     """Collect IV data for all options contracts in a mode"""
@@ -31,91 +33,89 @@ async def collect_iv_data(mode, verbose=True):
     
     # Extract all contract symbols
     all_symbols = []
-    symbol_to_ticker = {}
+    registry = SymbolRegistry()
     
     for ticker, ticker_data in contracts_data["contracts_by_ticker"].items():
         for exp_data in ticker_data["expiration_dates"].values():
             for contract in exp_data["contracts"]:
                 symbol = contract["streamer_symbol"]
                 all_symbols.append(symbol)
-                symbol_to_ticker[symbol] = ticker
+                registry.intern(symbol, ticker)
     
     if verbose:
         print(f"🎯 Collecting IV for {len(all_symbols):,} contracts...")
     
-    sess = Session(USERNAME, PASSWORD)
-    iv_data = {}
+    sess = get_session()
+    book = QuoteBook(registry=registry)
     
     # Process in batches to avoid overwhelming the connection
     batch_size = 800
     total_collected = 0
     
-    async with DXLinkStreamer(sess) as streamer:
-        for batch_start in range(0, len(all_symbols), batch_size):
-            batch_end = min(batch_start + batch_size, len(all_symbols))
-            batch_symbols = all_symbols[batch_start:batch_end]
-            
+    batches = registry.batches(batch_size)
+    
+    async with create_streamer(sess) as streamer:
+        for batch_num, batch_symbols in enumerate(batches):
             if verbose:
-                batch_num = batch_start // batch_size + 1
-                total_batches = (len(all_symbols) + batch_size - 1) // batch_size
-                print(f"\n📦 Processing batch {batch_num}/{total_batches}")
-                print(f"    Symbols {batch_start + 1} to {batch_end} of {len(all_symbols):,}")
+                batch_start = batch_num * batch_size
+                print(f"\n📦 Processing batch {batch_num + 1}/{len(batches)}")
+                print(f"    Symbols {batch_start + 1} to {batch_start + len(batch_symbols)} of {len(all_symbols):,}")
             
-            # Subscribe to this batch
-            await streamer.subscribe(Greeks, batch_symbols)
+            batch_start_count = book.greeks_count
             
-            # Collect data for this batch
-            batch_collected = 0
-            start_time = asyncio.get_event_loop().time()
-            no_data_timeout = 0
-            
-            # Collect for up to 45 seconds per batch
-            while (asyncio.get_event_loop().time() - start_time) < 45 and no_data_timeout < 8:
-                try:
-                    greeks = await asyncio.wait_for(streamer.get_event(Greeks), timeout=1.5)
-                    
-                    if greeks and greeks.event_symbol in batch_symbols:
-                        # Only collect if we haven't seen this symbol yet
-                        if greeks.event_symbol not in iv_data:
-                            iv = float(greeks.volatility or 0)
-                            
-                            if iv > 0:  # Valid IV
-                                iv_data[greeks.event_symbol] = {
-                                    'symbol': greeks.event_symbol,
-                                    'ticker': symbol_to_ticker[greeks.event_symbol],
-                                    'iv': round(iv, 4),
-                                    'delta': round(float(greeks.delta or 0), 4),
-                                    'theta': round(float(greeks.theta or 0), 4),
-                                    'gamma': round(float(greeks.gamma or 0), 4),
-                                    'vega': round(float(greeks.vega or 0), 4),
-                                    'collected_at': datetime.now(timezone.utc).isoformat()
-                                }
-                                
-                                batch_collected += 1
-                                total_collected += 1
-                                no_data_timeout = 0  # Reset timeout
-                                
-                                if verbose and batch_collected % 100 == 0:
-                                    print(f"      📊 Batch progress: {batch_collected} IVs collected")
+            def on_greeks(greeks):
+                # Only collect if we haven't seen this symbol yet
+                sid = registry.dispatch(greeks.event_symbol, batch_num)
+                if sid is None or book.has(sid, GREEKS):
+                    return False
+                if float(greeks.volatility or 0) <= 0:  # Invalid IV
+                    return False
+                book.apply_greeks(greeks, sid)
                 
-                except asyncio.TimeoutError:
-                    no_data_timeout += 1
-                    continue
-                except Exception as e:
-                    if verbose:
-                        print(f"      ⚠️ Greeks error: {e}")
-                    continue
+                batch_collected = book.greeks_count - batch_start_count
+                if verbose and batch_collected % 100 == 0:
+                    print(f"      📊 Batch progress: {batch_collected} IVs collected")
+                return True
             
-            if verbose:
-                elapsed = asyncio.get_event_loop().time() - start_time
-                print(f"      ✅ Batch complete: {batch_collected} IVs in {elapsed:.1f}s")
+            def batch_complete(elapsed):
+                return book.greeks_count - batch_start_count >= len(batch_symbols)
             
-            # Unsubscribe from this batch
-            await streamer.unsubscribe(Greeks, batch_symbols)
+            # Collect for up to 45 seconds per batch, stop after 12s without new IVs
+            collector = await collect_events(
+                streamer,
+                {Greeks: batch_symbols},
+                {Greeks: on_greeks},
+                done=batch_complete,
+                timeout=45,
+                idle_timeout=12
+            )
+            
+            batch_collected = book.greeks_count - batch_start_count
+            total_collected += batch_collected
+            
+            if verbose:
+                print(f"      ✅ Batch complete: {batch_collected} IVs in {collector.elapsed:.1f}s")
             
             # Brief pause between batches
             await asyncio.sleep(0.5)
     
+    # Build IV records from the book (rounding and timestamps once per symbol)
+    iv_data = {}
+    rows = book.snapshot()
+    for sid, symbol in enumerate(book.symbols):
+        if not rows["seen"][sid] & GREEKS:
+            continue
+        iv_data[symbol] = {
+            'symbol': symbol,
+            'ticker': registry.tickers[sid],
+            'iv': round(float(rows["iv"][sid]), 4),
+            'delta': round(float(rows["delta"][sid]), 4),
+            'theta': round(float(rows["theta"][sid]), 4),
+            'gamma': round(float(rows["gamma"][sid]), 4),
+            'vega': round(float(rows["vega"][sid]), 4),
+            'collected_at': datetime.fromtimestamp(int(rows["updated_ns"][sid]) / 1e9, timezone.utc).isoformat()
+        }
+    
     # Organize results by ticker
     iv_by_ticker = {}
     for symbol, data in iv_data.items():
@@ -13,9 +13,10 @@ import json
 import numpy as np
 from datetime import datetime, timezone
 from collections import defaultdict
-from tastytrade import Session, DXLinkStreamer
 from tastytrade.dxfeed import Summary
-from config import USERNAME, PASSWORD
+from session_provider import get_session
+from streaming import collect_events, create_streamer
+from symbol_registry import SymbolRegistry
 
 def calculate_liquidity_score(open_interest, volume, spread, spread_pct, ticker):
     """Calculate comprehensive liquidity score (0-100)"""
@@ -97,51 +98,43 @@ async def analyze_iv_liquidity(mode, verbose=True):
     if verbose:
         print(f"🎯 Analyzing {len(symbols_with_data):,} contracts with complete data...")
     
-    sess = Session(USERNAME, PASSWORD)
+    sess = get_session()
     summary_data = {}
     
-    # Convert to list for batching
-    symbols_list = list(symbols_with_data)
-    batch_size = 500
+    # Intern symbols once and split into batches
+    registry = SymbolRegistry(symbols_with_data)
+    batches = registry.batches(500)
     
-    async with DXLinkStreamer(sess) as streamer:
-        for batch_start in range(0, len(symbols_list), batch_size):
-            batch_end = min(batch_start + batch_size, len(symbols_list))
-            batch_symbols = symbols_list[batch_start:batch_end]
-            
+    async with create_streamer(sess) as streamer:
+        for batch_num, batch_symbols in enumerate(batches):
             if verbose:
-                batch_num = batch_start // batch_size + 1
-                total_batches = (len(symbols_list) + batch_size - 1) // batch_size
-                print(f"\n📦 Batch {batch_num}/{total_batches} - Getting Summary data")
-            
-            # Subscribe to Summary
-            await streamer.subscribe(Summary, batch_symbols)
+                print(f"\n📦 Batch {batch_num + 1}/{len(batches)} - Getting Summary data")
             
             # Collect Summary data
             batch_summary = {}
-            start_time = asyncio.get_event_loop().time()
-            no_data_timeout = 0
             
-            while (asyncio.get_event_loop().time() - start_time) < 30 and no_data_timeout < 5:
-                try:
-                    summary = await asyncio.wait_for(streamer.get_event(Summary), timeout=1.0)
-                    
-                    if summary and summary.event_symbol in batch_symbols:
-                        if summary.event_symbol not in batch_summary:
-                            batch_summary[summary.event_symbol] = {
-                                "open_interest": int(summary.open_interest or 0),
-                                "volume": int(summary.prev_day_volume or 0),
-                                "day_high": float(summary.day_high_price or 0),
-                                "day_low": float(summary.day_low_price or 0)
-                            }
-                            no_data_timeout = 0
-                
-                except asyncio.TimeoutError:
-                    no_data_timeout += 1
-                    continue
+            def on_summary(summary):
+                if registry.dispatch(summary.event_symbol, batch_num) is None or summary.event_symbol in batch_summary:
+                    return False
+                batch_summary[summary.event_symbol] = {
+                    "open_interest": int(summary.open_interest or 0),
+                    "volume": int(summary.prev_day_volume or 0),
+                    "day_high": float(summary.day_high_price or 0),
+                    "day_low": float(summary.day_low_price or 0)
+                }
+                return True
+            
+            def batch_complete(elapsed):
+                return len(batch_summary) >= len(batch_symbols)
             
-            # Unsubscribe
-            await streamer.unsubscribe(Summary, batch_symbols)
+            await collect_events(
+                streamer,
+                {Summary: batch_symbols},
+                {Summary: on_summary},
+                done=batch_complete,
+                timeout=30,
+                idle_timeout=5
+            )
             
             summary_data.update(batch_summary)
             
@@ -12,9 +12,11 @@ import asyncio
 import json
 from datetime import datetime, timezone
 from collections import defaultdict
-from tastytrade import Session, DXLinkStreamer
 from tastytrade.dxfeed import Quote
-from config import USERNAME, PASSWORD
+from session_provider import get_session
+from streaming import collect_events, create_streamer
+from quote_book import QUOTE, QuoteBook
+from symbol_registry import SymbolRegistry
 
 async def collect_market_prices(mode, verbose=True):
     """Collect market prices for all options contracts"""
@@ -32,109 +34,99 @@ async def collect_market_prices(mode, verbose=True):
     
     # Extract all contract symbols
     all_symbols = []
-    symbol_info = {}
+    registry = SymbolRegistry()
     
     for ticker, ticker_data in contracts_data["contracts_by_ticker"].items():
         for exp_data in ticker_data["expiration_dates"].values():
             for contract in exp_data["contracts"]:
                 symbol = contract["streamer_symbol"]
                 all_symbols.append(symbol)
-                symbol_info[symbol] = {
+                registry.intern(symbol, ticker, {
                     "ticker": ticker,
                     "strike": contract["strike"],
                     "type": contract["option_type"],
                     "dte": contract["dte"]
-                }
+                })
     
     if verbose:
         print(f"🎯 Getting prices for {len(all_symbols):,} contracts...")
     
-    sess = Session(USERNAME, PASSWORD)
-    market_prices = {}
+    sess = get_session()
+    book = QuoteBook(registry=registry)
     
     # Process in batches
     batch_size = 500
     total_collected = 0
     
-    async with DXLinkStreamer(sess) as streamer:
-        for batch_start in range(0, len(all_symbols), batch_size):
-            batch_end = min(batch_start + batch_size, len(all_symbols))
-            batch_symbols = all_symbols[batch_start:batch_end]
-            
+    batches = registry.batches(batch_size)
+    
+    async with create_streamer(sess) as streamer:
+        for batch_num, batch_symbols in enumerate(batches):
             if verbose:
-                batch_num = batch_start // batch_size + 1
-                total_batches = (len(all_symbols) + batch_size - 1) // batch_size
-                print(f"\n📦 Batch {batch_num}/{total_batches} ({len(batch_symbols)} symbols)")
+                print(f"\n📦 Batch {batch_num + 1}/{len(batches)} ({len(batch_symbols)} symbols)")
             
-            # Subscribe to quotes
-            await streamer.subscribe(Quote, batch_symbols)
+            batch_start_count = book.quote_count
             
-            # Collect prices for this batch
-            batch_prices = {}
-            start_time = asyncio.get_event_loop().time()
-            last_report = start_time
+            def on_quote(quote):
+                # Only save first valid quote per symbol
+                sid = registry.dispatch(quote.event_symbol, batch_num)
+                if sid is None or book.has(sid, QUOTE):
+                    return False
+                return book.apply_quote(quote, sid)
             
-            while (asyncio.get_event_loop().time() - start_time) < 30:
-                now = asyncio.get_event_loop().time()
-                
-                # Progress report
-                if verbose and now - last_report >= 5:
-                    print(f"    📊 Batch progress: {len(batch_prices)}/{len(batch_symbols)} prices")
-                    last_report = now
-                
-                # Check if we have all prices
-                if len(batch_prices) >= len(batch_symbols):
-                    if verbose:
-                        print(f"    ✅ All prices collected for batch!")
-                    break
-                
-                try:
-                    quote = await asyncio.wait_for(streamer.get_event(Quote), timeout=1.0)
-                    
-                    if quote and quote.event_symbol in batch_symbols:
-                        # Only save first valid quote per symbol
-                        if quote.event_symbol not in batch_prices:
-                            bid = float(quote.bid_price or 0)
-                            ask = float(quote.ask_price or 0)
-                            
-                            if bid > 0 and ask > 0 and ask >= bid:
-                                info = symbol_info[quote.event_symbol]
-                                
-                                batch_prices[quote.event_symbol] = {
-                                    "symbol": quote.event_symbol,
-                                    "ticker": info["ticker"],
-                                    "strike": info["strike"],
-                                    "type": info["type"],
-                                    "dte": info["dte"],
-                                    "bid": round(bid, 4),
-                                    "ask": round(ask, 4),
-                                    "mid": round((bid + ask) / 2, 4),
-                                    "spread": round(ask - bid, 4),
-                                    "spread_pct": round(100 * (ask - bid) / ((bid + ask) / 2), 3) if (bid + ask) > 0 else 0,
-                                    "timestamp": datetime.now(timezone.utc).isoformat()
-                                }
-                                total_collected += 1
-                
-                except asyncio.TimeoutError:
-                    continue
-                except Exception as e:
-                    if verbose:
-                        print(f"    ⚠️ Quote error: {e}")
-                    continue
+            def batch_collected():
+                return book.quote_count - batch_start_count
             
-            # Unsubscribe from batch
-            await streamer.unsubscribe(Quote, batch_symbols)
+            def report(elapsed):
+                if verbose:
+                    print(f"    📊 Batch progress: {batch_collected()}/{len(batch_symbols)} prices")
             
-            # Merge batch results
-            market_prices.update(batch_prices)
+            def all_prices_in(elapsed):
+                return batch_collected() >= len(batch_symbols)
+            
+            # Collect prices for this batch
+            collector = await collect_events(
+                streamer,
+                {Quote: batch_symbols},
+                {Quote: on_quote},
+                done=all_prices_in,
+                timeout=30,
+                progress=report,
+                progress_every=5
+            )
+            total_collected += batch_collected()
+            
+            if verbose and collector.stop_reason == "coverage":
+                print(f"    ✅ All prices collected for batch!")
             
             if verbose:
-                elapsed = asyncio.get_event_loop().time() - start_time
-                print(f"    ✅ Batch complete: {len(batch_prices)} prices in {elapsed:.1f}s")
+                print(f"    ✅ Batch complete: {batch_collected()} prices in {collector.elapsed:.1f}s")
             
             # Brief pause between batches
             await asyncio.sleep(0.5)
     
+    # Build price records from the book (rounding and timestamps once per symbol)
+    market_prices = {}
+    rows = book.snapshot()
+    for sid, symbol in enumerate(book.symbols):
+        if not rows["seen"][sid] & QUOTE:
+            continue
+        bid, ask, mid = float(rows["bid"][sid]), float(rows["ask"][sid]), float(rows["mid"][sid])
+        info = registry.records[sid]
+        market_prices[symbol] = {
+            "symbol": symbol,
+            "ticker": info["ticker"],
+            "strike": info["strike"],
+            "type": info["type"],
+            "dte": info["dte"],
+            "bid": round(bid, 4),
+            "ask": round(ask, 4),
+            "mid": round(mid, 4),
+            "spread": round(ask - bid, 4),
+            "spread_pct": round(100 * (ask - bid) / mid, 3) if mid > 0 else 0,
+            "timestamp": datetime.fromtimestamp(int(rows["updated_ns"][sid]) / 1e9, timezone.utc).isoformat()
+        }
+    
     # Organize by ticker
     prices_by_ticker = defaultdict(list)
     for symbol, price_data in market_prices.items():
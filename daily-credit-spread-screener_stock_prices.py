@@ -12,10 +12,11 @@ import asyncio
 import json
 import time
 from datetime import datetime, timezone
-from tastytrade import Session, DXLinkStreamer
 from tastytrade.dxfeed import Quote
-from config import USERNAME, PASSWORD
+from session_provider import get_session
 from sectors import PerfTimer
+from streaming import create_streamer
+from symbol_registry import SymbolRegistry
 
 async def collect_final_stock_prices(timeout=5):
     """Collect prices for final 18 tickers only"""
@@ -34,17 +35,18 @@ async def collect_final_stock_prices(timeout=5):
     print(f"🎯 Getting prices for {len(target_tickers)} final tickers")
     print(f"📋 Tickers: {', '.join(target_tickers)}")
     
-    sess = Session(USERNAME, PASSWORD)
+    sess = get_session()
     stock_prices = {}
     events_received = 0
     
     with PerfTimer("Final stock price collection"):
-        async with DXLinkStreamer(sess) as streamer:
+        async with create_streamer(sess) as streamer:
             print("📡 Subscribing to quotes...")
             await streamer.subscribe(Quote, target_tickers)
             
             start_time = time.time()
             collected = set()
+            registry = SymbolRegistry(target_tickers)
             
             while time.time() - start_time < timeout:
                 elapsed = time.time() - start_time
@@ -63,7 +65,7 @@ async def collect_final_stock_prices(timeout=5):
                     quote = await asyncio.wait_for(streamer.get_event(Quote), timeout=0.3)
                     events_received += 1
                     
-                    if quote and quote.event_symbol in target_tickers and quote.event_symbol not in collected:
+                    if quote and quote.event_symbol in registry and quote.event_symbol not in collected:
                         bid, ask = float(quote.bid_price or 0), float(quote.ask_price or 0)
                         
                         if bid > 0 and ask > 0 and ask >= bid:
@@ -7,43 +7,113 @@ import asyncio
 import json
 from datetime import datetime, timezone
 from collections import defaultdict
-from tastytrade import Session, DXLinkStreamer
-from tastytrade.dxfeed import Quote, Greeks
-from config import USERNAME, PASSWORD
+from session_provider import get_session
 from sectors import PerfTimer
+from tracing import span
+from streaming import collect_events, event_types, open_streamer
+from columnar import columns_path, load_contracts_data
+from greeks_store import OPTIONAL_MARKET_FIELDS, normalize_greeks_data, save_greeks_table
+from quote_book import BOOK_FIELDS, GREEKS, QUOTE, QuoteBook
+from symbol_registry import SymbolRegistry
 
-async def collect_greeks_for_credit_spreads(mode, verbose=True):
-    """Collect Greeks and pricing for all option contracts"""
-    if verbose:
-        print(f"🧮 Collecting Greeks for Credit Spreads - {mode.upper()}")
-        print("=" * 70)
-    
-    # Load options contracts from previous step
-    try:
-        with open(f"options_contracts_{mode}.json", "r") as f:
-            contracts_data = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ options_contracts_{mode}.json not found. Run options_chains.py first.")
-        return None
-    
-    contracts_by_ticker = contracts_data["contracts_by_ticker"]
-    
-    if not contracts_by_ticker:
-        print(f"❌ No contracts found in options_contracts_{mode}.json")
+Quote, Greeks, _ = event_types()
+
+QUOTE_FIELDS = ("bid", "ask", "mid", "spread", "spread_pct")
+GREEK_FIELDS = ("delta", "theta", "gamma", "vega", "rho", "iv", "price")
+
+def split_market_data(market_data):
+    """Split a combined market_data record back into quote and Greeks parts and its timestamp.
+
+    Quote extras (open_interest, volume) stay with the quote part, as
+    assemble_greeks_data expects them. Without both bid and ask there is
+    no quote, so the quote part is empty.
+    """
+    quote_data = {}
+    if "bid" in market_data and "ask" in market_data:
+        quote_data = {k: market_data[k] for k in QUOTE_FIELDS + OPTIONAL_MARKET_FIELDS if k in market_data}
+    greek_data = {k: market_data[k] for k in GREEK_FIELDS if k in market_data}
+    return quote_data, greek_data, market_data.get("timestamp")
+
+def quote_fields(quote):
+    """Pricing fields from a Quote event, or None if the market is invalid"""
+    return price_fields(float(quote.bid_price or 0), float(quote.ask_price or 0))
+
+def price_fields(bid, ask):
+    """Rounded bid/ask/mid/spread fields, or None if the market is invalid"""
+    if not (bid > 0 and ask > 0 and ask >= bid):
         return None
+    mid = (bid + ask) / 2
+    return {
+        "bid": round(bid, 4),
+        "ask": round(ask, 4),
+        "mid": round(mid, 4),
+        "spread": round(ask - bid, 4),
+        "spread_pct": round(100 * (ask - bid) / mid, 2) if mid > 0 else 0
+    }
+
+def greek_fields(greek):
+    """Delta, theta, gamma, vega, rho, IV and model price from a Greeks event"""
+    return greek_values(float(greek.delta or 0), float(greek.theta or 0), float(greek.gamma or 0),
+                        float(greek.vega or 0), float(greek.rho or 0), float(greek.volatility or 0),
+                        float(greek.price or 0))
+
+def greek_values(delta, theta, gamma, vega, rho, iv, price):
+    """Rounded Greeks fields as stored in market_data"""
+    return {
+        "delta": round(delta, 4),
+        "theta": round(theta, 4),
+        "gamma": round(gamma, 6),
+        "vega": round(vega, 4),
+        "rho": round(rho, 4),
+        "iv": round(iv, 4),
+        "price": round(price, 4) if price else 0
+    }
+
+def credit_spread_metrics(quote_data, greek_data):
+    """Per-contract credit spread metrics from its quote and Greeks fields"""
+    delta = greek_data.get("delta", 0)
+    iv = greek_data.get("iv", 0)
+    mid_price = quote_data.get("mid", 0)
     
-    # Collect all option symbols for batch processing
+    return {
+        "pop_estimate": round(abs(delta) * 100, 1) if delta else 0,  # Rough PoP estimate
+        "premium_quality": "high" if mid_price >= 1.0 else "medium" if mid_price >= 0.5 else "low",
+        "iv_rank": "high" if iv >= 0.4 else "medium" if iv >= 0.25 else "low",
+        "theta_decay": abs(greek_data.get("theta", 0)),
+        "suitable_for_selling": (
+            mid_price >= 0.30 and  # Minimum premium
+            quote_data.get("spread_pct", 100) <= 15 and  # Reasonable spread
+            iv >= 0.15  # Minimum IV
+        ) if quote_data and greek_data else False
+    }
+
+def book_market_data(book):
+    """Rounded quote/Greeks dicts and last-update timestamps from a QuoteBook"""
+    rows = book.snapshot()
+    columns = {name: rows[name].tolist() for name in BOOK_FIELDS + ("updated_ns", "seen")}
+    quotes_data, greeks_data, timestamps = {}, {}, {}
+    for sid, symbol in enumerate(book.symbols):
+        seen = columns["seen"][sid]
+        if seen & QUOTE:
+            quotes_data[symbol] = price_fields(columns["bid"][sid], columns["ask"][sid])
+        if seen & GREEKS:
+            greeks_data[symbol] = greek_values(*(columns[name][sid] for name in
+                                                 ("delta", "theta", "gamma", "vega", "rho", "iv", "price")))
+        if seen:
+            timestamps[symbol] = datetime.fromtimestamp(columns["updated_ns"][sid] / 1e9, timezone.utc).isoformat()
+    return quotes_data, greeks_data, timestamps
+
+def contract_registry(contracts_by_ticker):
+    """All streamer symbols (in contract order) and a registry holding each one's contract record"""
     all_symbols = []
-    symbol_to_ticker = {}
-    symbol_to_contract_info = {}
+    registry = SymbolRegistry()
     
     for ticker, ticker_data in contracts_by_ticker.items():
         for exp_date, exp_data in ticker_data["expiration_dates"].items():
             for contract in exp_data["contracts"]:
                 symbol = contract["streamer_symbol"]
                 all_symbols.append(symbol)
-                symbol_to_ticker[symbol] = ticker
-                symbol_to_contract_info[symbol] = {
+                registry.intern(symbol, ticker, {
                     "ticker": ticker,
                     "sector": ticker_data["sector"],
                     "current_price": ticker_data["current_price"],
@@ -54,134 +124,31 @@ async def collect_greeks_for_credit_spreads(mode, verbose=True):
                     "expiration_date": exp_date,
                     "moneyness": contract["moneyness"],
                     "distance_from_current": contract["distance_from_current"]
-                }
-    
-    if verbose:
-        print(f"📊 Collecting data for {len(all_symbols):,} option contracts")
-        print(f"🏢 Across {len(contracts_by_ticker)} tickers")
-    
-    sess = Session(USERNAME, PASSWORD)
-    
-    # Collect market data in batches
-    quotes_data = {}
-    greeks_data = {}
-    batch_size = 800  # Process in manageable batches
-    total_batches = (len(all_symbols) + batch_size - 1) // batch_size
-    
-    with PerfTimer(f"{mode.upper()} Greeks collection"):
-        async with DXLinkStreamer(sess) as streamer:
-            for batch_num in range(total_batches):
-                start_idx = batch_num * batch_size
-                end_idx = min(start_idx + batch_size, len(all_symbols))
-                batch_symbols = all_symbols[start_idx:end_idx]
-                
-                if verbose:
-                    print(f"\n📦 Batch {batch_num + 1}/{total_batches}: {len(batch_symbols)} symbols")
-                
-                # Subscribe to both quotes and Greeks
-                await streamer.subscribe(Quote, batch_symbols)
-                await streamer.subscribe(Greeks, batch_symbols)
-                
-                batch_quotes = {}
-                batch_greeks = {}
-                start_time = asyncio.get_event_loop().time()
-                no_data_timeout = 0
-                
-                # Collect data for this batch
-                while (asyncio.get_event_loop().time() - start_time) < 25 and no_data_timeout < 15:
-                    try:
-                        # Collect quotes (bid/ask/mid pricing)
-                        quote = await asyncio.wait_for(streamer.get_event(Quote), timeout=0.4)
-                        if quote and quote.event_symbol in batch_symbols:
-                            bid, ask = float(quote.bid_price or 0), float(quote.ask_price or 0)
-                            if bid > 0 and ask > 0 and ask >= bid:
-                                mid = (bid + ask) / 2
-                                batch_quotes[quote.event_symbol] = {
-                                    "bid": round(bid, 4),
-                                    "ask": round(ask, 4),
-                                    "mid": round(mid, 4),
-                                    "spread": round(ask - bid, 4),
-                                    "spread_pct": round(100 * (ask - bid) / mid, 2) if mid > 0 else 0
-                                }
-                                no_data_timeout = 0
-                    except asyncio.TimeoutError:
-                        pass
-                    
-                    try:
-                        # Collect Greeks (delta, theta, gamma, vega, IV)
-                        greek = await asyncio.wait_for(streamer.get_event(Greeks), timeout=0.4)
-                        if greek and greek.event_symbol in batch_symbols:
-                            batch_greeks[greek.event_symbol] = {
-                                "delta": round(float(greek.delta or 0), 4),
-                                "theta": round(float(greek.theta or 0), 4),
-                                "gamma": round(float(greek.gamma or 0), 6),
-                                "vega": round(float(greek.vega or 0), 4),
-                                "rho": round(float(greek.rho or 0), 4),
-                                "iv": round(float(greek.volatility or 0), 4),
-                                "price": round(float(greek.price or 0), 4) if greek.price else 0
-                            }
-                            no_data_timeout = 0
-                    except asyncio.TimeoutError:
-                        no_data_timeout += 1
-                        continue
-                    
-                    # Progress check
-                    quote_progress = len(batch_quotes) / len(batch_symbols) * 100
-                    greek_progress = len(batch_greeks) / len(batch_symbols) * 100
-                    
-                    # Early exit if good coverage
-                    if quote_progress >= 70 and greek_progress >= 60:
-                        if verbose:
-                            print(f"    ✅ Good coverage: {quote_progress:.0f}% quotes, {greek_progress:.0f}% Greeks")
-                        break
-                
-                # Unsubscribe from batch
-                await streamer.unsubscribe(Quote, batch_symbols)
-                await streamer.unsubscribe(Greeks, batch_symbols)
-                
-                # Merge batch results
-                quotes_data.update(batch_quotes)
-                greeks_data.update(batch_greeks)
-                
-                if verbose:
-                    elapsed = asyncio.get_event_loop().time() - start_time
-                    print(f"    📊 Collected {len(batch_quotes)} quotes, {len(batch_greeks)} Greeks in {elapsed:.1f}s")
-                
-                # Brief pause between batches
-                await asyncio.sleep(0.3)
+                })
+    return all_symbols, registry
+
+def assemble_greeks_data(mode, all_symbols, registry, quotes_data, greeks_data, timestamps):
+    """Normalized greeks_data from per-symbol quote/Greeks dicts and the registry's contract records
     
+    Extra keys in a quote dict (e.g. open_interest, volume) are kept in market_data.
+    """
     # Combine quotes and Greeks data with contract info
     complete_data = {}
     
     for symbol in all_symbols:
         if symbol in quotes_data or symbol in greeks_data:
-            contract_info = symbol_to_contract_info[symbol]
+            contract_info = registry.record(symbol)
             quote_data = quotes_data.get(symbol, {})
             greek_data = greeks_data.get(symbol, {})
             
-            # Calculate additional metrics for credit spreads
-            delta = greek_data.get("delta", 0)
-            iv = greek_data.get("iv", 0)
-            mid_price = quote_data.get("mid", 0)
-            
             complete_data[symbol] = {
                 **contract_info,
                 "market_data": {
                     **quote_data,
                     **greek_data,
-                    "timestamp": datetime.now(timezone.utc).isoformat()
+                    "timestamp": timestamps.get(symbol) or datetime.now(timezone.utc).isoformat()
                 },
-                "credit_spread_metrics": {
-                    "pop_estimate": round(abs(delta) * 100, 1) if delta else 0,  # Rough PoP estimate
-                    "premium_quality": "high" if mid_price >= 1.0 else "medium" if mid_price >= 0.5 else "low",
-                    "iv_rank": "high" if iv >= 0.4 else "medium" if iv >= 0.25 else "low",
-                    "theta_decay": abs(greek_data.get("theta", 0)),
-                    "suitable_for_selling": (
-                        mid_price >= 0.30 and  # Minimum premium
-                        quote_data.get("spread_pct", 100) <= 15 and  # Reasonable spread
-                        iv >= 0.15  # Minimum IV
-                    ) if quote_data and greek_data else False
-                }
+                "credit_spread_metrics": credit_spread_metrics(quote_data, greek_data)
             }
     
     # Organize data by ticker and calculate statistics
@@ -232,8 +199,8 @@ async def collect_greeks_for_credit_spreads(mode, verbose=True):
                 "otm_contracts": len([c for c in contracts if c["moneyness"] == "OTM"])
             }
     
-    # Create comprehensive output
-    result = {
+    # Create comprehensive output (normalized tables, see greeks_store.py)
+    header = {
         "mode": mode,
         "collection_timestamp": datetime.now(timezone.utc).isoformat(),
         "collection_stats": {
@@ -245,8 +212,6 @@ async def collect_greeks_for_credit_spreads(mode, verbose=True):
             "greeks_success_rate": round(len(greeks_data) / len(all_symbols) * 100, 1),
             "overall_success_rate": round(len(complete_data) / len(all_symbols) * 100, 1)
         },
-        "market_data": complete_data,
-        "by_ticker": dict(data_by_ticker),
         "credit_spread_summary": {
             "tickers_analyzed": len(data_by_ticker),
             "total_sellable_contracts": sum(
@@ -264,31 +229,163 @@ async def collect_greeks_for_credit_spreads(mode, verbose=True):
             ) if data_by_ticker else 0
         }
     }
+    return normalize_greeks_data(header, complete_data, data_by_ticker)
+
+def save_greeks_data(result, filename, columnar=True, export_json=True):
+    """Write greeks_data as compact JSON and/or a columnar table"""
+    if export_json:
+        # Compact: the tables are long column lists, indenting them triples the size
+        with open(filename, "w") as f:
+            json.dump(result, f, separators=(",", ":"))
+    # Table last: readers only trust it when it is at least as new as the JSON
+    if columnar:
+        save_greeks_table(result, filename)
+
+async def collect_greeks_for_credit_spreads(mode, verbose=True, contracts_data=None, streamer=None, save=True,
+                                            prefetched_market_data=None, columnar=True, export_json=True):
+    """Collect Greeks and pricing for all option contracts.
+    
+    prefetched_market_data: market_data from a run over a superset of these
+    contracts (e.g. the merged universe); when given nothing is streamed.
+    columnar/export_json: which formats save writes (see columnar.py).
+    """
+    if verbose:
+        print(f"🧮 Collecting Greeks for Credit Spreads - {mode.upper()}")
+        print("=" * 70)
+    
+    # Load options contracts from previous step (unless passed in memory)
+    if contracts_data is None:
+        try:
+            contracts_data = load_contracts_data(mode)
+        except FileNotFoundError:
+            print(f"❌ options_contracts_{mode}.json not found. Run options_chains.py first.")
+            return None
+    
+    contracts_by_ticker = contracts_data["contracts_by_ticker"]
+    
+    if not contracts_by_ticker:
+        print(f"❌ No contracts found in options_contracts_{mode}.json")
+        return None
+    
+    # Collect all option symbols for batch processing
+    all_symbols, registry = contract_registry(contracts_by_ticker)
+    
+    if verbose:
+        print(f"📊 Collecting data for {len(all_symbols):,} option contracts")
+        print(f"🏢 Across {len(contracts_by_ticker)} tickers")
+    
+    sess = get_session()
+    
+    # Collect market data in batches
+    quotes_data = {}
+    greeks_data = {}
+    timestamps = {}
+    batch_size = 800  # Process in manageable batches
+    batches = registry.batches(batch_size)
+    total_batches = len(batches)
+    
+    if prefetched_market_data is not None:
+        if verbose:
+            print("♻️ Using shared market data (no streaming)")
+        with PerfTimer(f"{mode.upper()} Greeks collection", "mode", mode=mode, shared=True):
+            for symbol in all_symbols:
+                if symbol in prefetched_market_data:
+                    quote_data, greek_data, timestamp = split_market_data(prefetched_market_data[symbol]["market_data"])
+                    if quote_data:
+                        quotes_data[symbol] = quote_data
+                    if greek_data:
+                        greeks_data[symbol] = greek_data
+                    if timestamp:
+                        timestamps[symbol] = timestamp
+    else:
+        # Events land in a preallocated array book; dicts are built once at the end
+        book = QuoteBook(registry=registry)
+        with PerfTimer(f"{mode.upper()} Greeks collection", "mode", mode=mode):
+            async with open_streamer(sess, streamer) as streamer:
+                for batch_num, batch_symbols in enumerate(batches):
+                    with span("greeks batch", "batch", mode=mode, batch=batch_num + 1,
+                              symbols_subscribed=len(batch_symbols)) as batch_span:
+                        if verbose:
+                            print(f"\n📦 Batch {batch_num + 1}/{total_batches}: {len(batch_symbols)} symbols")
+                
+                        quotes_before, greeks_before = book.quote_count, book.greeks_count
+                
+                        def on_quote(quote):
+                            # Collect quotes (bid/ask/mid pricing)
+                            sid = registry.dispatch(quote.event_symbol, batch_num)
+                            return sid is not None and book.apply_quote(quote, sid)
+                
+                        def on_greeks(greek):
+                            # Collect Greeks (delta, theta, gamma, vega, IV)
+                            sid = registry.dispatch(greek.event_symbol, batch_num)
+                            return sid is not None and book.apply_greeks(greek, sid)
+                
+                        def batch_coverage():
+                            quote_progress = (book.quote_count - quotes_before) / len(batch_symbols) * 100
+                            greek_progress = (book.greeks_count - greeks_before) / len(batch_symbols) * 100
+                            return quote_progress, greek_progress
+                
+                        def coverage_reached(elapsed):
+                            quote_progress, greek_progress = batch_coverage()
+                            return quote_progress >= 70 and greek_progress >= 60
+                
+                        # Collect quotes and Greeks concurrently for this batch
+                        collector = await collect_events(
+                            streamer,
+                            {Quote: batch_symbols, Greeks: batch_symbols},
+                            {Quote: on_quote, Greeks: on_greeks},
+                            done=coverage_reached,
+                            timeout=25,
+                            idle_timeout=6
+                        )
+                
+                        if verbose and collector.stop_reason == "coverage":
+                            quote_progress, greek_progress = batch_coverage()
+                            print(f"    ✅ Good coverage: {quote_progress:.0f}% quotes, {greek_progress:.0f}% Greeks")
+                
+                        if verbose:
+                            print(f"    📊 Collected {book.quote_count - quotes_before} quotes, "
+                                  f"{book.greeks_count - greeks_before} Greeks in {collector.elapsed:.1f}s")
+                
+                        quote_progress, greek_progress = batch_coverage()
+                        batch_span.set(events_received=collector.events_received, stop_reason=collector.stop_reason,
+                                       quotes=book.quote_count - quotes_before,
+                                       greeks=book.greeks_count - greeks_before,
+                                       quote_coverage=round(quote_progress, 1), greeks_coverage=round(greek_progress, 1))
+                
+                    # Brief pause between batches
+                    await asyncio.sleep(0.3)
+        
+        quotes_data, greeks_data, timestamps = book_market_data(book)
+    
+    result = assemble_greeks_data(mode, all_symbols, registry, quotes_data, greeks_data, timestamps)
     
     # Save results
     filename = f"greeks_data_{mode}.json"
-    with open(filename, "w") as f:
-        json.dump(result, f, indent=2)
+    if save:
+        save_greeks_data(result, filename, columnar, export_json)
     
     if verbose:
         print(f"\n📊 {mode.upper()} Greeks Collection Results:")
-        print(f"  ✅ Complete data: {len(complete_data):,}/{len(all_symbols):,} ({result['collection_stats']['overall_success_rate']:.1f}%)")
+        print(f"  ✅ Complete data: {result['collection_stats']['complete_data_points']:,}/{len(all_symbols):,} ({result['collection_stats']['overall_success_rate']:.1f}%)")
         print(f"  📈 Quote success: {result['collection_stats']['quote_success_rate']:.1f}%")
         print(f"  🧮 Greeks success: {result['collection_stats']['greeks_success_rate']:.1f}%")
         print(f"  💰 Sellable contracts: {result['credit_spread_summary']['total_sellable_contracts']:,}")
         print(f"  📊 Avg IV: {result['credit_spread_summary']['avg_iv_across_all']:.3f}")
-        print(f"  📁 Saved: {filename}")
+        if save:
+            saved = [name for name, on in ((filename, export_json), (columns_path(filename).name, columnar)) if on]
+            print(f"  📁 Saved: {', '.join(saved)}")
         
         # Show top tickers by sellable contracts
-        if data_by_ticker:
+        tickers = result["tickers"]
+        if tickers["ticker"]:
             top_tickers = sorted(
-                data_by_ticker.items(),
-                key=lambda x: x[1]["statistics"]["suitable_for_selling"],
+                zip(tickers["ticker"], tickers["statistics"]),
+                key=lambda x: x[1]["suitable_for_selling"],
                 reverse=True
             )[:5]
             print(f"\n🏆 Top Credit Spread Candidates:")
-            for ticker, data in top_tickers:
-                stats = data["statistics"]
+            for ticker, stats in top_tickers:
                 sellable = stats["suitable_for_selling"]
                 total = stats["total_contracts"]
                 pct = stats["sellable_percentage"]
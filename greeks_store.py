@@ -0,0 +1,238 @@
+# greeks_store.py - Normalized Greeks Data Layout
+"""
+greeks_data_{mode}.json stored as three tables linked by integer ids:
+tickers (one row per underlying), contracts (ticker_id -> ticker) and
+market (contract_id -> contract). Nothing per-contract is stored twice.
+GreeksData rebuilds the old by_ticker / market_data views on access, one
+ticker or symbol at a time, so consumers keep their dict-style code.
+"""
+import json
+import math
+from collections.abc import Mapping
+from pathlib import Path
+from columnar import columns_path, read_table, table_is_current, write_table
+
+LAYOUT_VERSION = 2
+
+TICKER_FIELDS = ("ticker", "sector", "current_price", "liquidity_score")
+CONTRACT_FIELDS = ("ticker_id", "symbol", "strike", "option_type", "dte", "expiration_date",
+                   "moneyness", "distance_from_current")
+MARKET_FIELDS = ("bid", "ask", "mid", "spread", "spread_pct",
+                 "delta", "theta", "gamma", "vega", "rho", "iv", "price", "timestamp")
+METRIC_FIELDS = ("pop_estimate", "premium_quality", "iv_rank", "theta_decay", "suitable_for_selling")
+
+# Collected by other feeds; columnar tables always carry them (NaN when absent)
+OPTIONAL_MARKET_FIELDS = ("open_interest", "volume")
+
+def _value(value):
+    """Plain Python value from a list or NumPy column cell; NaN/'' become None"""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value == "":
+        return None
+    return value
+
+class ByTickerView(Mapping):
+    """Read-only {ticker: {ticker_info, contracts, statistics}} built per access"""
+
+    def __init__(self, data):
+        self._data = data
+
+    def __iter__(self):
+        return (_value(t) for t in self._data["tickers"]["ticker"])
+
+    def __len__(self):
+        return len(self._data["tickers"]["ticker"])
+
+    def __getitem__(self, ticker):
+        ticker_id = self._data.ticker_id(ticker)
+        return {
+            "ticker_info": self._data.ticker_info(ticker_id),
+            "contracts": [self._data.contract(cid) for cid in self._data.contract_ids(ticker_id)],
+            "statistics": self._data["tickers"]["statistics"][ticker_id],
+        }
+
+class MarketDataView(Mapping):
+    """Read-only {streamer_symbol: contract record} built per access"""
+
+    def __init__(self, data):
+        self._data = data
+
+    def __iter__(self):
+        return (_value(s) for s in self._data["contracts"]["symbol"])
+
+    def __len__(self):
+        return len(self._data["contracts"]["symbol"])
+
+    def __getitem__(self, symbol):
+        return self._data.contract(self._data.contract_id(symbol))
+
+class GreeksData(dict):
+    """Normalized greeks_data payload (JSON-serializable) with lazy legacy views.
+
+    greeks_data["by_ticker"] and greeks_data["market_data"] still work; they
+    are views over the tables rather than stored keys.
+    """
+
+    def __init__(self, payload):
+        super().__init__(payload)
+        self._indexes = {}
+
+    def __missing__(self, key):
+        if key == "by_ticker":
+            return self.by_ticker
+        if key == "market_data":
+            return self.market_data
+        raise KeyError(key)
+
+    def __reduce__(self):
+        return (GreeksData, (dict(self),))
+
+    @property
+    def by_ticker(self):
+        return ByTickerView(self)
+
+    @property
+    def market_data(self):
+        return MarketDataView(self)
+
+    def _index(self, name, build):
+        if name not in self._indexes:
+            self._indexes[name] = build()
+        return self._indexes[name]
+
+    def ticker_id(self, ticker):
+        index = self._index("ticker", lambda: {_value(t): i for i, t in enumerate(self["tickers"]["ticker"])})
+        return index[ticker]
+
+    def contract_id(self, symbol):
+        index = self._index("symbol", lambda: {_value(s): i for i, s in enumerate(self["contracts"]["symbol"])})
+        return index[symbol]
+
+    def contract_ids(self, ticker_id):
+        def build():
+            by_ticker = {}
+            for cid, tid in enumerate(self["contracts"]["ticker_id"]):
+                by_ticker.setdefault(int(tid), []).append(cid)
+            return by_ticker
+        return self._index("contracts_by_ticker", build).get(ticker_id, [])
+
+    def market_row(self, contract_id):
+        def build():
+            return {int(cid): row for row, cid in enumerate(self["market"]["contract_id"])}
+        return self._index("market", build).get(contract_id)
+
+    def ticker_info(self, ticker_id):
+        tickers = self["tickers"]
+        return {field: _value(tickers[field][ticker_id]) for field in TICKER_FIELDS}
+
+    def contract(self, contract_id):
+        """Rebuild one contract record in the original greeks_data shape"""
+        contracts, market = self["contracts"], self["market"]
+        record = self.ticker_info(_value(contracts["ticker_id"][contract_id]))
+        record.update({
+            field: _value(contracts[field][contract_id])
+            for field in CONTRACT_FIELDS if field not in ("ticker_id", "symbol")
+        })
+
+        row = self.market_row(contract_id)
+        market_data, metrics = {}, {}
+        if row is not None:
+            for field in MARKET_FIELDS + OPTIONAL_MARKET_FIELDS:
+                if field in market:
+                    value = _value(market[field][row])
+                    if value is not None:
+                        market_data[field] = value
+            metrics = {field: _value(market[field][row]) for field in METRIC_FIELDS}
+        record["market_data"] = market_data
+        record["credit_spread_metrics"] = metrics
+        return record
+
+def normalize_greeks_data(header, complete_data, data_by_ticker):
+    """Build a GreeksData from greeks.py's per-symbol records and ticker stats"""
+    tickers = {field: [] for field in TICKER_FIELDS + ("statistics",)}
+    contracts = {field: [] for field in CONTRACT_FIELDS}
+    market = {field: [] for field in ("contract_id",) + MARKET_FIELDS + METRIC_FIELDS}
+    ticker_ids = {}
+
+    for ticker, ticker_data in data_by_ticker.items():
+        ticker_ids[ticker] = len(tickers["ticker"])
+        for field in TICKER_FIELDS:
+            tickers[field].append(ticker_data["ticker_info"].get(field))
+        tickers["statistics"].append(ticker_data["statistics"])
+
+    extra_fields = set()
+    for symbol, data in complete_data.items():
+        contract_id = len(contracts["symbol"])
+        contracts["ticker_id"].append(ticker_ids[data["ticker"]])
+        contracts["symbol"].append(symbol)
+        for field in CONTRACT_FIELDS[2:]:
+            contracts[field].append(data.get(field))
+
+        market["contract_id"].append(contract_id)
+        for field in MARKET_FIELDS:
+            market[field].append(data["market_data"].get(field))
+        for field in METRIC_FIELDS:
+            market[field].append(data["credit_spread_metrics"].get(field))
+        extra_fields.update(f for f in OPTIONAL_MARKET_FIELDS if f in data["market_data"])
+
+    for field in sorted(extra_fields):
+        market[field] = [data["market_data"].get(field) for data in complete_data.values()]
+
+    return GreeksData({
+        **header,
+        "layout_version": LAYOUT_VERSION,
+        "tickers": tickers,
+        "contracts": contracts,
+        "market": market,
+    })
+
+def as_greeks_data(payload):
+    """Wrap a loaded payload; legacy (by_ticker/market_data) files are normalized"""
+    if isinstance(payload, GreeksData):
+        return payload
+    if payload.get("layout_version") == LAYOUT_VERSION:
+        return GreeksData(payload)
+
+    header = {k: v for k, v in payload.items() if k not in ("market_data", "by_ticker")}
+    return normalize_greeks_data(header, payload["market_data"], payload["by_ticker"])
+
+def save_greeks_table(greeks_data, artifact):
+    """Columnar copy of a greeks_data payload: one row per contract"""
+    contracts, market = greeks_data["contracts"], greeks_data["market"]
+    row_of = {int(cid): row for row, cid in enumerate(market["contract_id"])}
+    count = len(contracts["symbol"])
+
+    columns = {field: list(contracts[field]) for field in CONTRACT_FIELDS}
+    columns["ticker"] = [greeks_data["tickers"]["ticker"][tid] for tid in contracts["ticker_id"]]
+    for field in MARKET_FIELDS + METRIC_FIELDS + OPTIONAL_MARKET_FIELDS:
+        values = market.get(field)
+        columns[field] = [values[row_of[cid]] if values is not None and cid in row_of else None
+                          for cid in range(count)]
+    columns["contract_id"] = list(range(count))
+
+    meta = {k: v for k, v in greeks_data.items() if k not in ("contracts", "market")}
+    return write_table(columns_path(artifact), columns, meta)
+
+def greeks_from_table(table):
+    """GreeksData over a (memory-mapped) columnar table"""
+    contracts = {field: table[field] for field in CONTRACT_FIELDS}
+    market = {field: table[field] for field in ("contract_id",) + MARKET_FIELDS + METRIC_FIELDS
+              + OPTIONAL_MARKET_FIELDS if field in table}
+    return GreeksData({**table.meta, "contracts": contracts, "market": market})
+
+def load_greeks_data(mode, directory="."):
+    """Load greeks_data for a mode, preferring the columnar table when it is current"""
+    json_path = Path(directory) / f"greeks_data_{mode}.json"
+    if table_is_current(json_path):
+        try:
+            table = read_table(columns_path(json_path))
+            if table.meta.get("layout_version") == LAYOUT_VERSION:
+                return greeks_from_table(table)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Could not read {columns_path(json_path)}: {e}")
+
+    with open(json_path, "r") as f:
+        return as_greeks_data(json.load(f))
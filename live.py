@@ -0,0 +1,167 @@
+# live.py - Continuous Credit Spread Screening
+"""
+Keeps the Quote/Greeks subscriptions from greeks.py open after a pipeline
+run and feeds every event into one IncrementalSpreadEngine per mode.
+The top-3-per-sector table is re-ranked on a throttle: at most every
+`interval` seconds, or after `min_interval` when a leg of a current pick
+moves more than `threshold` (relative mid). Each re-rank atomically replaces
+live_credit_spread_comparison.json, so readers never see a partial file.
+"""
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from sectors import get_sectors
+from spread_analyzer import MAX_SPREAD_WIDTH, build_final_comparison
+from spread_engine import IncrementalSpreadEngine
+from streaming import EventCollector, event_types, subscribed
+
+Quote, Greeks, _ = event_types()
+
+LIVE_SNAPSHOT_FILE = "live_credit_spread_comparison.json"
+
+def write_json_atomic(path, payload):
+    """Write JSON to a temp file in the same directory, then os.replace() it"""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+class LiveScreener:
+    """Routes streamer events into per-mode engines and publishes snapshots"""
+
+    def __init__(self, greeks_by_mode, interval=5.0, min_interval=1.0, threshold=0.05,
+                 snapshot_file=LIVE_SNAPSHOT_FILE, exhaustive=False, max_width=MAX_SPREAD_WIDTH):
+        self.engines = {
+            mode: IncrementalSpreadEngine(greeks_data, exhaustive=exhaustive, max_width=max_width)
+            for mode, greeks_data in greeks_by_mode.items()
+        }
+        self.sectors = {mode: get_sectors(mode) for mode in self.engines}
+        self.interval = interval
+        self.min_interval = min_interval
+        self.threshold = threshold
+        self.snapshot_file = snapshot_file
+
+        # symbol -> mid at the last publish, for legs in groups holding a current pick
+        self.marks = {}
+        self.urgent = False
+        self.pending_since = None
+        self.last_publish = 0.0
+        self.publishes = 0
+        self.max_staleness = 0.0
+
+    @property
+    def option_symbols(self):
+        return sorted({s for engine in self.engines.values() for s in engine.contracts})
+
+    @property
+    def quote_symbols(self):
+        return sorted({s for engine in self.engines.values() for s in engine.symbols})
+
+    def _changed(self, symbol, mid=None):
+        if self.pending_since is None:
+            self.pending_since = time.time()
+        mark = self.marks.get(symbol)
+        if mid and mark and abs(mid - mark) / mark > self.threshold:
+            self.urgent = True
+
+    def on_quote(self, quote):
+        changed = False
+        for engine in self.engines.values():
+            changed |= engine.apply_quote(quote)
+        if changed:
+            self._changed(quote.event_symbol, (float(quote.bid_price or 0) + float(quote.ask_price or 0)) / 2)
+        return changed
+
+    def on_greeks(self, greek):
+        changed = False
+        for engine in self.engines.values():
+            changed |= engine.apply_greeks(greek)
+        if changed:
+            self._changed(greek.event_symbol)
+        return changed
+
+    def due(self, now):
+        """A re-rank is due: data changed and the throttle allows it"""
+        if self.pending_since is None:
+            return False
+        since = now - self.last_publish
+        return since >= self.interval or (self.urgent and since >= self.min_interval)
+
+    def _mark_picks(self, engine, results):
+        # Watch every leg of the expirations holding a pick: any of them can
+        # replace the pick's long leg or change its credit
+        for pick in results["final_selections"]:
+            key = (pick["ticker"], pick["expiration"])
+            for symbol in engine.groups.get(key, ()):
+                mid = engine.contracts[symbol]["market_data"].get("mid")
+                if mid:
+                    self.marks[symbol] = mid
+
+    def publish(self):
+        """Re-rank dirty groups and atomically replace the snapshot file"""
+        now = time.time()
+        results = {}
+        self.marks = {}
+        for mode, engine in self.engines.items():
+            results[mode] = engine.snapshot(mode, self.sectors[mode])
+            self._mark_picks(engine, results[mode])
+
+        staleness = now - self.pending_since if self.pending_since else 0.0
+        self.max_staleness = max(self.max_staleness, staleness)
+        payload = build_final_comparison(results.get("gpt"), results.get("grok"))
+        payload["live"] = {
+            "snapshot_timestamp": datetime.now().isoformat(),
+            "sequence": self.publishes + 1,
+            "trigger": "threshold" if self.urgent else "interval",
+            "staleness_seconds": round(staleness, 3),
+            "rank_seconds": round(time.time() - now, 3),
+        }
+        write_json_atomic(self.snapshot_file, payload)
+
+        self.publishes += 1
+        self.last_publish = time.time()
+        self.pending_since = None
+        self.urgent = False
+        return payload
+
+    async def run(self, streamer, duration=None, verbose=True):
+        """Stream until `duration` seconds pass (forever if None) or the stream fails"""
+        self.publish()
+
+        def tick(elapsed):
+            if self.due(time.time()):
+                payload = self.publish()
+                if verbose:
+                    live = payload["live"]
+                    print(f"  🔁 Snapshot #{live['sequence']} ({live['trigger']}): "
+                          f"{payload['total_spreads']} picks, {live['staleness_seconds']:.2f}s stale, "
+                          f"ranked in {live['rank_seconds']:.2f}s")
+            return False
+
+        def progress(elapsed):
+            print(f"  📡 {elapsed/60:.1f} min live: {collector.events_received:,} events, "
+                  f"{self.publishes} snapshots, max staleness {self.max_staleness:.2f}s")
+
+        collector = EventCollector(
+            streamer,
+            {Quote: self.on_quote, Greeks: self.on_greeks},
+            done=tick,
+            timeout=duration if duration is not None else float("inf"),
+            progress=progress if verbose else None,
+            progress_every=60,
+        )
+        subscriptions = {Quote: self.quote_symbols, Greeks: self.option_symbols}
+
+        if verbose:
+            print(f"🔴 LIVE: {len(subscriptions[Quote]):,} symbols across {', '.join(self.engines)} "
+                  f"-> {self.snapshot_file} (every {self.interval:g}s, {self.threshold:.0%} move trigger)")
+        try:
+            async with subscribed(streamer, subscriptions):
+                await collector.run()
+        finally:
+            if self.pending_since is not None:
+                self.publish()
+        return collector
@@ -0,0 +1,152 @@
+# manifests.py - Artifact Manifests for Incremental Runs
+"""
+Every pipeline artifact (universe_*.json, spot_quotes_*.json, ...) gets a
+sidecar <name>.manifest.json with a hash of the inputs and parameters that
+produced it, a hash of the artifact itself and a creation timestamp.
+A step whose inputs hash matches and whose artifact is still inside the
+freshness window can be skipped and its artifact reused.
+
+Artifact hashes leave out the timestamp fields every step stamps on its
+output, so a re-collected artifact with the same data hashes the same and
+its downstream steps can still be reused.
+"""
+import ast
+import hashlib
+import json
+import time
+from pathlib import Path
+
+MANIFEST_VERSION = 2
+
+# Collection/analysis times, not data: ignored by artifact hashes
+TIMESTAMP_FIELDS = {"timestamp", "collection_timestamp", "analysis_timestamp"}
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_payload(payload) -> str:
+    """Stable hash of any JSON-serializable value"""
+    return hash_bytes(json.dumps(payload, sort_keys=True, default=str).encode())
+
+def _without_timestamps(value):
+    if isinstance(value, dict):
+        return {k: _without_timestamps(v) for k, v in value.items() if k not in TIMESTAMP_FIELDS}
+    if isinstance(value, list):
+        return [_without_timestamps(v) for v in value]
+    return value
+
+def hash_content(payload) -> str:
+    """hash_payload of a step's output with its timestamp fields dropped"""
+    return hash_payload(_without_timestamps(payload))
+
+def hash_artifact(path) -> str:
+    """Content hash of a JSON artifact (file bytes for anything else)"""
+    try:
+        with open(path, "r") as f:
+            payload = json.load(f)
+    except (UnicodeDecodeError, ValueError):
+        return hash_file(path)
+    return hash_content(payload)
+
+def _module_file(name, root):
+    """Local file for a dotted module name (None for third-party/stdlib)"""
+    path = root.joinpath(*name.split("."))
+    for candidate in (path.with_suffix(".py"), path / "__init__.py"):
+        if candidate.is_file():
+            return candidate
+    return None
+
+def local_sources(script, root="."):
+    """The script plus every repo module it imports, transitively.
+
+    Function-level (lazy) imports count too, so a change to any helper that
+    shapes a step's artifact (streaming.py, quote_book.py, simulator/...)
+    changes the step's inputs hash. Paths are relative to root.
+    """
+    root = Path(root)
+    pending = [root / script]
+    found = {}
+    while pending:
+        path = pending.pop()
+        key = path.relative_to(root).as_posix()
+        if key in found:
+            continue
+        found[key] = path
+        try:
+            tree = ast.parse(path.read_text(), filename=str(path))
+        except (OSError, SyntaxError, ValueError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                # "from pkg import sub" may name a submodule rather than an attribute
+                names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            for name in names:
+                parts = name.split(".")
+                # Importing a.b runs a/__init__.py too
+                for depth in range(1, len(parts) + 1):
+                    module = _module_file(".".join(parts[:depth]), root)
+                    if module is not None:
+                        pending.append(module)
+    return sorted(found)
+
+def inputs_hash(step, params=None, sources=(), upstream=None) -> str:
+    """Hash a step's parameters, source files and upstream artifact hashes"""
+    return hash_payload({
+        "version": MANIFEST_VERSION,
+        "step": step,
+        "params": params or {},
+        "sources": {str(path): hash_file(path) for path in sources if Path(path).exists()},
+        "upstream": upstream or {},
+    })
+
+def manifest_path(artifact) -> Path:
+    return Path(artifact).with_suffix(".manifest.json")
+
+def load_manifest(artifact):
+    path = manifest_path(artifact)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_manifest(artifact, step_inputs_hash, params=None):
+    """Record the manifest for a freshly written artifact"""
+    manifest = {
+        "artifact": str(artifact),
+        "inputs_hash": step_inputs_hash,
+        "output_hash": hash_artifact(artifact),
+        "params": params or {},
+        "created": time.time(),
+        "version": MANIFEST_VERSION,
+    }
+    with open(manifest_path(artifact), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def fresh_manifest(artifact, step_inputs_hash, max_age):
+    """Return the manifest if the artifact can be reused, else None"""
+    manifest = load_manifest(artifact)
+    if not manifest or not Path(artifact).exists():
+        return None
+    if manifest.get("inputs_hash") != step_inputs_hash:
+        return None
+    if max_age is not None and time.time() - manifest.get("created", 0) > max_age:
+        return None
+    # Artifact edited or replaced since the manifest was written
+    if hash_artifact(artifact) != manifest.get("output_hash"):
+        return None
+    return manifest
@@ -11,18 +11,99 @@ Pipeline Steps:
 5. greeks.py - Collect real Greeks and pricing data
 6. spread_analyzer.py - Construct spreads, calculate PoP/ROI, create final table
 
+By default the steps run in-process as a DAG (pipeline.py): one event loop,
+one session and one streamer, with results passed in memory and JSON files
+written as checkpoints. Use --subprocess for the old one-script-per-step mode.
+
 Output: AI bot name | Sector | Ticker | Bull Put or Bear Call | $/$ leg cost | DTE | PoP | ROI
 """
+import argparse
+import asyncio
+import os
 import subprocess
 import sys
 import time
 import json
 from datetime import datetime
 from pathlib import Path
+import tracing
+
+MODES = ["gpt", "grok"]
+
+# How long an artifact with unchanged inputs can be reused (seconds). Inputs
+# include upstream artifact content (timestamps aside), so a step reruns
+# whenever the data it reads changed, whatever its own window says.
+FRESHNESS_WINDOWS = {
+    "build_universe.py": 24 * 3600,  # Chains change only on new listings
+    "spot.py": 15 * 60,
+    "ticker_ranker.py": 4 * 3600,
+    "options_chains.py": 4 * 3600,
+    "greeks.py": 15 * 60,
+    "spread_analyzer.py": None,  # Pure function of its inputs
+}
+
+PIPELINE_STEPS = [
+    {
+        "step": 1,
+        "script": "build_universe.py",
+        "description": "Universe Building & Options Chain Validation",
+        "expected_files": {
+            "universe_gpt.json": "GPT universe",
+            "universe_grok.json": "Grok universe"
+        }
+    },
+    {
+        "step": 2,
+        "script": "spot.py", 
+        "description": "Stock Price Collection",
+        "expected_files": {
+            "spot_quotes_gpt.json": "GPT stock quotes",
+            "spot_quotes_grok.json": "Grok stock quotes"
+        }
+    },
+    {
+        "step": 3,
+        "script": "ticker_ranker.py",
+        "description": "Liquidity Analysis for Credit Spreads", 
+        "expected_files": {
+            "ticker_rankings_gpt.json": "GPT liquidity rankings",
+            "ticker_rankings_grok.json": "Grok liquidity rankings"
+        }
+    },
+    {
+        "step": 4,
+        "script": "options_chains.py",
+        "description": "Options Contract Discovery",
+        "expected_files": {
+            "options_contracts_gpt.json": "GPT options contracts", 
+            "options_contracts_grok.json": "Grok options contracts"
+        }
+    },
+    {
+        "step": 5,
+        "script": "greeks.py",
+        "description": "Greeks & Market Data Collection",
+        "expected_files": {
+            "greeks_data_gpt.json": "GPT Greeks data",
+            "greeks_data_grok.json": "Grok Greeks data"
+        }
+    },
+    {
+        "step": 6,
+        "script": "spread_analyzer.py", 
+        "description": "Credit Spread Analysis & Final Rankings",
+        "expected_files": {
+            "credit_spreads_gpt.json": "GPT credit spreads",
+            "credit_spreads_grok.json": "Grok credit spreads", 
+            "final_credit_spread_comparison.json": "Final comparison table"
+        }
+    }
+]
 
 class PipelineRunner:
     def __init__(self):
         self.start_time = time.time()
+        self.total_time = None
         self.step_times = {}
         self.step_results = {}
         
@@ -40,12 +121,13 @@ class PipelineRunner:
         
         try:
             # Run the script
-            result = subprocess.run(
-                [sys.executable, script_name],
-                capture_output=True,
-                text=True,
-                timeout=1800  # 30 minute timeout per step
-            )
+            with tracing.span(script_name, "step", step=script_name):
+                result = subprocess.run(
+                    [sys.executable, script_name],
+                    capture_output=True,
+                    text=True,
+                    timeout=1800  # 30 minute timeout per step
+                )
             
             step_time = time.time() - step_start
             self.step_times[script_name] = step_time
@@ -115,7 +197,7 @@ class PipelineRunner:
                 self.log(f"   File: ❌ {filename}")
                 all_files_created = False
         
-        return result == "SUCCESS" and all_files_created
+        return result in ("SUCCESS", "CACHED") and all_files_created
     
     def run_complete_pipeline(self):
         """Run the complete credit spread analysis pipeline"""
@@ -124,63 +206,7 @@ class PipelineRunner:
         self.log("Target: GPT vs Grok credit spread comparison with real PoP and ROI")
         self.log("=" * 80)
         
-        pipeline_steps = [
-            {
-                "step": 1,
-                "script": "build_universe.py",
-                "description": "Universe Building & Options Chain Validation",
-                "expected_files": {
-                    "universe_gpt.json": "GPT universe",
-                    "universe_grok.json": "Grok universe"
-                }
-            },
-            {
-                "step": 2,
-                "script": "spot.py", 
-                "description": "Stock Price Collection",
-                "expected_files": {
-                    "spot_quotes_gpt.json": "GPT stock quotes",
-                    "spot_quotes_grok.json": "Grok stock quotes"
-                }
-            },
-            {
-                "step": 3,
-                "script": "ticker_ranker.py",
-                "description": "Liquidity Analysis for Credit Spreads", 
-                "expected_files": {
-                    "ticker_rankings_gpt.json": "GPT liquidity rankings",
-                    "ticker_rankings_grok.json": "Grok liquidity rankings"
-                }
-            },
-            {
-                "step": 4,
-                "script": "options_chains.py",
-                "description": "Options Contract Discovery",
-                "expected_files": {
-                    "options_contracts_gpt.json": "GPT options contracts", 
-                    "options_contracts_grok.json": "Grok options contracts"
-                }
-            },
-            {
-                "step": 5,
-                "script": "greeks.py",
-                "description": "Greeks & Market Data Collection",
-                "expected_files": {
-                    "greeks_data_gpt.json": "GPT Greeks data",
-                    "greeks_data_grok.json": "Grok Greeks data"
-                }
-            },
-            {
-                "step": 6,
-                "script": "spread_analyzer.py", 
-                "description": "Credit Spread Analysis & Final Rankings",
-                "expected_files": {
-                    "credit_spreads_gpt.json": "GPT credit spreads",
-                    "credit_spreads_grok.json": "Grok credit spreads", 
-                    "final_credit_spread_comparison.json": "Final comparison table"
-                }
-            }
-        ]
+        pipeline_steps = PIPELINE_STEPS
         
         successful_steps = 0
         
@@ -209,11 +235,15 @@ class PipelineRunner:
                 self.log(f"❌ Step {step_num}: FAILED - Pipeline stopped", "ERROR")
                 break
         
-        # Final summary
+        self.finish_pipeline(successful_steps)
+    
+    def finish_pipeline(self, successful_steps):
+        """Print timing and results summary"""
         self.log(f"\n🏁 PIPELINE COMPLETE")
         self.log("=" * 80)
         
         total_time = time.time() - self.start_time
+        self.total_time = total_time
         
         self.log(f"📊 Pipeline Summary:")
         self.log(f"   Total time: {total_time/60:.1f} minutes")
@@ -234,6 +264,212 @@ class PipelineRunner:
             self.log(f"\n⚠️ PARTIAL: {successful_steps}/6 steps completed")
             self.log("Check error logs above and run individual scripts as needed")
     
+    def build_dag(self, sess, streamer, checkpoints=True, incremental=True, max_age=None, shared=True,
+                  spread_options=None):
+        """Wire every step's entry point into a DAG, one node per step per mode.
+        
+        shared: validate, quote, rank and stream Greeks once for the merged
+        GPT+Grok universe and slice the per-mode results from it, so tickers
+        and contracts both modes pick are only collected once.
+        spread_options: extra analyze_credit_spreads_for_mode arguments
+        (exhaustive, max_width, parallel, max_workers).
+        """
+        from pipeline import PipelineDAG
+        from manifests import local_sources
+        from simulator import provider_params
+        from sectors import PORTFOLIO_MODE
+        from build_universe import build_universe_optimized, save_universe, set_active_universe, universe_for_mode
+        from spot import collect_quotes_for_validated_tickers
+        from ticker_ranker import rank_all_tickers_for_credit_spreads
+        from options_chains import discover_credit_spread_contracts, merge_contract_sets
+        from greeks import collect_greeks_for_credit_spreads
+        from greeks_store import as_greeks_data
+        from spread_analyzer import analyze_credit_spreads_for_mode, create_final_comparison_table
+        
+        dag = PipelineDAG(incremental=incremental and checkpoints)
+        spread_options = spread_options or {}
+        
+        def options(script, artifact, mode=None):
+            # Inputs hash covers the step's code and every local module it imports, mode and market provider
+            return {
+                "artifact": artifact,
+                "params": {"mode": mode, **provider_params()},
+                "sources": local_sources(script),
+                "max_age": max_age if max_age is not None else FRESHNESS_WINDOWS[script],
+            }
+        
+        if shared:
+            def universe_merged(inputs):
+                results = build_universe_optimized(sess, "merged")
+                if checkpoints:
+                    save_universe("merged", results)
+                return results
+            
+            async def spot_merged(inputs):
+                return await collect_quotes_for_validated_tickers(
+                    "merged", universe_data=inputs["universe:merged"], streamer=streamer, save=checkpoints)
+            
+            async def rank_merged(inputs):
+                return await rank_all_tickers_for_credit_spreads(
+                    "merged", quotes_data=inputs["spot:merged"], streamer=streamer, save=checkpoints)
+            
+            async def greeks_merged(inputs):
+                contracts = merge_contract_sets(inputs[f"contracts:{mode}"] for mode in MODES)
+                return await collect_greeks_for_credit_spreads(
+                    "merged", contracts_data=contracts, streamer=streamer, save=checkpoints)
+            
+            dag.add("universe:merged", universe_merged, step="build_universe.py",
+                    **options("build_universe.py", "universe_merged.json", "merged"))
+            dag.add("spot:merged", spot_merged, ["universe:merged"], step="spot.py", uses_streamer=True,
+                    **options("spot.py", "spot_quotes_merged.json", "merged"))
+            dag.add("rank:merged", rank_merged, ["spot:merged"], step="ticker_ranker.py", uses_streamer=True,
+                    **options("ticker_ranker.py", "ticker_rankings_merged.json", "merged"))
+        
+        def merged_dep(name):
+            # Shared upstream nodes feed every mode; per-mode nodes only slice them
+            return [f"{name}:merged"] if shared else []
+        
+        for mode in MODES:
+            def universe(inputs, mode=mode):
+                if shared:
+                    results = universe_for_mode(inputs["universe:merged"], mode)
+                else:
+                    results = build_universe_optimized(sess, mode)
+                if checkpoints:
+                    save_universe(mode, results)
+                    if mode == PORTFOLIO_MODE:
+                        set_active_universe(mode)
+                return results
+            
+            async def spot(inputs, mode=mode):
+                prefetched = inputs["spot:merged"]["quotes"] if shared else None
+                return await collect_quotes_for_validated_tickers(
+                    mode, universe_data=inputs[f"universe:{mode}"], streamer=streamer, save=checkpoints,
+                    prefetched_quotes=prefetched)
+            
+            async def rank(inputs, mode=mode):
+                prefetched = None
+                if shared:
+                    merged = inputs["rank:merged"]
+                    prefetched = merged["ticker_rankings"] + merged["failed_tickers"]
+                return await rank_all_tickers_for_credit_spreads(
+                    mode, quotes_data=inputs[f"spot:{mode}"], streamer=streamer, save=checkpoints,
+                    prefetched_results=prefetched)
+            
+            def contracts(inputs, mode=mode):
+                return discover_credit_spread_contracts(
+                    mode, rankings_data=inputs[f"rank:{mode}"], save=checkpoints)
+            
+            async def greeks(inputs, mode=mode):
+                prefetched = as_greeks_data(inputs["greeks:merged"]).market_data if shared else None
+                return await collect_greeks_for_credit_spreads(
+                    mode, contracts_data=inputs[f"contracts:{mode}"], streamer=streamer, save=checkpoints,
+                    prefetched_market_data=prefetched)
+            
+            def spreads(inputs, mode=mode):
+                return analyze_credit_spreads_for_mode(
+                    mode, greeks_data=inputs[f"greeks:{mode}"], save=checkpoints, **spread_options)
+            
+            dag.add(f"universe:{mode}", universe, merged_dep("universe"), step="build_universe.py",
+                    **options("build_universe.py", f"universe_{mode}.json", mode))
+            dag.add(f"spot:{mode}", spot, [f"universe:{mode}", *merged_dep("spot")], step="spot.py",
+                    uses_streamer=not shared, **options("spot.py", f"spot_quotes_{mode}.json", mode))
+            dag.add(f"rank:{mode}", rank, [f"spot:{mode}", *merged_dep("rank")], step="ticker_ranker.py",
+                    uses_streamer=True, **options("ticker_ranker.py", f"ticker_rankings_{mode}.json", mode))
+            dag.add(f"contracts:{mode}", contracts, [f"rank:{mode}"], step="options_chains.py",
+                    **options("options_chains.py", f"options_contracts_{mode}.json", mode))
+            dag.add(f"greeks:{mode}", greeks, [f"contracts:{mode}", *merged_dep("greeks")], step="greeks.py",
+                    uses_streamer=not shared, **options("greeks.py", f"greeks_data_{mode}.json", mode))
+            spread_node = options("spread_analyzer.py", f"credit_spreads_{mode}.json", mode)
+            # parallel/max_workers don't change the output, so they stay out of the inputs hash
+            spread_node["params"].update(
+                {k: v for k, v in spread_options.items() if k not in ("parallel", "max_workers")})
+            dag.add(f"spreads:{mode}", spreads, [f"greeks:{mode}"], step="spread_analyzer.py", **spread_node)
+        
+        if shared:
+            dag.add("greeks:merged", greeks_merged, [f"contracts:{mode}" for mode in MODES], step="greeks.py",
+                    uses_streamer=True, **options("greeks.py", "greeks_data_merged.json", "merged"))
+        
+        def final(inputs):
+            return create_final_comparison_table(inputs["spreads:gpt"], inputs["spreads:grok"])
+        
+        dag.add("final", final, [f"spreads:{mode}" for mode in MODES], step="spread_analyzer.py",
+                **options("spread_analyzer.py", "final_credit_spread_comparison.json"))
+        return dag
+    
+    async def run_dag(self, checkpoints=True, incremental=True, max_age=None, shared=True, spread_options=None,
+                      live_options=None):
+        """Run all steps in one event loop with a shared session and streamer"""
+        from session_provider import get_session
+        from streaming import create_streamer
+        
+        sess = get_session()
+        async with create_streamer(sess) as streamer:
+            dag = self.build_dag(sess, streamer, checkpoints, incremental, max_age, shared, spread_options)
+            await dag.run(log=self.log)
+            if live_options is not None:
+                await self.run_live(dag, streamer, spread_options or {}, live_options)
+        return dag
+    
+    async def run_live(self, dag, streamer, spread_options, live_options):
+        """Keep the streamer open and re-rank from live Quote/Greeks events"""
+        from live import LiveScreener
+        
+        greeks_by_mode = {mode: dag.results.get(f"greeks:{mode}") for mode in MODES}
+        if not all(greeks_by_mode.values()):
+            self.log("❌ Live mode needs Greeks data for both modes", "ERROR")
+            return
+        
+        engine_options = {k: v for k, v in spread_options.items() if k in ("exhaustive", "max_width")}
+        duration = live_options.pop("duration", None)
+        screener = LiveScreener(greeks_by_mode, **live_options, **engine_options)
+        self.log(f"\n🔴 Live screening started (Ctrl+C to stop)")
+        try:
+            await screener.run(streamer, duration=duration)
+        except asyncio.CancelledError:
+            # Ctrl+C ends live mode; the pipeline summary still prints
+            pass
+        self.log(f"🔴 Live screening stopped after {screener.publishes} snapshots")
+    
+    def run_in_process_pipeline(self, checkpoints=True, incremental=True, max_age=None, shared=True,
+                                spread_options=None, live_options=None):
+        """Run the complete pipeline in-process as a DAG"""
+        self.log("🚀 Starting Complete Credit Spread Analysis Pipeline (in-process)")
+        self.log("=" * 80)
+        self.log("Target: GPT vs Grok credit spread comparison with real PoP and ROI")
+        self.log(f"Checkpoints: {'ON' if checkpoints else 'OFF'} | Incremental: {'ON' if incremental and checkpoints else 'OFF'}")
+        self.log(f"Shared market data: {'ON (merged GPT+Grok collection)' if shared else 'OFF'}")
+        self.log("=" * 80)
+        
+        try:
+            dag = asyncio.run(self.run_dag(checkpoints, incremental, max_age, shared, spread_options,
+                                           live_options))
+        except KeyboardInterrupt:
+            self.log("⏹️ Interrupted")
+            return
+        
+        successful_steps = 0
+        for step_config in PIPELINE_STEPS:
+            script = step_config["script"]
+            self.step_times[script] = dag.step_time(script)
+            self.step_results[script] = dag.step_status(script)
+            
+            self.log(f"\n🔄 Step {step_config['step']}/6: {step_config['description']}")
+            expected_files = step_config["expected_files"] if checkpoints else {}
+            if self.show_step_summary(step_config["step"], script, expected_files):
+                successful_steps += 1
+        
+        self.finish_pipeline(successful_steps)
+    
+    def save_timings(self, filename, options):
+        """Write step wall times as a benchmark results file (python3 -m benchmarks baseline/compare)"""
+        from benchmarks.harness import pipeline_results
+        total_time = self.total_time if self.total_time is not None else time.time() - self.start_time
+        payload = pipeline_results(self.step_times, self.step_results, total_time, options)
+        with open(filename, "w") as f:
+            json.dump(payload, f, indent=2)
+        self.log(f"⏱️ Step timings saved to {filename} ({len(payload['results'])} timed)")
+    
     def display_final_results(self):
         """Display the final comparison table"""
         try:
@@ -268,6 +504,47 @@ class PipelineRunner:
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description="Credit spread analysis pipeline")
+    parser.add_argument("--subprocess", action="store_true",
+                        help="Run each step as a separate script (legacy mode)")
+    parser.add_argument("--no-checkpoints", action="store_true",
+                        help="In-process mode: keep intermediate results in memory only")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-run every step even if its inputs are unchanged")
+    parser.add_argument("--max-age", type=float, default=None,
+                        help="Override the freshness window (seconds) for reusing artifacts")
+    parser.add_argument("--exhaustive", action="store_true",
+                        help="Rank every spread pair within the width range, not just the nearest long leg")
+    parser.add_argument("--max-width", type=float, default=None,
+                        help="Widest spread (in $) considered by --exhaustive")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Build spreads for both modes on a shared process pool")
+    parser.add_argument("--no-share", action="store_true",
+                        help="Collect market data separately for each mode instead of once for both")
+    parser.add_argument("--live", action="store_true",
+                        help="After the run, keep streaming and re-rank into live_credit_spread_comparison.json")
+    parser.add_argument("--live-interval", type=float, default=5.0,
+                        help="Live mode: seconds between re-ranks")
+    parser.add_argument("--live-threshold", type=float, default=0.05,
+                        help="Live mode: re-rank early when a pick's leg mid moves more than this fraction")
+    parser.add_argument("--live-duration", type=float, default=None,
+                        help="Live mode: stop after this many seconds (default: run until Ctrl+C)")
+    parser.add_argument("--record", metavar="FILE", default=None,
+                        help="Record every DXLink subscription and event to FILE (.gz to compress)")
+    parser.add_argument("--replay", metavar="FILE", default=None,
+                        help="Replay a recording instead of connecting (offline; chains from the cache)")
+    parser.add_argument("--replay-speed", default="1",
+                        help="Replay pace: 1 = recorded, N = N times faster, max = no pacing")
+    parser.add_argument("--provider", choices=["tastytrade", "sim"], default=None,
+                        help="Market data source: tastytrade (default) or the local simulator (see simulator/)")
+    parser.add_argument("--sim-tickers", type=int, default=None,
+                        help="Simulator: add this many synthetic underlyings across the sectors")
+    parser.add_argument("--timings", metavar="FILE", default=None,
+                        help="Save step wall times as a benchmark results file (see benchmarks/baseline.py)")
+    parser.add_argument("--trace", metavar="FILE", default=None,
+                        help="Save a Chrome trace / Perfetto JSON of nested timing spans (see tracing.py)")
+    args = parser.parse_args()
+    
     print("\n" + "="*80)
     print("🎯 CREDIT SPREAD ANALYSIS PIPELINE")
     print("   GPT vs Grok AI Stock Selection Comparison")
@@ -293,9 +570,71 @@ def main():
     
     print("✅ All required files found")
     
+    # Exported so --subprocess steps pick them up too (see stream_replay.py)
+    if args.replay:
+        os.environ["DXLINK_REPLAY"] = args.replay
+        os.environ["DXLINK_REPLAY_SPEED"] = args.replay_speed
+        pace = "max speed" if args.replay_speed == "max" else f"{args.replay_speed}x"
+        print(f"🎞️ Replaying {args.replay} at {pace}")
+    elif args.record:
+        os.environ["DXLINK_RECORD"] = args.record
+        print(f"⏺️ Recording DXLink session to {args.record}")
+    
+    if args.provider:
+        os.environ["MARKET_PROVIDER"] = args.provider
+    if args.sim_tickers is not None:
+        os.environ["SIM_TICKERS"] = str(args.sim_tickers)
+    if os.environ.get("MARKET_PROVIDER") == "sim":
+        print(f"🧪 Simulated market (seed {os.environ.get('SIM_SEED', '0')}, "
+              f"{os.environ.get('SIM_TICKERS', '0')} synthetic tickers)")
+    
+    spread_options = {"exhaustive": args.exhaustive, "parallel": args.parallel}
+    if args.max_width is not None:
+        spread_options["max_width"] = args.max_width
+    
+    live_options = None
+    if args.live:
+        if args.subprocess:
+            print("❌ --live needs the in-process pipeline (drop --subprocess)")
+            sys.exit(1)
+        live_options = {"interval": args.live_interval, "threshold": args.live_threshold,
+                        "duration": args.live_duration}
+    
+    if args.trace:
+        tracing.enable()
+        if args.subprocess:
+            print("⚠️ --subprocess: the trace only has one span per step script")
+    
     # Run the pipeline
     runner = PipelineRunner()
-    runner.run_complete_pipeline()
+    with tracing.span("pipeline", "pipeline", runner="subprocess" if args.subprocess else "in-process",
+                      provider=os.environ.get("MARKET_PROVIDER") or "tastytrade"):
+        if args.subprocess:
+            runner.run_complete_pipeline()
+        else:
+            runner.run_in_process_pipeline(
+                checkpoints=not args.no_checkpoints,
+                incremental=not args.force,
+                max_age=args.max_age,
+                shared=not args.no_share,
+                spread_options=spread_options,
+                live_options=live_options
+            )
+    
+    if args.trace:
+        spans = tracing.export_chrome_trace(args.trace, metadata={"argv": sys.argv[1:]})
+        print(f"🔎 Trace: {spans:,} spans saved to {args.trace} (open in https://ui.perfetto.dev)")
+    
+    if args.timings:
+        runner.save_timings(args.timings, {
+            "mode": "+".join(MODES),
+            "runner": "subprocess" if args.subprocess else "in-process",
+            "shared": not args.no_share,
+            "provider": os.environ.get("MARKET_PROVIDER") or "tastytrade",
+            "sim_tickers": os.environ.get("SIM_TICKERS"),
+            "replay": args.replay,
+            "spread_options": spread_options,
+        })
 
 if __name__ == "__main__":
     main()
@@ -3,26 +3,28 @@
 FIXED - Discovers options contracts for validated tickers with good liquidity.
 Focuses on contracts suitable for credit spreads (7-60 DTE, reasonable strikes).
 """
+import copy
 import json
 from datetime import datetime, timezone
-from tastytrade import Session
-from tastytrade.instruments import get_option_chain
-from config import USERNAME, PASSWORD
+from chain_cache import get_option_chain, trading_date
+from session_provider import get_session
 from sectors import PerfTimer
+from columnar import columns_path, save_contracts_table
 
-def discover_credit_spread_contracts(mode, verbose=True):
+def discover_credit_spread_contracts(mode, verbose=True, rankings_data=None, save=True, columnar=True, export_json=True):
     """Discover options contracts suitable for credit spreads"""
     if verbose:
         print(f"🎰 Discovering Credit Spread Contracts - {mode.upper()}")
         print("=" * 70)
     
-    # Load ticker rankings from previous step
-    try:
-        with open(f"ticker_rankings_{mode}.json", "r") as f:
-            rankings_data = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ ticker_rankings_{mode}.json not found. Run ticker_ranker.py first.")
-        return None
+    # Load ticker rankings from previous step (unless passed in memory)
+    if rankings_data is None:
+        try:
+            with open(f"ticker_rankings_{mode}.json", "r") as f:
+                rankings_data = json.load(f)
+        except FileNotFoundError:
+            print(f"❌ ticker_rankings_{mode}.json not found. Run ticker_ranker.py first.")
+            return None
     
     # Filter to only good liquidity tickers (score >= 40)
     good_tickers = [
@@ -41,11 +43,11 @@ def discover_credit_spread_contracts(mode, verbose=True):
         fair = len([t for t in good_tickers if 40 <= t["liquidity_score"] < 60])
         print(f"  ⭐ Excellent: {excellent} | ✅ Good: {good} | ⚠️ Fair: {fair}")
     
-    sess = Session(USERNAME, PASSWORD)
+    sess = get_session()
     all_contracts = {}
     total_contracts = 0
     
-    with PerfTimer(f"{mode.upper()} contract discovery"):
+    with PerfTimer(f"{mode.upper()} contract discovery", "mode", mode=mode):
         for i, ticker_data in enumerate(good_tickers, 1):
             ticker = ticker_data["ticker"]
             current_price = ticker_data["spot_price"]
@@ -79,8 +81,8 @@ def discover_credit_spread_contracts(mode, verbose=True):
                     }
                 }
                 
-                # Process expirations suitable for credit spreads
-                today = datetime.now(timezone.utc).date()
+                # Process expirations suitable for credit spreads (DTE from the pinned trading date on replay)
+                today = trading_date()
                 suitable_expirations = []
                 
                 for exp_date in sorted(chain.keys()):
@@ -191,8 +193,13 @@ def discover_credit_spread_contracts(mode, verbose=True):
     
     # Save results
     filename = f"options_contracts_{mode}.json"
-    with open(filename, "w") as f:
-        json.dump(result, f, indent=2)
+    if save:
+        if export_json:
+            with open(filename, "w") as f:
+                json.dump(result, f, indent=2)
+        # Table last: readers only trust it when it is at least as new as the JSON
+        if columnar:
+            save_contracts_table(result, filename)
     
     if verbose:
         print(f"\n📊 {mode.upper()} Options Discovery Results:")
@@ -200,7 +207,9 @@ def discover_credit_spread_contracts(mode, verbose=True):
         print(f"  🎰 Total contracts: {total_contracts:,}")
         print(f"  📈 Avg per ticker: {result['discovery_stats']['avg_contracts_per_ticker']:.1f}")
         print(f"  ⏱️ Avg expirations: {result['credit_spread_analysis']['avg_expirations_per_ticker']:.1f}")
-        print(f"  📁 Saved: {filename}")
+        if save:
+            saved = [name for name, on in ((filename, export_json), (columns_path(filename).name, columnar)) if on]
+            print(f"  📁 Saved: {', '.join(saved)}")
         
         if all_contracts:
             # Show top tickers by contract count
@@ -216,6 +225,28 @@ def discover_credit_spread_contracts(mode, verbose=True):
     
     return result
 
+def merge_contract_sets(results, mode="merged"):
+    """Union of contracts_by_ticker across modes, for one shared collection"""
+    contracts_by_ticker = {}
+    for result in results:
+        if not result:
+            continue
+        for ticker, ticker_data in result["contracts_by_ticker"].items():
+            if ticker not in contracts_by_ticker:
+                contracts_by_ticker[ticker] = copy.deepcopy(ticker_data)
+                continue
+            # Same ticker in several modes: union the contracts per expiration
+            merged = contracts_by_ticker[ticker]["expiration_dates"]
+            for exp_date, exp_data in ticker_data["expiration_dates"].items():
+                if exp_date not in merged:
+                    merged[exp_date] = copy.deepcopy(exp_data)
+                    continue
+                seen = {c["streamer_symbol"] for c in merged[exp_date]["contracts"]}
+                merged[exp_date]["contracts"].extend(
+                    c for c in exp_data["contracts"] if c["streamer_symbol"] not in seen
+                )
+    return {"mode": mode, "contracts_by_ticker": contracts_by_ticker}
+
 def main():
     """Main function for standalone execution"""
     print("🚀 Credit Spread Contract Discovery")
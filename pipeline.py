@@ -0,0 +1,176 @@
+# pipeline.py - In-Process Pipeline DAG
+"""
+Runs pipeline steps as DAG nodes inside one event loop.
+Each node gets its dependencies' results in memory. Nodes whose inputs are
+ready run concurrently, except nodes that share the streamer, which take
+turns so their event consumers never compete for the same queues.
+Nodes with an artifact are skipped when its manifest shows unchanged inputs
+inside the node's freshness window (see manifests.py).
+"""
+import asyncio
+import inspect
+import json
+import os
+import time
+from manifests import fresh_manifest, hash_content, inputs_hash, write_manifest
+from tracing import span
+
+class Node:
+    def __init__(self, name, func, deps=(), step=None, uses_streamer=False,
+                 artifact=None, params=None, sources=(), max_age=None):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.step = step
+        self.uses_streamer = uses_streamer
+        self.artifact = artifact
+        self.params = params or {}
+        self.sources = list(sources)
+        self.max_age = max_age
+
+class PipelineDAG:
+    """Dependency graph of pipeline nodes with per-node status and timing"""
+
+    def __init__(self, incremental=True):
+        self.nodes = {}
+        self.results = {}
+        self.status = {}
+        self.started = {}
+        self.finished = {}
+        self.output_hashes = {}
+        self.incremental = incremental
+
+    def add(self, name, func, deps=(), step=None, uses_streamer=False, **options):
+        """Add a node; func(inputs) may be async or sync (sync runs in a thread).
+        
+        options: artifact (JSON file the node writes), params, sources (files
+        whose content feeds the inputs hash) and max_age (seconds).
+        """
+        if name in self.nodes:
+            raise ValueError(f"Duplicate pipeline node '{name}'")
+        self.nodes[name] = Node(name, func, deps, step, uses_streamer, **options)
+        return self.nodes[name]
+
+    def order(self):
+        """Topological order, stable with respect to insertion order"""
+        for node in self.nodes.values():
+            missing = [dep for dep in node.deps if dep not in self.nodes]
+            if missing:
+                raise ValueError(f"Node '{node.name}' depends on unknown nodes {missing}")
+
+        ordered, placed = [], set()
+        remaining = list(self.nodes.values())
+        while remaining:
+            ready = [node for node in remaining if all(dep in placed for dep in node.deps)]
+            if not ready:
+                raise ValueError(f"Pipeline has a cycle among {[n.name for n in remaining]}")
+            for node in ready:
+                ordered.append(node)
+                placed.add(node.name)
+            remaining = [node for node in remaining if node.name not in placed]
+        return ordered
+
+    def duration(self, name):
+        if name not in self.started or name not in self.finished:
+            return 0.0
+        return self.finished[name] - self.started[name]
+
+    def step_time(self, step):
+        """Wall time spanned by all nodes of a step"""
+        names = [n.name for n in self.nodes.values() if n.step == step and n.name in self.finished]
+        if not names:
+            return 0.0
+        return max(self.finished[n] for n in names) - min(self.started[n] for n in names)
+
+    def step_status(self, step):
+        statuses = [self.status.get(n.name, "UNKNOWN") for n in self.nodes.values() if n.step == step]
+        if statuses and all(s == "CACHED" for s in statuses):
+            return "CACHED"
+        if statuses and all(s in ("SUCCESS", "CACHED") for s in statuses):
+            return "SUCCESS"
+        for status in ("EXCEPTION", "FAILED", "SKIPPED"):
+            if status in statuses:
+                return status
+        return "UNKNOWN"
+
+    async def run(self, log=print):
+        """Run every node once its dependencies have succeeded"""
+        streamer_lock = asyncio.Lock()
+        tasks = {}
+
+        async def run_node(node):
+            for dep in node.deps:
+                await tasks[dep]
+            failed_deps = [dep for dep in node.deps if self.status.get(dep) not in ("SUCCESS", "CACHED")]
+            if failed_deps:
+                self.status[node.name] = "SKIPPED"
+                log(f"⏭️ {node.name}: skipped ({', '.join(failed_deps)} did not succeed)")
+                return
+
+            step_hash = None
+            if node.artifact:
+                upstream = {dep: self.output_hashes.get(dep) for dep in node.deps}
+                step_hash = inputs_hash(node.name, node.params, node.sources, upstream)
+                if self.incremental and self._reuse_artifact(node, step_hash):
+                    log(f"♻️ {node.name}: inputs unchanged, reusing {node.artifact}")
+                    return
+
+            inputs = {dep: self.results[dep] for dep in node.deps}
+            log(f"▶️ {node.name}")
+            self.started[node.name] = time.time()
+            with span(node.name, "step", step=node.step, uses_streamer=node.uses_streamer) as node_span:
+                try:
+                    if node.uses_streamer:
+                        async with streamer_lock:
+                            result = await self._call(node, inputs)
+                    else:
+                        result = await self._call(node, inputs)
+                    self.results[node.name] = result
+                    self.status[node.name] = "SUCCESS" if result is not None else "FAILED"
+                    if result is not None:
+                        self._record_output(node, step_hash, result)
+                except Exception as e:
+                    self.status[node.name] = "EXCEPTION"
+                    log(f"❌ {node.name} failed with exception: {e}")
+                finally:
+                    self.finished[node.name] = time.time()
+                    node_span.set(status=self.status.get(node.name))
+            log(f"{'✅' if self.status[node.name] == 'SUCCESS' else '❌'} {node.name}: "
+                f"{self.status[node.name]} ({self.duration(node.name):.1f}s)")
+
+        for node in self.order():
+            tasks[node.name] = asyncio.ensure_future(run_node(node))
+        await asyncio.gather(*tasks.values())
+        return self.results
+
+    def _reuse_artifact(self, node, step_hash):
+        """Load a fresh artifact as the node's result; True when reused"""
+        manifest = fresh_manifest(node.artifact, step_hash, node.max_age)
+        if not manifest:
+            return False
+        try:
+            with open(node.artifact, "r") as f:
+                self.results[node.name] = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self.status[node.name] = "CACHED"
+        self.output_hashes[node.name] = manifest["output_hash"]
+        self.started[node.name] = self.finished[node.name] = time.time()
+        return True
+
+    def _record_output(self, node, step_hash, result):
+        """Write the manifest when the node wrote its artifact during this run"""
+        artifact_written = (
+            node.artifact and os.path.exists(node.artifact)
+            and os.path.getmtime(node.artifact) >= self.started[node.name]
+        )
+        if artifact_written:
+            manifest = write_manifest(node.artifact, step_hash, node.params)
+            self.output_hashes[node.name] = manifest["output_hash"]
+        else:
+            self.output_hashes[node.name] = hash_content(result)
+
+    async def _call(self, node, inputs):
+        if inspect.iscoroutinefunction(node.func):
+            return await node.func(inputs)
+        return await asyncio.to_thread(node.func, inputs)
@@ -0,0 +1,165 @@
+# quote_book.py - Array-Backed Quote & Greeks Book
+"""
+In-memory market data for streamed symbols, one row per symbol in a
+preallocated NumPy structured array. Symbols are interned to integer ids
+once (see symbol_registry.py), so event handlers update a row in O(1)
+with raw floats (no rounding, no per-event timestamp strings) and
+analytics read whole columns at once.
+Writers and snapshot() share a lock, so a snapshot taken from another
+thread never sees a half-written row.
+"""
+import threading
+import time
+import numpy as np
+from symbol_registry import SymbolRegistry
+
+QUOTE, GREEKS, SUMMARY = 1, 2, 4
+
+BOOK_FIELDS = ("bid", "ask", "mid", "iv", "delta", "theta", "gamma", "vega", "rho", "price", "oi", "volume")
+BOOK_DTYPE = np.dtype([(name, np.float64) for name in BOOK_FIELDS]
+                      + [("updated_ns", np.int64), ("seen", np.uint8)])
+
+class QuoteBook:
+    """Quote/Greeks/Summary rows indexed by interned symbol id.
+
+    Row ids come from a SymbolRegistry (pass one to share ids with the
+    caller's dispatch); ids/symbols are the registry's.
+    `seen` flags which event kinds (QUOTE | GREEKS | SUMMARY) a row has had;
+    quote_count/greeks_count/summary_count count rows on their first event.
+    """
+
+    def __init__(self, symbols=(), capacity=1024, registry=None):
+        self.registry = registry if registry is not None else SymbolRegistry()
+        self.ids = self.registry.ids
+        self.symbols = self.registry.symbols
+        self.quote_count = 0
+        self.greeks_count = 0
+        self.summary_count = 0
+        self.version = 0
+        self._lock = threading.Lock()
+        self._set_rows(self._empty(max(capacity, len(symbols), len(self.registry))))
+        for symbol in symbols:
+            self.intern(symbol)
+
+    @staticmethod
+    def _empty(capacity):
+        rows = np.zeros(capacity, dtype=BOOK_DTYPE)
+        for name in BOOK_FIELDS:
+            rows[name] = np.nan
+        return rows
+
+    def _set_rows(self, rows):
+        # Per-field views: scalar writes through them are much cheaper than via np.void rows
+        self._rows = rows
+        self._cols = {name: rows[name] for name in BOOK_DTYPE.names}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.ids
+
+    def intern(self, symbol):
+        """Row id for a symbol, allocating one the first time it is seen"""
+        sid = self.registry.intern(symbol)
+        if sid >= len(self._rows):
+            with self._lock:
+                self._grow(sid)
+        return sid
+
+    def _grow(self, sid):
+        # Symbols interned on a shared registry after the book was created
+        capacity = len(self._rows)
+        while capacity <= sid:
+            capacity *= 2
+        grown = self._empty(capacity)
+        grown[:len(self._rows)] = self._rows
+        self._set_rows(grown)
+
+    def _mark(self, sid, kind):
+        seen = self._cols["seen"]
+        first = not seen[sid] & kind
+        seen[sid] |= kind
+        self._cols["updated_ns"][sid] = time.time_ns()
+        self.version += 1
+        return first
+
+    # -- Writers (called from event handlers) ---------------------------
+
+    def set_quote(self, sid, bid, ask):
+        """Store a bid/ask; False if the market is invalid"""
+        if not (bid > 0 and ask > 0 and ask >= bid):
+            return False
+        with self._lock:
+            if sid >= len(self._rows):
+                self._grow(sid)
+            cols = self._cols
+            cols["bid"][sid], cols["ask"][sid], cols["mid"][sid] = bid, ask, (bid + ask) / 2
+            if self._mark(sid, QUOTE):
+                self.quote_count += 1
+        return True
+
+    def set_greeks(self, sid, iv, delta, theta, gamma, vega, rho=0.0, price=0.0):
+        with self._lock:
+            if sid >= len(self._rows):
+                self._grow(sid)
+            cols = self._cols
+            cols["iv"][sid], cols["delta"][sid], cols["theta"][sid], cols["gamma"][sid] = iv, delta, theta, gamma
+            cols["vega"][sid], cols["rho"][sid], cols["price"][sid] = vega, rho, price
+            if self._mark(sid, GREEKS):
+                self.greeks_count += 1
+        return True
+
+    def set_summary(self, sid, oi, volume):
+        with self._lock:
+            if sid >= len(self._rows):
+                self._grow(sid)
+            cols = self._cols
+            cols["oi"][sid], cols["volume"][sid] = oi, volume
+            if self._mark(sid, SUMMARY):
+                self.summary_count += 1
+        return True
+
+    def apply_quote(self, quote, sid=None):
+        """Quote event -> row; True if stored"""
+        sid = self.ids.get(quote.event_symbol) if sid is None else sid
+        if sid is None:
+            return False
+        return self.set_quote(sid, float(quote.bid_price or 0), float(quote.ask_price or 0))
+
+    def apply_greeks(self, greek, sid=None):
+        """Greeks event -> row; True if stored"""
+        sid = self.ids.get(greek.event_symbol) if sid is None else sid
+        if sid is None:
+            return False
+        return self.set_greeks(
+            sid, float(greek.volatility or 0), float(greek.delta or 0), float(greek.theta or 0),
+            float(greek.gamma or 0), float(greek.vega or 0), float(greek.rho or 0), float(greek.price or 0)
+        )
+
+    def apply_summary(self, summary, sid=None):
+        """Summary event (open interest, previous day volume) -> row; True if stored"""
+        sid = self.ids.get(summary.event_symbol) if sid is None else sid
+        if sid is None:
+            return False
+        return self.set_summary(sid, float(summary.open_interest or 0), float(summary.prev_day_volume or 0))
+
+    # -- Readers ---------------------------------------------------------
+
+    def has(self, sid, kind):
+        return sid < len(self._rows) and bool(self._cols["seen"][sid] & kind)
+
+    def snapshot(self, ids=None):
+        """Consistent copy of all rows (or of `ids`) for vectorized reads"""
+        with self._lock:
+            if len(self.symbols) > len(self._rows):
+                self._grow(len(self.symbols) - 1)
+            rows = self._rows[:len(self.symbols)]
+            return rows.copy() if ids is None else rows[np.asarray(ids, dtype=np.intp)]
+
+    def row(self, sid):
+        """One row as {field: float} (NaN for fields never set)"""
+        with self._lock:
+            if sid >= len(self._rows):
+                self._grow(sid)
+            return {name: float(self._cols[name][sid]) for name in BOOK_FIELDS}
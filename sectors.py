@@ -3,9 +3,10 @@
 Sector universes with performance tracking.
 UPDATED with new GPT/Grok ticker assignments from Aug 20, 2025
 """
-import time
 from pathlib import Path
 import json
+from simulator import add_synthetic_tickers, simulated
+from tracing import Span
 
 # GPT Portfolio (UPDATED Aug 20, 2025)
 SECTORS_GPT = {
@@ -106,18 +107,12 @@ SECTORS_GROK = {
 }
 
 # Performance tracking
-class PerfTimer:
-    def __init__(self, name):
-        self.name = name
-        self.start_time = None
-        
-    def __enter__(self):
-        self.start_time = time.time()
-        return self
-        
-    def __exit__(self, *args):
-        elapsed = time.time() - self.start_time
-        print(f"⏱️ {self.name}: {elapsed:.2f}s")
+class PerfTimer(Span):
+    """Prints a block's elapsed time; also a tracing span (see tracing.py)"""
+    __slots__ = ()
+    
+    def __init__(self, name, category="timer", **attributes):
+        super().__init__(name, category, echo=True, **attributes)
 
 PORTFOLIO_MODE = "gpt"  # Set by master.py
 
@@ -151,6 +146,9 @@ def get_sectors(mode: str = PORTFOLIO_MODE) -> dict:
                 }
         else:
             raise ValueError(f"Unknown mode '{mode}' (use 'gpt' | 'grok' | 'merged')")
+        
+        if simulated():
+            sectors = add_synthetic_tickers(sectors)
     
     # Validation
     total_tickers = sum(len(meta["tickers"]) for meta in sectors.values())
@@ -0,0 +1,125 @@
+# session_provider.py - Shared Authenticated Session
+"""
+One tastytrade login reused by every pipeline step and mode.
+The session is cached in-process and on disk (owner-only permissions),
+validated before reuse and refreshed when stale or rejected.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from stream_replay import replay_path
+from simulator import SimSession, simulated
+
+SESSION_FILE = Path(".tastytrade_session")
+SESSION_MAX_AGE_SECONDS = 20 * 3600  # tastytrade sessions last ~24h
+
+_session = None
+_session_created = 0.0
+_lock = threading.Lock()
+
+def _write_private(path: Path, payload: dict):
+    """Write a file readable only by the current user"""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+def _is_valid(sess) -> bool:
+    try:
+        return bool(sess.validate())
+    except Exception:
+        return False
+
+def _save_session(sess, created: float):
+    from config import USERNAME
+    payload = {"username": USERNAME, "created": created}
+    if hasattr(sess, "serialize"):
+        payload["session"] = sess.serialize()
+    payload["remember_token"] = getattr(sess, "remember_token", None)
+    try:
+        _write_private(SESSION_FILE, payload)
+    except OSError as e:
+        print(f"⚠️ Could not cache session: {e}")
+
+def _load_session():
+    """Restore the on-disk session if it belongs to USERNAME and is fresh"""
+    from tastytrade import Session
+    from config import USERNAME
+    if not SESSION_FILE.exists():
+        return None, 0.0
+    try:
+        with open(SESSION_FILE, "r") as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None, 0.0
+
+    created = payload.get("created", 0.0)
+    if payload.get("username") != USERNAME or time.time() - created > SESSION_MAX_AGE_SECONDS:
+        return None, 0.0
+
+    sess = None
+    if payload.get("session") and hasattr(Session, "deserialize"):
+        try:
+            sess = Session.deserialize(payload["session"])
+        except Exception:
+            sess = None
+    if sess is not None and _is_valid(sess):
+        return sess, created
+
+    # Token expired or no serialized form: re-login without the password
+    if payload.get("remember_token"):
+        try:
+            sess = Session(USERNAME, remember_token=payload["remember_token"], remember_me=True)
+            created = time.time()
+            _save_session(sess, created)
+            return sess, created
+        except Exception:
+            pass
+
+    return None, 0.0
+
+def get_session(force_refresh: bool = False):
+    """Return the shared authenticated session, logging in only when needed"""
+    global _session, _session_created
+
+    if replay_path():
+        # Replayed runs are offline: streams come from the recording, chains from the cache
+        return None
+    if simulated():
+        return SimSession()
+
+    # Live provider only, so sim and replay runs never import tastytrade or config
+    from tastytrade import Session
+    from config import USERNAME, PASSWORD
+    with _lock:
+        if _session is not None and not force_refresh:
+            if time.time() - _session_created < SESSION_MAX_AGE_SECONDS and _is_valid(_session):
+                return _session
+            _session, _session_created = None, 0.0
+
+        if not force_refresh:
+            sess, created = _load_session()
+            if sess is not None:
+                _session, _session_created = sess, created
+                return _session
+
+        print("🔐 Logging in to tastytrade...")
+        _session = Session(USERNAME, PASSWORD, remember_me=True)
+        _session_created = time.time()
+        _save_session(_session, _session_created)
+        return _session
+
+def clear_session():
+    """Forget the cached session (in-process and on disk)"""
+    global _session, _session_created
+    with _lock:
+        _session, _session_created = None, 0.0
+        SESSION_FILE.unlink(missing_ok=True)
+
+if __name__ == "__main__":
+    sess = get_session()
+    age = (time.time() - _session_created) / 60
+    print(f"✅ Session ready (age: {age:.0f} min, valid: {_is_valid(sess)})")
@@ -0,0 +1,81 @@
+# simulator/__init__.py - Local tastytrade/DXLink Simulator
+"""
+Offline market provider for development and load testing. With
+MARKET_PROVIDER=sim (master.py --provider sim) every pipeline step runs
+against synthetic data instead of tastytrade:
+
+    session_provider.get_session()   -> SimSession (no login)
+    chain_cache.get_option_chain()   -> market.build_chain() (weeklies + monthlies)
+    streaming.create_streamer()      -> SimStreamer (Quote/Greeks/Summary events)
+
+Feed behaviour comes from the environment:
+
+    SIM_EVENTS_PER_SECOND  delivery cap, 0 = unlimited      (default 20000)
+    SIM_LATENCY_MS         median first-event latency      (default 50)
+    SIM_LATENCY_SIGMA      lognormal latency spread        (default 0.5)
+    SIM_DROP_RATE          fraction of events lost         (default 0)
+    SIM_UPDATE_INTERVAL    seconds between updates, 0=none (default 0)
+    SIM_SEED               market/feed seed                (default 0)
+    SIM_TICKERS            extra synthetic underlyings spread across the
+                           sectors, for load tests (e.g. 5000)
+"""
+import os
+from simulator.feed import SimSession, SimStreamer
+from simulator.market import build_chain
+
+PROVIDER_ENV = "MARKET_PROVIDER"
+PROVIDERS = ("tastytrade", "sim")
+
+def provider():
+    value = (os.environ.get(PROVIDER_ENV) or "tastytrade").lower()
+    if value not in PROVIDERS:
+        raise ValueError(f"Unknown {PROVIDER_ENV} '{value}' (use {' | '.join(PROVIDERS)})")
+    return value
+
+def simulated():
+    return provider() == "sim"
+
+def provider_params():
+    """Provider settings that change pipeline output (for artifact manifests)"""
+    if not simulated():
+        return {}
+    names = ("SIM_SEED", "SIM_TICKERS", "SIM_DROP_RATE", "SIM_UPDATE_INTERVAL")
+    return {"provider": "sim", **{name.lower(): os.environ.get(name) for name in names}}
+
+def _env(name, default, cast=float):
+    value = os.environ.get(name)
+    return cast(value) if value not in (None, "") else default
+
+def seed():
+    return _env("SIM_SEED", 0, int)
+
+def create_sim_streamer(today=None):
+    """SimStreamer configured from the SIM_* environment, dated like the chains it quotes"""
+    from chain_cache import trading_date
+    return SimStreamer(
+        events_per_second=_env("SIM_EVENTS_PER_SECOND", 20000.0),
+        latency_ms=_env("SIM_LATENCY_MS", 50.0),
+        latency_sigma=_env("SIM_LATENCY_SIGMA", 0.5),
+        drop_rate=_env("SIM_DROP_RATE", 0.0),
+        update_interval=_env("SIM_UPDATE_INTERVAL", 0.0),
+        seed=seed(),
+        today=today or trading_date(),
+    )
+
+def sim_option_chain(symbol, today):
+    return build_chain(symbol, today, seed())
+
+def synthetic_tickers(count):
+    """Stable fake underlyings: SIM0001, SIM0002, ..."""
+    return [f"SIM{i:04d}" for i in range(1, count + 1)]
+
+def add_synthetic_tickers(sectors, count=None):
+    """Copy of `sectors` with `count` (default SIM_TICKERS) synthetic tickers dealt round-robin"""
+    count = _env("SIM_TICKERS", 0, int) if count is None else count
+    if not count:
+        return sectors
+    expanded = {key: {**meta, "tickers": list(meta["tickers"])} for key, meta in sectors.items()}
+    keys = sorted(expanded)
+    for i, ticker in enumerate(synthetic_tickers(count)):
+        expanded[keys[i % len(keys)]]["tickers"].append(ticker)
+    return expanded
@@ -0,0 +1,257 @@
+# simulator/dataset.py - Synthetic Greeks Dataset Generator
+"""
+Writes options_contracts_{mode}.json and greeks_data_{mode}.json (plus their
+.columns/ tables) of any size, tickers x expirations x strikes, from the
+simulator's market model: skewed IV smile, Black-Scholes Greeks, bid/ask
+widths and OI that thin out away from the money. The same seed and as-of
+date always give the same contracts and market data, so spread_analyzer.py
+and the scoring functions can be profiled at 10x, 100x or 1000x a live run.
+
+    python3 -m simulator.dataset --scale 10 --expirations 8 --strikes 40 --out-dir synthetic
+
+Only collection_timestamp/timestamp headers change between runs. Every
+contract is held in memory while the files are written (roughly 2 KB per
+contract), so very large sets are best generated with --no-json.
+"""
+import argparse
+import json
+import math
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from simulator import synthetic_tickers
+from simulator.market import (expirations as listed_expirations, occ_symbol, option_market, streamer_symbol,
+                              strike_step, underlying, underlying_quote)
+
+DEFAULT_EXPIRATIONS = 6
+DEFAULT_STRIKES = 30
+MIN_DTE = 7
+
+def dataset_tickers(mode, count=None):
+    """[(ticker, sector)]: the mode's own tickers, topped up with synthetic ones dealt across its sectors"""
+    from sectors import get_sectors
+    sectors = get_sectors(mode)
+    pairs = [(ticker, sector) for sector, meta in sectors.items() for ticker in meta["tickers"]]
+    if count is None or count <= len(pairs):
+        return pairs[:count]
+
+    taken = {ticker for ticker, _ in pairs}
+    names = (t for t in synthetic_tickers(count + len(taken)) if t not in taken)
+    sector_names = list(sectors)
+    for i in range(count - len(pairs)):
+        pairs.append((next(names), sector_names[i % len(sector_names)]))
+    return pairs
+
+def generate_universe(mode="gpt", tickers=None):
+    """universe_{mode}.json-shaped records, all validated"""
+    return [{"ticker": ticker, "requested": ticker, "sector": sector, "status": "ok"}
+            for ticker, sector in dataset_tickers(mode, tickers)]
+
+def generate_spot_quotes(mode="gpt", tickers=None, seed=0):
+    """spot_quotes_{mode}.json-shaped payload at the model spots"""
+    quotes = {}
+    for ticker, sector in dataset_tickers(mode, tickers):
+        bid, ask = underlying_quote(underlying(ticker, seed).spot)
+        mid, spread = (bid + ask) / 2, ask - bid
+        quotes[ticker] = {
+            "ticker": ticker,
+            "bid": bid,
+            "ask": ask,
+            "mid": round(mid, 4),
+            "spread": round(spread, 4),
+            "spread_pct": round(100 * spread / mid, 3),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "sector": sector,
+        }
+    return {
+        "mode": mode,
+        "collection_stats": {"validated_tickers": len(quotes), "quotes_collected": len(quotes), "success_rate": 100.0},
+        "quotes": quotes,
+        "missing_tickers": [],
+        "sectors_represented": sorted({quote["sector"] for quote in quotes.values()}),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+def liquidity_score(u):
+    """0-100 score from the ticker's OI scale (the live ranker's cut-off is 40)"""
+    return round(min(100.0, 10 + 20 * math.log10(u.liquidity)), 1)
+
+def strike_ladder(spot, count):
+    """`count` listing-grid strikes centred on spot"""
+    step = strike_step(spot)
+    centre = round(spot / step) * step
+    first = centre - (count // 2) * step
+    while first <= 0:
+        first += step
+    return [round(first + i * step, 2) for i in range(count)]
+
+def expiration_dates(today, count):
+    listed = listed_expirations(today, weeklies=max(8, count))
+    return [exp for exp in listed if (exp - today).days >= MIN_DTE][:count]
+
+def generate_contracts_data(mode="gpt", tickers=None, expirations=DEFAULT_EXPIRATIONS, strikes=DEFAULT_STRIKES,
+                            seed=0, today=None):
+    """options_contracts-shaped payload (see options_chains.py) plus a {streamer_symbol: market} map"""
+    today = today or datetime.now(timezone.utc).date()
+    all_contracts, markets = {}, {}
+    total_contracts = 0
+
+    for ticker, sector in dataset_tickers(mode, tickers):
+        u = underlying(ticker, seed)
+        spot = u.spot
+        ticker_contracts = {
+            "ticker": ticker,
+            "current_price": spot,
+            "liquidity_score": liquidity_score(u),
+            "sector": sector,
+            "expiration_dates": {},
+            "summary": {"total_contracts": 0, "total_calls": 0, "total_puts": 0,
+                        "expiration_count": 0, "suitable_expirations": 0},
+        }
+        ladder = strike_ladder(spot, strikes)
+
+        for exp_date in expiration_dates(today, expirations):
+            dte = (exp_date - today).days
+            exp_str = exp_date.isoformat()
+            contracts = []
+            for strike in ladder:
+                for option_type in ("C", "P"):
+                    symbol = streamer_symbol(ticker, exp_date, option_type, strike)
+                    itm = strike < spot if option_type == "C" else strike > spot
+                    contracts.append({
+                        "symbol": occ_symbol(ticker, exp_date, option_type, strike),
+                        "streamer_symbol": symbol,
+                        "strike": strike,
+                        "option_type": option_type,
+                        "dte": dte,
+                        "distance_from_current": round(abs(strike - spot) / spot * 100, 1),
+                        "moneyness": "ITM" if itm else "OTM",
+                    })
+                    markets[symbol] = option_market(u, spot, strike, dte / 365, option_type)
+
+            half = len(contracts) // 2
+            ticker_contracts["expiration_dates"][exp_str] = {
+                "expiration_date": exp_str,
+                "dte": dte,
+                "contracts": contracts,
+                "calls": half,
+                "puts": half,
+                "total": len(contracts),
+                "otm_calls": len([c for c in contracts if c["option_type"] == "C" and c["moneyness"] == "OTM"]),
+                "otm_puts": len([c for c in contracts if c["option_type"] == "P" and c["moneyness"] == "OTM"]),
+            }
+            summary = ticker_contracts["summary"]
+            summary["total_contracts"] += len(contracts)
+            summary["total_calls"] += half
+            summary["total_puts"] += half
+            summary["suitable_expirations"] += 1
+
+        ticker_contracts["summary"]["expiration_count"] = len(ticker_contracts["expiration_dates"])
+        total_contracts += ticker_contracts["summary"]["total_contracts"]
+        all_contracts[ticker] = ticker_contracts
+
+    contracts_data = {
+        "mode": mode,
+        "discovery_stats": {
+            "input_tickers": len(all_contracts),
+            "tickers_with_contracts": len(all_contracts),
+            "total_contracts_found": total_contracts,
+            "success_rate": 100.0 if all_contracts else 0,
+            "avg_contracts_per_ticker": round(total_contracts / len(all_contracts), 1) if all_contracts else 0,
+            "liquidity_filter_applied": False,
+            "min_liquidity_score": 0,
+        },
+        "contracts_by_ticker": all_contracts,
+        "credit_spread_analysis": {
+            "tickers_ready_for_spreads": len(all_contracts),
+            "total_potential_spread_legs": total_contracts,
+            "avg_expirations_per_ticker": round(sum(data["summary"]["suitable_expirations"]
+                                                    for data in all_contracts.values()) / len(all_contracts), 1)
+                                          if all_contracts else 0,
+        },
+        "synthetic": {"seed": seed, "as_of": today.isoformat(), "expirations": expirations, "strikes": strikes},
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+    return contracts_data, markets
+
+def generate_greeks_data(contracts_data, markets):
+    """greeks_data (GreeksData) for generated contracts, built exactly as greeks.py builds a live run's"""
+    from greeks import assemble_greeks_data, contract_registry, greek_values, price_fields
+
+    all_symbols, registry = contract_registry(contracts_data["contracts_by_ticker"])
+    as_of = f"{contracts_data['synthetic']['as_of']}T20:00:00+00:00"
+    quotes_data, greeks_data, timestamps = {}, {}, {}
+    for symbol in all_symbols:
+        m = markets[symbol]
+        quote = price_fields(m["bid"], m["ask"])
+        if quote is not None:
+            quotes_data[symbol] = {**quote, "open_interest": m["open_interest"], "volume": m["volume"]}
+        greeks_data[symbol] = greek_values(m["delta"], m["theta"], m["gamma"], m["vega"], m["rho"],
+                                           m["iv"], m["price"])
+        timestamps[symbol] = as_of
+
+    result = assemble_greeks_data(contracts_data["mode"], all_symbols, registry, quotes_data, greeks_data, timestamps)
+    result["synthetic"] = contracts_data["synthetic"]
+    return result
+
+def generate_dataset(mode="gpt", tickers=None, expirations=DEFAULT_EXPIRATIONS, strikes=DEFAULT_STRIKES,
+                     seed=0, today=None):
+    """(contracts_data, greeks_data) for tickers x expirations x strikes (x2 for calls and puts)"""
+    contracts_data, markets = generate_contracts_data(mode, tickers, expirations, strikes, seed, today)
+    return contracts_data, generate_greeks_data(contracts_data, markets)
+
+def write_dataset(out_dir, contracts_data, greeks_data, columnar=True, export_json=True):
+    """Write both artifacts under out_dir using the pipeline's file names and formats"""
+    from columnar import save_contracts_table
+    from greeks import save_greeks_data
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    mode = contracts_data["mode"]
+    contracts_path = out_dir / f"options_contracts_{mode}.json"
+    greeks_path = out_dir / f"greeks_data_{mode}.json"
+
+    # JSON first: the tables are only read when at least as new as their JSON (columnar.table_is_current)
+    if export_json:
+        with open(contracts_path, "w") as f:
+            json.dump(contracts_data, f, indent=2)
+    if columnar:
+        save_contracts_table(contracts_data, contracts_path)
+    save_greeks_data(greeks_data, greeks_path, columnar, export_json)
+    return contracts_path, greeks_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic options_contracts/greeks_data dataset")
+    parser.add_argument("--mode", default="gpt", choices=["gpt", "grok", "merged"],
+                        help="Sector layout (and base tickers) to use")
+    parser.add_argument("--tickers", type=int, default=None, help="Underlyings (default: the mode's tickers)")
+    parser.add_argument("--scale", type=float, default=None, help="Underlyings as a multiple of the mode's tickers")
+    parser.add_argument("--expirations", type=int, default=DEFAULT_EXPIRATIONS, help="Expirations per ticker")
+    parser.add_argument("--strikes", type=int, default=DEFAULT_STRIKES,
+                        help="Strikes per expiration (each listed as a call and a put)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--date", default=None, help="As-of date for DTEs (YYYY-MM-DD, default today)")
+    parser.add_argument("--out-dir", default="synthetic", help="Output directory (keeps live artifacts untouched)")
+    parser.add_argument("--no-json", action="store_true", help="Columnar tables only")
+    parser.add_argument("--no-columnar", action="store_true", help="JSON only")
+    args = parser.parse_args()
+
+    tickers = args.tickers
+    if args.scale is not None:
+        tickers = max(1, round(len(dataset_tickers(args.mode)) * args.scale))
+    today = date.fromisoformat(args.date) if args.date else None
+
+    start = time.time()
+    contracts_data, greeks_data = generate_dataset(args.mode, tickers, args.expirations, args.strikes,
+                                                   args.seed, today)
+    paths = write_dataset(args.out_dir, contracts_data, greeks_data,
+                          columnar=not args.no_columnar, export_json=not args.no_json)
+
+    stats = contracts_data["discovery_stats"]
+    print(f"🧪 {stats['tickers_with_contracts']:,} tickers, {stats['total_contracts_found']:,} contracts "
+          f"(seed {args.seed}) in {time.time() - start:.1f}s")
+    print(f"  💰 Sellable contracts: {greeks_data['credit_spread_summary']['total_sellable_contracts']:,}")
+    print(f"  📁 Saved: {', '.join(str(path) for path in paths)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# simulator/feed.py - Simulated DXLink Streamer
+"""
+SimStreamer implements the streamer interface the pipeline uses
+(subscribe, unsubscribe, get_event, async with) on top of the synthetic
+market in market.py. Each subscribed symbol gets its first event after a
+lognormal latency, later updates every ~update_interval seconds while the
+underlying random-walks, a drop_rate fraction of events is lost, and a
+token bucket caps the total event rate.
+"""
+import asyncio
+import heapq
+import math
+import random
+import time
+from datetime import datetime, timezone
+from stream_replay import REPLAY_EVENTS
+from simulator.market import option_market, parse_streamer_symbol, underlying, underlying_quote
+
+MIN_SLEEP_SECONDS = 0.002
+TRADING_SECONDS_PER_YEAR = 252 * 6.5 * 3600
+
+class SimSession:
+    """Stand-in for tastytrade.Session: nothing to log in to"""
+
+    def validate(self):
+        return True
+
+class SimStreamer:
+    """DXLinkStreamer stand-in fed by the synthetic market.
+
+    events_per_second: global delivery cap (0 = unlimited).
+    latency_ms / latency_sigma: median and lognormal spread of the delay
+    between subscribing and a symbol's first event.
+    drop_rate: probability that any single event is lost.
+    update_interval: mean seconds between updates per symbol (0 = one
+    snapshot per subscription, like a closed market).
+    """
+
+    def __init__(self, events_per_second=20000, latency_ms=50.0, latency_sigma=0.5, drop_rate=0.0,
+                 update_interval=0.0, seed=0, today=None):
+        self.events_per_second = events_per_second
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.drop_rate = drop_rate
+        self.update_interval = update_interval
+        self.seed = seed
+        self.today = today or datetime.now(timezone.utc).date()
+        self.events_sent = 0
+        self.events_dropped = 0
+        self._rng = random.Random(seed)
+        self._queues = {}
+        self._subscribed = {}
+        self._scheduled = set()
+        self._due = []
+        self._sequence = 0
+        self._wakeup = asyncio.Event()
+        self._spots = {}
+        self._contracts = {}
+        self._pump_task = None
+
+    async def __aenter__(self):
+        self._pump_task = asyncio.create_task(self._pump())
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._pump_task is not None:
+            self._pump_task.cancel()
+            await asyncio.gather(self._pump_task, return_exceptions=True)
+        return False
+
+    def _queue(self, type_name):
+        if type_name not in self._queues:
+            self._queues[type_name] = asyncio.Queue()
+        return self._queues[type_name]
+
+    def _schedule(self, due, type_name, symbol):
+        self._sequence += 1
+        heapq.heappush(self._due, (due, self._sequence, type_name, symbol))
+
+    async def subscribe(self, event_type, symbols):
+        type_name = event_type.__name__
+        subscribed = self._subscribed.setdefault(type_name, set())
+        now = time.monotonic()
+        for symbol in symbols:
+            subscribed.add(symbol)
+            if (type_name, symbol) not in self._scheduled:
+                self._scheduled.add((type_name, symbol))
+                latency = self.latency_ms / 1000 * math.exp(self.latency_sigma * self._rng.gauss(0, 1))
+                self._schedule(now + latency, type_name, symbol)
+        self._wakeup.set()
+
+    async def unsubscribe(self, event_type, symbols):
+        self._subscribed.get(event_type.__name__, set()).difference_update(symbols)
+
+    async def get_event(self, event_type):
+        return await self._queue(event_type.__name__).get()
+
+    # -- Market state ----------------------------------------------------
+
+    def _spot(self, ticker):
+        """Underlying model and current spot (a random walk when updates are on)"""
+        state = self._spots.get(ticker)
+        now = time.monotonic()
+        if state is None:
+            u = underlying(ticker, self.seed)
+            state = self._spots[ticker] = [u, u.spot, now]
+        u, spot, last = state
+        if self.update_interval and now > last:
+            step = u.base_iv * math.sqrt((now - last) / TRADING_SECONDS_PER_YEAR)
+            state[1], state[2] = spot * math.exp(step * self._rng.gauss(0, 1)), now
+        return u, state[1]
+
+    def _contract(self, symbol):
+        if symbol not in self._contracts:
+            parsed = parse_streamer_symbol(symbol)
+            if parsed is not None:
+                ticker, expiration, option_type, strike = parsed
+                parsed = (ticker, (expiration - self.today).days / 365, option_type, strike)
+            self._contracts[symbol] = parsed
+        return self._contracts[symbol]
+
+    def _event(self, type_name, symbol):
+        """Build one event for a symbol, or None if the type does not apply"""
+        contract = self._contract(symbol)
+        if contract is None:
+            u, spot = self._spot(symbol)
+            if type_name == "Quote":
+                bid, ask = underlying_quote(spot)
+                return REPLAY_EVENTS["Quote"](symbol, bid, ask, 100.0, 100.0)
+            if type_name == "Summary":
+                return REPLAY_EVENTS["Summary"](symbol, None, float(u.liquidity * 500),
+                                                round(spot * 1.01, 2), round(spot * 0.99, 2))
+            return None
+
+        ticker, years, option_type, strike = contract
+        u, spot = self._spot(ticker)
+        m = option_market(u, spot, strike, years, option_type)
+        if type_name == "Quote":
+            return REPLAY_EVENTS["Quote"](symbol, m["bid"], m["ask"], 10.0, 10.0)
+        if type_name == "Greeks":
+            return REPLAY_EVENTS["Greeks"](symbol, m["iv"], m["delta"], m["gamma"], m["theta"],
+                                           m["rho"], m["vega"], m["price"])
+        if type_name == "Summary":
+            return REPLAY_EVENTS["Summary"](symbol, float(m["open_interest"]), float(m["volume"]), None, None)
+        return None
+
+    # -- Delivery --------------------------------------------------------
+
+    async def _pump(self):
+        rate = self.events_per_second
+        burst = max(1.0, rate / 10) if rate else 0.0
+        tokens, refilled = burst, time.monotonic()
+        delivered = 0
+        while True:
+            if not self._due:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            wait = self._due[0][0] - now
+            if wait > MIN_SLEEP_SECONDS:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if rate:
+                tokens, refilled = min(burst, tokens + (now - refilled) * rate), now
+                if tokens < 1:
+                    await asyncio.sleep((1 - tokens) / rate)
+                    continue
+                tokens -= 1
+
+            _, _, type_name, symbol = heapq.heappop(self._due)
+            if symbol not in self._subscribed.get(type_name, ()):
+                self._scheduled.discard((type_name, symbol))
+                continue
+
+            if self._rng.random() < self.drop_rate:
+                self.events_dropped += 1
+            else:
+                event = self._event(type_name, symbol)
+                if event is not None:
+                    self._queue(type_name).put_nowait(event)
+                    self.events_sent += 1
+
+            if self.update_interval:
+                self._schedule(now + self.update_interval * (0.5 + self._rng.random()), type_name, symbol)
+            else:
+                self._scheduled.discard((type_name, symbol))
+
+            delivered += 1
+            if delivered % 500 == 0:
+                await asyncio.sleep(0)  # let consumers drain
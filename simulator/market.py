@@ -0,0 +1,168 @@
+# simulator/market.py - Deterministic Synthetic Market
+"""
+Per-ticker spot, IV level and liquidity derived from a stable hash of the
+symbol, weekly + monthly expirations, price-dependent strike grids, a
+skewed IV smile, Black-Scholes prices/Greeks, bid/ask widths and OI.
+Everything is a pure function of (ticker, seed, date), so chains, streamed
+events and generated datasets agree with each other across processes.
+"""
+import math
+import zlib
+from collections import namedtuple
+from datetime import date, timedelta
+from enum import Enum
+
+RISK_FREE_RATE = 0.05
+
+class OptionType(Enum):
+    CALL = "C"
+    PUT = "P"
+
+# Same attributes the pipeline reads from tastytrade Option objects
+SimOption = namedtuple("SimOption", ["symbol", "streamer_symbol", "strike_price", "option_type", "expiration_date"])
+
+Underlying = namedtuple("Underlying", ["ticker", "spot", "base_iv", "skew", "liquidity"])
+
+def _unit(*parts):
+    """Stable uniform [0, 1) from the parts (crc32, so identical in every process)"""
+    return zlib.crc32("|".join(str(p) for p in parts).encode()) / 2**32
+
+def underlying(ticker, seed=0):
+    """Spot, ATM IV level, put skew and OI scale for a ticker"""
+    spot = math.exp(math.log(15) + _unit(ticker, seed, "spot") * (math.log(900) - math.log(15)))
+    return Underlying(
+        ticker=ticker,
+        spot=round(spot, 2),
+        base_iv=0.15 + 0.55 * _unit(ticker, seed, "iv") ** 2,
+        skew=0.4 + 0.8 * _unit(ticker, seed, "skew"),
+        liquidity=int(200 + 20000 * _unit(ticker, seed, "liquidity") ** 3),
+    )
+
+def strike_step(spot):
+    if spot < 25:
+        return 0.5
+    if spot < 50:
+        return 1.0
+    if spot < 200:
+        return 2.5
+    if spot < 500:
+        return 5.0
+    return 10.0
+
+def strike_grid(spot, width=0.5):
+    """Strikes on the listing grid from spot*(1-width) to spot*(1+width)"""
+    step = strike_step(spot)
+    low = max(step, math.floor(spot * (1 - width) / step) * step)
+    high = math.ceil(spot * (1 + width) / step) * step
+    count = int(round((high - low) / step)) + 1
+    return [round(low + i * step, 2) for i in range(count)]
+
+def expirations(today, weeklies=8, months=12):
+    """Next `weeklies` Fridays plus the third Friday of the following months"""
+    days_to_friday = (4 - today.weekday()) % 7 or 7
+    first_friday = today + timedelta(days=days_to_friday)
+    dates = {first_friday + timedelta(weeks=i) for i in range(weeklies)}
+
+    year, month = today.year, today.month
+    for _ in range(months):
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+        first = date(year, month, 1)
+        dates.add(first + timedelta(days=(4 - first.weekday()) % 7 + 14))
+    return sorted(d for d in dates if d > today)
+
+def streamer_symbol(ticker, expiration, option_type, strike):
+    return f".{ticker}{expiration:%y%m%d}{option_type}{strike:g}"
+
+def occ_symbol(ticker, expiration, option_type, strike):
+    return f"{ticker:<6}{expiration:%y%m%d}{option_type}{int(round(strike * 1000)):08d}"
+
+def parse_streamer_symbol(symbol):
+    """(ticker, expiration, 'C'|'P', strike) for an option streamer symbol, else None"""
+    if not symbol.startswith("."):
+        return None
+    body = symbol[1:]
+    for i in range(len(body) - 1, 5, -1):
+        if body[i] in "CP" and body[i - 6:i].isdigit():
+            try:
+                expiration = date(2000 + int(body[i - 6:i - 4]), int(body[i - 4:i - 2]), int(body[i - 2:i]))
+                return body[:i - 6], expiration, body[i], float(body[i + 1:])
+            except ValueError:
+                return None
+    return None
+
+def build_chain(ticker, today, seed=0):
+    """{expiration: [SimOption]} like tastytrade's get_option_chain"""
+    spot = underlying(ticker, seed).spot
+    strikes = [(strike, f"{strike:g}", f"{int(round(strike * 1000)):08d}") for strike in strike_grid(spot)]
+    root = f"{ticker:<6}"
+    chain = {}
+    for expiration in expirations(today):
+        stamp = f"{expiration:%y%m%d}"
+        options = []
+        for strike, short, padded in strikes:
+            for option_type, code in ((OptionType.CALL, "C"), (OptionType.PUT, "P")):
+                options.append(SimOption(root + stamp + code + padded, "." + ticker + stamp + code + short,
+                                         strike, option_type, expiration))
+        chain[expiration] = options
+    return chain
+
+def implied_vol(u, spot, strike, years):
+    """Skewed smile: higher IV for low strikes, curvature in both wings, short-dated bump"""
+    log_m = math.log(strike / spot)
+    smile = 1 - u.skew * log_m + 1.5 * log_m * log_m
+    term = 1 + 0.15 * math.exp(-6 * years)
+    return max(0.05, u.base_iv * smile * term)
+
+def _norm_cdf(x):
+    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+
+def _norm_pdf(x):
+    return math.exp(-0.5 * x * x) / math.sqrt(2 * math.pi)
+
+def black_scholes(spot, strike, years, iv, option_type, rate=RISK_FREE_RATE):
+    """Price and Greeks (theta per day, vega/rho per 1 point)"""
+    years = max(years, 1 / 365)
+    sqrt_t = math.sqrt(years)
+    d1 = (math.log(spot / strike) + (rate + 0.5 * iv * iv) * years) / (iv * sqrt_t)
+    d2 = d1 - iv * sqrt_t
+    discount = math.exp(-rate * years)
+    gamma = _norm_pdf(d1) / (spot * iv * sqrt_t)
+    vega = spot * _norm_pdf(d1) * sqrt_t / 100
+    decay = -spot * _norm_pdf(d1) * iv / (2 * sqrt_t)
+    if option_type == "C":
+        price = spot * _norm_cdf(d1) - strike * discount * _norm_cdf(d2)
+        delta = _norm_cdf(d1)
+        theta = (decay - rate * strike * discount * _norm_cdf(d2)) / 365
+        rho = strike * years * discount * _norm_cdf(d2) / 100
+    else:
+        price = strike * discount * _norm_cdf(-d2) - spot * _norm_cdf(-d1)
+        delta = _norm_cdf(d1) - 1
+        theta = (decay + rate * strike * discount * _norm_cdf(-d2)) / 365
+        rho = -strike * years * discount * _norm_cdf(-d2) / 100
+    return {"price": max(price, 0.0), "delta": delta, "gamma": gamma, "theta": theta, "vega": vega, "rho": rho}
+
+def underlying_quote(spot):
+    """(bid, ask) for an underlying: a one-basis-point half spread, at least half a cent"""
+    half = max(0.005, spot * 0.0001)
+    return round(spot - half, 2), round(spot + half, 2)
+
+def _tick(value):
+    return round(round(value / 0.01) * 0.01, 2)
+
+def option_market(u, spot, strike, years, option_type):
+    """Quote, Greeks and OI/volume for one contract at the given spot"""
+    iv = implied_vol(u, spot, strike, years)
+    model = black_scholes(spot, strike, years, iv, option_type)
+    price = model["price"]
+    distance = abs(math.log(strike / spot))
+
+    # Wider (relative) markets for cheap, far-from-the-money contracts
+    width = max(0.01, price * 0.04 * (1 + 6 * distance) + 0.01 * (1 + 200 / max(u.liquidity, 1)) ** 0.5)
+    bid = max(0.0, _tick(price - width / 2))
+    ask = max(bid + 0.01, _tick(price + width / 2))
+
+    open_interest = int(u.liquidity * math.exp(-(distance / 0.12) ** 2) / (1 + 4 * years))
+    volume = int(open_interest * (0.05 + 0.25 * _unit(u.ticker, strike, years)))
+    return {"bid": bid, "ask": ask, "iv": iv, "open_interest": open_interest, "volume": volume, **model}
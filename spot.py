@@ -5,25 +5,28 @@ Gets real-time stock prices needed for liquidity analysis and credit spreads.
 """
 import asyncio
 import json
-import time
 from datetime import datetime, timezone
-from tastytrade import Session, DXLinkStreamer
-from tastytrade.dxfeed import Quote
-from config import USERNAME, PASSWORD
+from session_provider import get_session
 from sectors import PerfTimer
+from streaming import collect_events, event_types, open_streamer
+from symbol_registry import SymbolRegistry
 
-async def collect_quotes_for_validated_tickers(mode, timeout=10):
+Quote, _, _ = event_types()
+
+async def collect_quotes_for_validated_tickers(mode, timeout=10, universe_data=None, streamer=None, save=True,
+                                              prefetched_quotes=None):
     """Collect quotes for all validated tickers from universe file"""
     print(f"📊 Collecting quotes for {mode.upper()} validated tickers")
     print("=" * 60)
     
-    # Load validated universe from build_universe.py
-    try:
-        with open(f"universe_{mode}.json", "r") as f:
-            universe_data = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ universe_{mode}.json not found. Run build_universe.py first.")
-        return None
+    # Load validated universe from build_universe.py (unless passed in memory)
+    if universe_data is None:
+        try:
+            with open(f"universe_{mode}.json", "r") as f:
+                universe_data = json.load(f)
+        except FileNotFoundError:
+            print(f"❌ universe_{mode}.json not found. Run build_universe.py first.")
+            return None
     
     # Extract validated tickers only (status = "ok")
     validated_tickers = [
@@ -39,67 +42,71 @@ async def collect_quotes_for_validated_tickers(mode, timeout=10):
     print(f"📋 Tickers: {', '.join(validated_tickers)}")
     print(f"⏱️ Timeout: {timeout}s")
     
-    sess = Session(USERNAME, PASSWORD)
+    sess = get_session()
     quotes = {}
-    events_received = 0
     
-    with PerfTimer(f"{mode.upper()} quote collection"):
-        async with DXLinkStreamer(sess) as streamer:
-            print("📡 Subscribing to quotes...")
-            await streamer.subscribe(Quote, validated_tickers)
-            
-            start_time = time.time()
-            last_report = start_time
-            collected = set()
+    events_received = 0
+    elapsed = 0.0
+    
+    if prefetched_quotes is not None:
+        # Quotes were collected once for a superset of this mode's tickers
+        print("♻️ Using shared quotes (no streaming)")
+        with PerfTimer(f"{mode.upper()} quote collection", "mode", mode=mode, shared=True):
+            for ticker in validated_tickers:
+                if ticker in prefetched_quotes:
+                    quotes[ticker] = {k: v for k, v in prefetched_quotes[ticker].items() if k != "sector"}
+    else:
+        with PerfTimer(f"{mode.upper()} quote collection", "mode", mode=mode):
+            async with open_streamer(sess, streamer) as streamer:
+                print("📡 Subscribing to quotes...")
+                registry = SymbolRegistry(validated_tickers)
             
-            while time.time() - start_time < timeout:
-                elapsed = time.time() - start_time
+                def on_quote(quote):
+                    if quote.event_symbol not in registry or quote.event_symbol in quotes:
+                        return False
+                    bid, ask = float(quote.bid_price or 0), float(quote.ask_price or 0)
+                    if not (bid > 0 and ask > 0 and ask >= bid):
+                        return False
                 
-                # Progress report every 3s
-                if time.time() - last_report >= 3:
-                    rate = len(collected) / len(validated_tickers) * 100
-                    print(f"  📈 Progress: {len(collected)}/{len(validated_tickers)} ({rate:.1f}%) | {elapsed:.1f}s")
-                    last_report = time.time()
-                
-                # Early exit at 95% after 4s
-                if len(collected) >= len(validated_tickers) * 0.95 and elapsed > 4:
-                    print("  🚀 Early exit at 95% coverage")
-                    break
-                
-                try:
-                    quote = await asyncio.wait_for(streamer.get_event(Quote), timeout=0.4)
-                    events_received += 1
-                    
-                    if quote and quote.event_symbol in validated_tickers and quote.event_symbol not in collected:
-                        bid, ask = float(quote.bid_price or 0), float(quote.ask_price or 0)
-                        
-                        if bid > 0 and ask > 0 and ask >= bid:
-                            mid = (bid + ask) / 2
-                            spread = ask - bid
-                            
-                            quotes[quote.event_symbol] = {
-                                "ticker": quote.event_symbol,
-                                "bid": round(bid, 4),
-                                "ask": round(ask, 4), 
-                                "mid": round(mid, 4),
-                                "spread": round(spread, 4),
-                                "spread_pct": round(100 * spread / mid, 3) if mid > 0 else 0,
-                                "timestamp": datetime.now(timezone.utc).isoformat()
-                            }
-                            collected.add(quote.event_symbol)
-                            print(f"  💰 {quote.event_symbol}: ${mid:.2f} (spread: {100 * spread / mid:.2f}%)")
-                            
-                except asyncio.TimeoutError:
-                    continue
-                except Exception as e:
-                    print(f"  ⚠️ Quote error: {e}")
-                    continue
+                    mid = (bid + ask) / 2
+                    spread = ask - bid
+                    quotes[quote.event_symbol] = {
+                        "ticker": quote.event_symbol,
+                        "bid": round(bid, 4),
+                        "ask": round(ask, 4), 
+                        "mid": round(mid, 4),
+                        "spread": round(spread, 4),
+                        "spread_pct": round(100 * spread / mid, 3) if mid > 0 else 0,
+                        "timestamp": datetime.now(timezone.utc).isoformat()
+                    }
+                    print(f"  💰 {quote.event_symbol}: ${mid:.2f} (spread: {100 * spread / mid:.2f}%)")
+                    return True
+            
+                def report(elapsed):
+                    rate = len(quotes) / len(validated_tickers) * 100
+                    print(f"  📈 Progress: {len(quotes)}/{len(validated_tickers)} ({rate:.1f}%) | {elapsed:.1f}s")
+            
+                def coverage_reached(elapsed):
+                    # All quotes in, or 95% after 4s
+                    if len(quotes) >= len(validated_tickers):
+                        return True
+                    return len(quotes) >= len(validated_tickers) * 0.95 and elapsed > 4
             
-            await streamer.unsubscribe(Quote, validated_tickers)
+                collector = await collect_events(
+                    streamer,
+                    {Quote: validated_tickers},
+                    {Quote: on_quote},
+                    done=coverage_reached,
+                    timeout=timeout,
+                    progress=report
+                )
+                events_received = collector.events_received
+                elapsed = collector.elapsed
+                if collector.stop_reason == "coverage":
+                    print("  🚀 Early exit on coverage")
     
     # Calculate results
     success_rate = len(quotes) / len(validated_tickers) * 100
-    elapsed = time.time() - start_time
     
     # Map tickers back to sectors for analysis
     ticker_to_sector = {}
@@ -122,21 +129,23 @@ async def collect_quotes_for_validated_tickers(mode, timeout=10):
         },
         "quotes": quotes,
         "missing_tickers": [t for t in validated_tickers if t not in quotes],
-        "sectors_represented": list(set(quote_data["sector"] for quote_data in quotes.values())),
+        "sectors_represented": sorted(set(quote_data["sector"] for quote_data in quotes.values())),
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
     
     # Save results
     filename = f"spot_quotes_{mode}.json"
-    with open(filename, "w") as f:
-        json.dump(result, f, indent=2)
+    if save:
+        with open(filename, "w") as f:
+            json.dump(result, f, indent=2)
     
     print(f"\n📊 {mode.upper()} Quote Collection Results:")
     print(f"  ✅ Success: {len(quotes)}/{len(validated_tickers)} ({success_rate:.1f}%)")
     print(f"  📡 Events: {events_received}")
     print(f"  ⏱️ Time: {elapsed:.1f}s")
     print(f"  🏢 Sectors: {len(result['sectors_represented'])}")
-    print(f"  📁 Saved: {filename}")
+    if save:
+        print(f"  📁 Saved: {filename}")
     
     if result["missing_tickers"]:
         print(f"  ❌ Missing: {result['missing_tickers']}")
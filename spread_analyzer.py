@@ -4,13 +4,22 @@ FINAL STEP - Constructs and analyzes credit spreads using real market data.
 Calculates actual PoP and ROI, then selects top 3 spreads per sector per AI model.
 Output: AI bot name | Sector | Ticker | Bull Put or Bear Call | $/$ leg cost | DTE | PoP | ROI
 """
+import argparse
+import heapq
 import json
 import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
+import numpy as np
+from scipy.special import ndtr
 from scipy.stats import norm
 import itertools
 from sectors import get_sectors
+from greeks_store import as_greeks_data, load_greeks_data
 
 def calculate_black_scholes_pop(spot, strike, dte, iv, option_type, risk_free_rate=0.05):
     """Calculate probability of profit using Black-Scholes"""
@@ -31,8 +40,165 @@ def calculate_black_scholes_pop(spot, strike, dte, iv, option_type, risk_free_ra
     except:
         return 0
 
-def construct_credit_spreads(ticker_data, max_spreads_per_expiry=10):
-    """Construct all viable credit spreads for a ticker"""
+def calculate_black_scholes_pop_batch(spot, strike, dte, iv, option_type, risk_free_rate=0.05):
+    """Vectorized calculate_black_scholes_pop over arrays (broadcastable).
+    
+    option_type is an array of "C"/"P". Rows the scalar version returns 0 for
+    (dte, iv or spot <= 0, or a strike it can't take the log of) are 0 here too.
+    """
+    spot, strike, dte, iv = (np.asarray(a, dtype=np.float64) for a in (spot, strike, dte, iv))
+    is_call = np.asarray(option_type) == "C"
+    spot, strike, dte, iv, is_call = np.broadcast_arrays(spot, strike, dte, iv, is_call)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = spot / np.where(strike == 0, 1.0, strike)
+        # Scalar path raises (-> 0) on strike == 0 and log of a non-positive ratio;
+        # NaN compares False, so NaN inputs fall through to NaN like the scalar path
+        guarded = (dte <= 0) | (iv <= 0) | (spot <= 0) | (strike == 0) | (ratio <= 0)
+        T = np.where(guarded, 1.0, dte) / 365.0
+        vol = np.where(guarded, 1.0, iv)
+        ratio = np.where(guarded, 1.0, ratio)
+        d1 = (np.log(ratio) + (risk_free_rate + 0.5 * vol**2) * T) / (vol * np.sqrt(T))
+        d2 = d1 - vol * np.sqrt(T)
+    
+    pop = np.where(is_call, ndtr(-d2), ndtr(d2)) * 100
+    return np.where(guarded, 0.0, pop)
+
+# Spread quality filters
+MIN_SPREAD_WIDTH = 2.5
+MIN_NET_CREDIT = 0.30
+MIN_ROI = 10
+MIN_POP = 50
+MAX_SPREAD_WIDTH = 10.0  # Upper bound for exhaustive enumeration
+
+def spread_pair_matrices(strikes, mids, pops):
+    """Metrics for every (short i, long j) pair of one expiration's legs.
+    
+    Legs are ordered so long legs sit at higher indices (calls by ascending
+    strike, puts by descending strike). Returns width, credit, max_loss, roi
+    and the mask of pairs that pass every filter.
+    """
+    strikes = np.asarray(strikes, dtype=np.float64)
+    mids = np.asarray(mids, dtype=np.float64)
+    pops = np.asarray(pops, dtype=np.float64)
+    
+    width = np.abs(strikes[None, :] - strikes[:, None])
+    credit = mids[:, None] - mids[None, :]
+    max_loss = width - credit
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = np.where(max_loss > 0, credit / max_loss * 100, 0.0)
+    
+    passing = (
+        np.triu(np.ones((len(strikes), len(strikes)), dtype=bool), k=1)
+        & (width >= MIN_SPREAD_WIDTH)
+        & (credit >= MIN_NET_CREDIT)
+        & (roi >= MIN_ROI)
+        & (pops[:, None] >= MIN_POP)
+    )
+    return width, credit, max_loss, roi, passing
+
+def first_passing_pairs(legs, pops, max_spreads):
+    """(short, long) index pairs: the nearest passing long leg for each short,
+    for the first max_spreads shorts that have one"""
+    if len(legs) < 2:
+        return []
+    _, _, _, _, passing = spread_pair_matrices(
+        [leg["strike"] for leg in legs], [leg["market_data"]["mid"] for leg in legs], pops
+    )
+    shorts = np.flatnonzero(passing.any(axis=1))[:max_spreads]
+    longs = passing[shorts].argmax(axis=1)
+    return list(zip(shorts.tolist(), longs.tolist()))
+
+def windowed_pairs(keys, min_width, max_width):
+    """(short, long) index arrays for all pairs with min_width <= key[long] - key[short] <= max_width.
+    
+    keys must be ascending. Each short's long legs form one contiguous window
+    found by binary search, so the cost is O(n log n + pairs) rather than O(n^2).
+    """
+    keys = np.asarray(keys, dtype=np.float64)
+    eps = 1e-9  # Windows are padded, then trimmed with the exact width test
+    lo = np.maximum(np.searchsorted(keys, keys + min_width - eps, side="left"), np.arange(len(keys)) + 1)
+    hi = np.searchsorted(keys, keys + max_width + eps, side="right")
+    counts = np.maximum(hi - lo, 0)
+    
+    shorts = np.repeat(np.arange(len(keys)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    longs = np.repeat(lo, counts) + offsets
+    
+    width = keys[longs] - keys[shorts]
+    keep = (width >= min_width) & (width <= max_width)
+    return shorts[keep], longs[keep]
+
+def all_passing_pairs(legs, pops, descending, min_width=MIN_SPREAD_WIDTH, max_width=MAX_SPREAD_WIDTH):
+    """Every (short, long) pair within the width range that passes the filters"""
+    if len(legs) < 2:
+        return []
+    strikes = np.array([leg["strike"] for leg in legs], dtype=np.float64)
+    mids = np.array([leg["market_data"]["mid"] for leg in legs], dtype=np.float64)
+    pops = np.asarray(pops, dtype=np.float64)
+    
+    # Puts are ordered by descending strike; negate so window keys ascend
+    shorts, longs = windowed_pairs(-strikes if descending else strikes, min_width, max_width)
+    credit = mids[shorts] - mids[longs]
+    max_loss = np.abs(strikes[longs] - strikes[shorts]) - credit
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = np.where(max_loss > 0, credit / max_loss * 100, 0.0)
+    
+    passing = (credit >= MIN_NET_CREDIT) & (roi >= MIN_ROI) & (pops[shorts] >= MIN_POP)
+    return list(zip(shorts[passing].tolist(), longs[passing].tolist()))
+
+def build_spread(spread_type, ticker, current_price, dte, exp_date, short_leg, long_leg, pop):
+    """Spread record for one short/long pair"""
+    spread_width = abs(long_leg["strike"] - short_leg["strike"])
+    short_premium = short_leg["market_data"]["mid"]
+    long_premium = long_leg["market_data"]["mid"]
+    net_credit = short_premium - long_premium
+    max_profit = net_credit
+    max_loss = spread_width - net_credit
+    roi = (max_profit / max_loss * 100) if max_loss > 0 else 0
+    
+    if spread_type == "Bear Call":
+        distance = (short_leg["strike"] - current_price) / current_price * 100
+    else:
+        distance = (current_price - short_leg["strike"]) / current_price * 100
+    
+    return {
+        "spread_type": spread_type,
+        "ticker": ticker,
+        "sector": short_leg["sector"],
+        "current_price": current_price,
+        "dte": dte,
+        "expiration": exp_date,
+        "short_leg": {
+            "strike": short_leg["strike"],
+            "premium": short_premium,
+            "iv": short_leg["market_data"]["iv"],
+            "delta": short_leg["market_data"]["delta"]
+        },
+        "long_leg": {
+            "strike": long_leg["strike"],
+            "premium": long_premium,
+            "iv": long_leg["market_data"]["iv"],
+            "delta": long_leg["market_data"]["delta"]
+        },
+        "spread_width": spread_width,
+        "net_credit": round(net_credit, 2),
+        "max_profit": round(max_profit, 2),
+        "max_loss": round(max_loss, 2),
+        "roi": round(roi, 1),
+        "pop": round(pop, 1),
+        "legs": f"${short_leg['strike']:.0f}/${long_leg['strike']:.0f}",
+        "distance_from_current": round(distance, 1)
+    }
+
+def construct_credit_spreads(ticker_data, max_spreads_per_expiry=10, exhaustive=False,
+                             min_width=MIN_SPREAD_WIDTH, max_width=MAX_SPREAD_WIDTH):
+    """Construct all viable credit spreads for a ticker.
+    
+    By default each short leg takes its nearest passing long leg, for up to
+    max_spreads_per_expiry shorts. exhaustive=True instead returns every
+    passing pair with min_width <= width <= max_width for ranking.
+    """
     ticker = ticker_data["ticker_info"]["ticker"]
     current_price = ticker_data["ticker_info"]["current_price"]
     contracts = ticker_data["contracts"]
@@ -53,6 +219,7 @@ def construct_credit_spreads(ticker_data, max_spreads_per_expiry=10):
     credit_spreads = []
     
     for exp_date, exp_contracts in by_expiry.items():
+        # Long legs sit further OTM: calls ascending, puts descending by strike
         calls = sorted(exp_contracts["calls"], key=lambda x: x["strike"])
         puts = sorted(exp_contracts["puts"], key=lambda x: x["strike"], reverse=True)
         
@@ -61,264 +228,282 @@ def construct_credit_spreads(ticker_data, max_spreads_per_expiry=10):
         
         dte = calls[0]["dte"] if calls else puts[0]["dte"]
         
-        # Construct Bear Call Spreads (sell lower strike call, buy higher strike call)
-        bear_calls_created = 0
-        for i, short_call in enumerate(calls):
-            if bear_calls_created >= max_spreads_per_expiry:
-                break
-                
-            # Look for long calls with higher strikes
-            for long_call in calls[i+1:]:
-                if long_call["strike"] - short_call["strike"] >= 2.5:  # Minimum $2.50 width
-                    spread_width = long_call["strike"] - short_call["strike"]
-                    
-                    # Calculate spread pricing
-                    short_premium = short_call["market_data"]["mid"]
-                    long_premium = long_call["market_data"]["mid"]
-                    net_credit = short_premium - long_premium
-                    
-                    if net_credit > 0.25:  # Minimum $0.25 credit
-                        # Calculate metrics
-                        max_profit = net_credit
-                        max_loss = spread_width - net_credit
-                        roi = (max_profit / max_loss * 100) if max_loss > 0 else 0
-                        
-                        # PoP based on short strike (needs to stay below)
-                        short_iv = short_call["market_data"]["iv"]
-                        pop = calculate_black_scholes_pop(
-                            current_price, short_call["strike"], dte, short_iv, "C"
-                        )
-                        
-                        # Quality filters
-                        if roi >= 10 and pop >= 50 and net_credit >= 0.30:
-                            credit_spreads.append({
-                                "spread_type": "Bear Call",
-                                "ticker": ticker,
-                                "sector": short_call["sector"],
-                                "current_price": current_price,
-                                "dte": dte,
-                                "expiration": exp_date,
-                                "short_leg": {
-                                    "strike": short_call["strike"],
-                                    "premium": short_premium,
-                                    "iv": short_iv,
-                                    "delta": short_call["market_data"]["delta"]
-                                },
-                                "long_leg": {
-                                    "strike": long_call["strike"],
-                                    "premium": long_premium,
-                                    "iv": long_call["market_data"]["iv"],
-                                    "delta": long_call["market_data"]["delta"]
-                                },
-                                "spread_width": spread_width,
-                                "net_credit": round(net_credit, 2),
-                                "max_profit": round(max_profit, 2),
-                                "max_loss": round(max_loss, 2),
-                                "roi": round(roi, 1),
-                                "pop": round(pop, 1),
-                                "legs": f"${short_call['strike']:.0f}/${long_call['strike']:.0f}",
-                                "distance_from_current": round((short_call["strike"] - current_price) / current_price * 100, 1)
-                            })
-                            bear_calls_created += 1
-                            break
+        # PoP depends only on the short leg: one vectorized pass per expiration
+        call_pops = calculate_black_scholes_pop_batch(
+            current_price, [c["strike"] for c in calls], dte, [c["market_data"]["iv"] for c in calls], "C"
+        )
+        put_pops = calculate_black_scholes_pop_batch(
+            current_price, [p["strike"] for p in puts], dte, [p["market_data"]["iv"] for p in puts], "P"
+        )
         
-        # Construct Bull Put Spreads (sell higher strike put, buy lower strike put)
-        bull_puts_created = 0
-        for i, short_put in enumerate(puts):
-            if bull_puts_created >= max_spreads_per_expiry:
-                break
-                
-            # Look for long puts with lower strikes
-            for long_put in puts[i+1:]:
-                if short_put["strike"] - long_put["strike"] >= 2.5:  # Minimum $2.50 width
-                    spread_width = short_put["strike"] - long_put["strike"]
-                    
-                    # Calculate spread pricing
-                    short_premium = short_put["market_data"]["mid"]
-                    long_premium = long_put["market_data"]["mid"]
-                    net_credit = short_premium - long_premium
-                    
-                    if net_credit > 0.25:  # Minimum $0.25 credit
-                        # Calculate metrics
-                        max_profit = net_credit
-                        max_loss = spread_width - net_credit
-                        roi = (max_profit / max_loss * 100) if max_loss > 0 else 0
-                        
-                        # PoP based on short strike (needs to stay above)
-                        short_iv = short_put["market_data"]["iv"]
-                        pop = calculate_black_scholes_pop(
-                            current_price, short_put["strike"], dte, short_iv, "P"
-                        )
-                        
-                        # Quality filters
-                        if roi >= 10 and pop >= 50 and net_credit >= 0.30:
-                            credit_spreads.append({
-                                "spread_type": "Bull Put",
-                                "ticker": ticker,
-                                "sector": short_put["sector"],
-                                "current_price": current_price,
-                                "dte": dte,
-                                "expiration": exp_date,
-                                "short_leg": {
-                                    "strike": short_put["strike"],
-                                    "premium": short_premium,
-                                    "iv": short_iv,
-                                    "delta": short_put["market_data"]["delta"]
-                                },
-                                "long_leg": {
-                                    "strike": long_put["strike"],
-                                    "premium": long_premium,
-                                    "iv": long_put["market_data"]["iv"],
-                                    "delta": long_put["market_data"]["delta"]
-                                },
-                                "spread_width": spread_width,
-                                "net_credit": round(net_credit, 2),
-                                "max_profit": round(max_profit, 2),
-                                "max_loss": round(max_loss, 2),
-                                "roi": round(roi, 1),
-                                "pop": round(pop, 1),
-                                "legs": f"${short_put['strike']:.0f}/${long_put['strike']:.0f}",
-                                "distance_from_current": round((current_price - short_put["strike"]) / current_price * 100, 1)
-                            })
-                            bull_puts_created += 1
-                            break
-    
-    return credit_spreads
-
-def analyze_credit_spreads_for_mode(mode, verbose=True):
-    """Analyze and rank credit spreads for a mode"""
-    if verbose:
-        print(f"🎯 Analyzing Credit Spreads - {mode.upper()}")
-        print("=" * 70)
-    
-    # Load Greeks data
-    try:
-        with open(f"greeks_data_{mode}.json", "r") as f:
-            greeks_data = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ greeks_data_{mode}.json not found. Run greeks.py first.")
-        return None
-    
-    tickers_data = greeks_data["by_ticker"]
-    
-    if verbose:
-        print(f"📊 Analyzing {len(tickers_data)} tickers for credit spreads...")
-    
-    # Construct spreads for each ticker
-    all_spreads = []
-    spreads_by_ticker = {}
-    
-    for ticker, ticker_data in tickers_data.items():
-        if verbose:
-            print(f"  🔍 {ticker}: Constructing spreads...")
+        if exhaustive:
+            call_pairs = all_passing_pairs(calls, call_pops, False, min_width, max_width)
+            put_pairs = all_passing_pairs(puts, put_pops, True, min_width, max_width)
+        else:
+            # All short/long pairs are screened at once; each short keeps its nearest passing long
+            call_pairs = first_passing_pairs(calls, call_pops, max_spreads_per_expiry)
+            put_pairs = first_passing_pairs(puts, put_pops, max_spreads_per_expiry)
         
-        ticker_spreads = construct_credit_spreads(ticker_data)
-        spreads_by_ticker[ticker] = ticker_spreads
-        all_spreads.extend(ticker_spreads)
+        for i, j in call_pairs:
+            credit_spreads.append(build_spread(
+                "Bear Call", ticker, current_price, dte, exp_date, calls[i], calls[j], call_pops[i].item()
+            ))
         
-        if verbose:
-            bear_calls = len([s for s in ticker_spreads if s["spread_type"] == "Bear Call"])
-            bull_puts = len([s for s in ticker_spreads if s["spread_type"] == "Bull Put"])
-            print(f"    ✅ Found {len(ticker_spreads)} spreads ({bear_calls} Bear Call, {bull_puts} Bull Put)")
-    
-    if verbose:
-        print(f"\n📊 Total spreads constructed: {len(all_spreads)}")
+        for i, j in put_pairs:
+            credit_spreads.append(build_spread(
+                "Bull Put", ticker, current_price, dte, exp_date, puts[i], puts[j], put_pops[i].item()
+            ))
     
-    # Group spreads by sector
-    sectors = get_sectors(mode)
-    spreads_by_sector = defaultdict(list)
+    return credit_spreads
+
+_process_pool = None
+_process_pool_workers = None
+_process_pool_lock = threading.Lock()
+
+def get_process_pool(max_workers=None):
+    """Process pool shared by every mode analyzed in this process.
+    
+    A call asking for a different size replaces the pool; the old one
+    finishes the tasks it already has and then exits.
+    """
+    global _process_pool, _process_pool_workers
+    workers = max_workers or os.cpu_count()
+    with _process_pool_lock:
+        if _process_pool is not None and _process_pool_workers != workers:
+            _process_pool.shutdown(wait=False)
+            _process_pool = None
+        if _process_pool is None:
+            # spawn: the pipeline forks from a threaded event loop otherwise
+            _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _process_pool_workers = workers
+        return _process_pool
+
+def _construct_ticker_spreads(ticker, ticker_data, spread_options):
+    return ticker, construct_credit_spreads(ticker_data, **spread_options)
+
+def construct_spreads_parallel(ticker_items, spread_options, max_workers=None):
+    """Yield (ticker, spreads) in input order, built on the process pool.
+    
+    At most two tasks per worker are in flight, so only that many tickers'
+    contracts are held (and pickled) at a time.
+    """
+    pool = get_process_pool(max_workers)
+    window = 2 * (max_workers or os.cpu_count())
+    pending = deque()
+    
+    for ticker, ticker_data in ticker_items:
+        pending.append(pool.submit(_construct_ticker_spreads, ticker, ticker_data, spread_options))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def spread_score(spread):
+    """Ranking key: composite score (ROI * PoP / 100), then ROI, then PoP"""
+    return (spread["roi"] * spread["pop"] / 100, spread["roi"], spread["pop"])
+
+class RunningStats:
+    """Count and mean ROI/PoP accumulated one spread at a time"""
+
+    def __init__(self):
+        self.count = 0
+        self.roi_sum = 0.0
+        self.pop_sum = 0.0
+
+    def add(self, roi, pop):
+        self.count += 1
+        self.roi_sum += roi
+        self.pop_sum += pop
+
+    @property
+    def mean_roi(self):
+        return self.roi_sum / self.count if self.count else 0
+
+    @property
+    def mean_pop(self):
+        return self.pop_sum / self.count if self.count else 0
+
+    @property
+    def avg_roi(self):
+        return round(self.mean_roi, 1) if self.count else 0
+
+    @property
+    def avg_pop(self):
+        return round(self.mean_pop, 1) if self.count else 0
+
+class SpreadRanker:
+    """Bounded top-K min-heaps per sector and overall, plus running aggregates.
     
-    for spread in all_spreads:
-        sector = spread["sector"]
-        spreads_by_sector[sector].append(spread)
+    Ties keep arrival order (earlier first), matching a stable descending sort.
+    """
+
+    def __init__(self, sectors=(), k=3, overall_k=50):
+        self.k = k
+        self.overall_k = overall_k
+        self.heaps = defaultdict(list)
+        self.overall_heap = []
+        self.sector_stats = defaultdict(RunningStats)
+        for sector in sectors:
+            self.sector_stats[sector]
+        self.overall = RunningStats()
+        self._seq = 0
+
+    def _push(self, heap, size, entry):
+        if len(heap) < size:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    def add(self, spread):
+        # -seq makes earlier spreads win ties; the spread itself is never compared
+        entry = (spread_score(spread), -self._seq, spread)
+        self._seq += 1
+        self._push(self.heaps[spread["sector"]], self.k, entry)
+        self._push(self.overall_heap, self.overall_k, entry)
+        self.sector_stats[spread["sector"]].add(spread["roi"], spread["pop"])
+        self.overall.add(spread["roi"], spread["pop"])
+
+    def add_all(self, spreads):
+        for spread in spreads:
+            self.add(spread)
+
+    def top(self, sector):
+        return [entry[2] for entry in sorted(self.heaps.get(sector, []), key=lambda e: e[:2], reverse=True)]
+
+    def top_overall(self):
+        return [entry[2] for entry in sorted(self.overall_heap, key=lambda e: e[:2], reverse=True)]
+
+def build_rankings(mode, sectors, ranker, verbose=True):
+    """credit_spreads result from a ranker's top-K lists and aggregates.
     
-    # Rank spreads within each sector and select top 3
+    ranker: anything with top(sector), top_overall(), sector_stats and overall
+    (SpreadRanker, or spread_engine.IncrementalSpreadEngine).
+    """
+    # Top 3 per sector, ranked by composite score (ROI * PoP / 100 for risk-adjusted return)
     sector_rankings = {}
     final_selections = []
     
     for sector in sectors.keys():
-        sector_spreads = spreads_by_sector[sector]
+        stats = ranker.sector_stats[sector]
         
-        if not sector_spreads:
+        if not stats.count:
             if verbose:
                 print(f"  ⚠️ {sector}: No spreads found")
             continue
         
-        # Sort by composite score (ROI * PoP / 100 for risk-adjusted return)
-        sector_spreads.sort(key=lambda x: (x["roi"] * x["pop"] / 100, x["roi"], x["pop"]), reverse=True)
-        
-        # Select top 3
-        top_3 = sector_spreads[:3]
+        top_3 = ranker.top(sector)
         sector_rankings[sector] = {
-            "total_spreads": len(sector_spreads),
+            "total_spreads": stats.count,
             "top_3": top_3,
-            "avg_roi": round(sum(s["roi"] for s in sector_spreads) / len(sector_spreads), 1),
-            "avg_pop": round(sum(s["pop"] for s in sector_spreads) / len(sector_spreads), 1)
+            "avg_roi": stats.avg_roi,
+            "avg_pop": stats.avg_pop
         }
         
         final_selections.extend(top_3)
         
         if verbose:
-            print(f"  🏆 {sector}: {len(sector_spreads)} spreads → Top 3 selected")
+            print(f"  🏆 {sector}: {stats.count} spreads → Top 3 selected")
             for i, spread in enumerate(top_3, 1):
                 print(f"    {i}. {spread['ticker']} {spread['spread_type']} {spread['legs']} | ROI: {spread['roi']:.1f}% | PoP: {spread['pop']:.1f}%")
     
-    # Create final output
-    result = {
+    return {
         "mode": mode,
         "analysis_timestamp": datetime.now().isoformat(),
         "summary": {
-            "total_spreads_analyzed": len(all_spreads),
+            "total_spreads_analyzed": ranker.overall.count,
             "sectors_with_spreads": len(sector_rankings),
             "final_selections": len(final_selections),
             "target_selections": len(sectors) * 3,  # 3 per sector
-            "avg_roi_all": round(sum(s["roi"] for s in all_spreads) / len(all_spreads), 1) if all_spreads else 0,
-            "avg_pop_all": round(sum(s["pop"] for s in all_spreads) / len(all_spreads), 1) if all_spreads else 0
+            "avg_roi_all": ranker.overall.avg_roi,
+            "avg_pop_all": ranker.overall.avg_pop
         },
         "by_sector": sector_rankings,
         "final_selections": final_selections,
-        "all_spreads": all_spreads
+        "top_spreads": ranker.top_overall()
     }
+
+def analyze_credit_spreads_for_mode(mode, verbose=True, greeks_data=None, save=True, exhaustive=False,
+                                    max_width=MAX_SPREAD_WIDTH, keep_all_spreads=False, parallel=False,
+                                    max_workers=None):
+    """Analyze and rank credit spreads for a mode.
+    
+    Spreads stream through a SpreadRanker, so memory is bounded by the top-K
+    heaps; keep_all_spreads=True also stores every candidate under all_spreads.
+    parallel=True builds each ticker's spreads on the shared process pool.
+    """
+    if verbose:
+        print(f"🎯 Analyzing Credit Spreads - {mode.upper()}")
+        print("=" * 70)
+    
+    # Load Greeks data (unless passed in memory)
+    if greeks_data is None:
+        try:
+            greeks_data = load_greeks_data(mode)
+        except FileNotFoundError:
+            print(f"❌ greeks_data_{mode}.json not found. Run greeks.py first.")
+            return None
+    
+    # by_ticker is rebuilt lazily, one ticker at a time
+    tickers_data = as_greeks_data(greeks_data).by_ticker
+    
+    if verbose:
+        print(f"📊 Analyzing {len(tickers_data)} tickers for credit spreads...")
+    
+    # Rank spreads as each ticker's batch is produced; only the top K are kept
+    sectors = get_sectors(mode)
+    ranker = SpreadRanker(sectors.keys(), k=3)
+    all_spreads = [] if keep_all_spreads else None
+    
+    spread_options = {"exhaustive": exhaustive, "max_width": max_width}
+    if parallel:
+        ticker_results = construct_spreads_parallel(tickers_data.items(), spread_options, max_workers)
+        if verbose:
+            print(f"⚡ Parallel construction on {max_workers or os.cpu_count()} processes")
+    else:
+        ticker_results = (
+            (ticker, construct_credit_spreads(ticker_data, **spread_options))
+            for ticker, ticker_data in tickers_data.items()
+        )
+    
+    # Results arrive in ticker order either way, so rankings don't depend on worker count
+    for ticker, ticker_spreads in ticker_results:
+        if verbose:
+            print(f"  🔍 {ticker}: Constructing spreads...")
+        
+        ranker.add_all(ticker_spreads)
+        if keep_all_spreads:
+            all_spreads.extend(ticker_spreads)
+        
+        if verbose:
+            bear_calls = len([s for s in ticker_spreads if s["spread_type"] == "Bear Call"])
+            bull_puts = len([s for s in ticker_spreads if s["spread_type"] == "Bull Put"])
+            print(f"    ✅ Found {len(ticker_spreads)} spreads ({bear_calls} Bear Call, {bull_puts} Bull Put)")
+    
+    if verbose:
+        print(f"\n📊 Total spreads constructed: {ranker.overall.count}")
+    
+    result = build_rankings(mode, sectors, ranker, verbose)
+    if keep_all_spreads:
+        result["all_spreads"] = all_spreads
     
     # Save results
     filename = f"credit_spreads_{mode}.json"
-    with open(filename, "w") as f:
-        json.dump(result, f, indent=2)
+    if save:
+        with open(filename, "w") as f:
+            json.dump(result, f, indent=2)
     
     if verbose:
         print(f"\n📊 {mode.upper()} Credit Spread Analysis Complete:")
-        print(f"  🎯 Final selections: {len(final_selections)}/{len(sectors) * 3}")
+        print(f"  🎯 Final selections: {len(result['final_selections'])}/{len(sectors) * 3}")
         print(f"  📈 Avg ROI: {result['summary']['avg_roi_all']:.1f}%")
         print(f"  🎲 Avg PoP: {result['summary']['avg_pop_all']:.1f}%")
-        print(f"  📁 Saved: {filename}")
+        if save:
+            print(f"  📁 Saved: {filename}")
     
     return result
 
-def create_final_comparison_table():
-    """Create the final comparison table between GPT and Grok"""
-    print("🏆 Creating Final Comparison Table")
-    print("=" * 70)
-    
-    # Load results from both modes
-    gpt_data = None
-    grok_data = None
-    
-    try:
-        with open("credit_spreads_gpt.json", "r") as f:
-            gpt_data = json.load(f)
-    except FileNotFoundError:
-        print("❌ credit_spreads_gpt.json not found")
-    
-    try:
-        with open("credit_spreads_grok.json", "r") as f:
-            grok_data = json.load(f)
-    except FileNotFoundError:
-        print("❌ credit_spreads_grok.json not found")
-    
-    if not gpt_data or not grok_data:
-        print("❌ Missing data files - run analysis for both modes first")
-        return None
-    
+def build_final_comparison(gpt_data, grok_data):
+    """final_credit_spread_comparison payload from both modes' results"""
     # Combine all final selections
     final_table = []
     
@@ -355,20 +540,53 @@ def create_final_comparison_table():
     # Sort by AI bot name, then by sector
     final_table.sort(key=lambda x: (x["AI_bot_name"], x["Sector"]))
     
+    # One pass over the table for per-bot counts and means
+    bot_stats = defaultdict(RunningStats)
+    for s in final_table:
+        bot_stats[s["AI_bot_name"]].add(float(s["ROI"].rstrip('%')), float(s["PoP"].rstrip('%')))
+    
     # Save final table
     final_output = {
         "creation_timestamp": datetime.now().isoformat(),
         "total_spreads": len(final_table),
-        "gpt_spreads": len([s for s in final_table if s["AI_bot_name"] == "GPT"]),
-        "grok_spreads": len([s for s in final_table if s["AI_bot_name"] == "Grok"]),
+        "gpt_spreads": bot_stats["GPT"].count,
+        "grok_spreads": bot_stats["Grok"].count,
         "final_comparison_table": final_table,
         "summary_stats": {
-            "gpt_avg_roi": sum(float(s["ROI"].rstrip('%')) for s in final_table if s["AI_bot_name"] == "GPT") / len([s for s in final_table if s["AI_bot_name"] == "GPT"]) if [s for s in final_table if s["AI_bot_name"] == "GPT"] else 0,
-            "grok_avg_roi": sum(float(s["ROI"].rstrip('%')) for s in final_table if s["AI_bot_name"] == "Grok") / len([s for s in final_table if s["AI_bot_name"] == "Grok"]) if [s for s in final_table if s["AI_bot_name"] == "Grok"] else 0,
-            "gpt_avg_pop": sum(float(s["PoP"].rstrip('%')) for s in final_table if s["AI_bot_name"] == "GPT") / len([s for s in final_table if s["AI_bot_name"] == "GPT"]) if [s for s in final_table if s["AI_bot_name"] == "GPT"] else 0,
-            "grok_avg_pop": sum(float(s["PoP"].rstrip('%')) for s in final_table if s["AI_bot_name"] == "Grok") / len([s for s in final_table if s["AI_bot_name"] == "Grok"]) if [s for s in final_table if s["AI_bot_name"] == "Grok"] else 0
+            "gpt_avg_roi": bot_stats["GPT"].mean_roi,
+            "grok_avg_roi": bot_stats["Grok"].mean_roi,
+            "gpt_avg_pop": bot_stats["GPT"].mean_pop,
+            "grok_avg_pop": bot_stats["Grok"].mean_pop
         }
     }
+    return final_output
+
+def create_final_comparison_table(gpt_data=None, grok_data=None):
+    """Create the final comparison table between GPT and Grok"""
+    print("🏆 Creating Final Comparison Table")
+    print("=" * 70)
+    
+    # Load results from both modes (unless passed in memory)
+    if gpt_data is None:
+        try:
+            with open("credit_spreads_gpt.json", "r") as f:
+                gpt_data = json.load(f)
+        except FileNotFoundError:
+            print("❌ credit_spreads_gpt.json not found")
+    
+    if grok_data is None:
+        try:
+            with open("credit_spreads_grok.json", "r") as f:
+                grok_data = json.load(f)
+        except FileNotFoundError:
+            print("❌ credit_spreads_grok.json not found")
+    
+    if not gpt_data or not grok_data:
+        print("❌ Missing data files - run analysis for both modes first")
+        return None
+    
+    final_output = build_final_comparison(gpt_data, grok_data)
+    final_table = final_output["final_comparison_table"]
     
     with open("final_credit_spread_comparison.json", "w") as f:
         json.dump(final_output, f, indent=2)
@@ -391,12 +609,31 @@ def create_final_comparison_table():
 
 def main():
     """Main function - analyze both modes and create comparison"""
+    parser = argparse.ArgumentParser(description="Credit spread analysis")
+    parser.add_argument("--exhaustive", action="store_true",
+                        help="Rank every spread pair within the width range, not just the nearest long leg")
+    parser.add_argument("--max-width", type=float, default=MAX_SPREAD_WIDTH,
+                        help="Widest spread (in $) considered by --exhaustive")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Build spreads on a process pool and analyze both modes at once")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Process pool size for --parallel (default: CPU count)")
+    args = parser.parse_args()
+    
     print("🚀 Final Credit Spread Analysis")
     print("=" * 50)
     
-    # Analyze both modes
-    for mode in ["gpt", "grok"]:
-        result = analyze_credit_spreads_for_mode(mode)
+    modes = ["gpt", "grok"]
+    options = {"exhaustive": args.exhaustive, "max_width": args.max_width}
+    if args.parallel:
+        # Both modes share one process pool; per-ticker output is suppressed
+        options.update(parallel=True, max_workers=args.workers, verbose=False)
+        with ThreadPoolExecutor(max_workers=len(modes)) as executor:
+            results = list(executor.map(lambda mode: analyze_credit_spreads_for_mode(mode, **options), modes))
+    else:
+        results = [analyze_credit_spreads_for_mode(mode, **options) for mode in modes]
+    
+    for mode, result in zip(modes, results):
         if result:
             selections = len(result["final_selections"])
             avg_roi = result["summary"]["avg_roi_all"]
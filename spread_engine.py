@@ -0,0 +1,206 @@
+# spread_engine.py - Incremental Credit Spread Engine
+"""
+Keeps a mode's credit spreads and sector rankings current as Quote/Greeks
+events arrive, without rebuilding the whole universe.
+A dependency index maps every streamer symbol (and every underlying) to the
+spread groups whose candidates use it as a leg. A group is one ticker's
+expiration: construct_credit_spreads picks each short's long leg from the
+whole expiration, so that is the smallest unit whose spreads can change.
+refresh() rebuilds only the groups touched since the last refresh and the
+sector rankings that contain them.
+"""
+from collections import defaultdict
+from greeks import credit_spread_metrics, greek_fields, quote_fields, split_market_data
+from greeks_store import as_greeks_data
+from spread_analyzer import (MAX_SPREAD_WIDTH, RunningStats, build_rankings, construct_credit_spreads,
+                             spread_score)
+
+class IncrementalSpreadEngine:
+    """Spread candidates per (ticker, expiration) with a symbol -> group index.
+
+    Exposes top(sector), top_overall(), sector_stats and overall, so
+    spread_analyzer.build_rankings can render its state like a full run.
+    """
+
+    def __init__(self, greeks_data, exhaustive=False, max_width=MAX_SPREAD_WIDTH, k=3, overall_k=50):
+        data = as_greeks_data(greeks_data)
+        self.options = {"exhaustive": exhaustive, "max_width": max_width}
+        self.k = k
+        self.overall_k = overall_k
+
+        self.ticker_info = {}
+        self.contracts = {}
+        self.groups = {}
+        self.group_sector = {}
+        self.group_order = {}
+        self.symbol_groups = {}
+        self.ticker_groups = defaultdict(list)
+        self.sector_groups = defaultdict(list)
+
+        ticker_order = {ticker: i for i, ticker in enumerate(data.by_ticker)}
+        for ticker in ticker_order:
+            self.ticker_info[ticker] = data.ticker_info(data.ticker_id(ticker))
+
+        for symbol, record in data.market_data.items():
+            ticker = record["ticker"]
+            key = (ticker, record["expiration_date"])
+            if key not in self.groups:
+                self.groups[key] = []
+                self.group_sector[key] = record["sector"]
+                self.group_order[key] = (ticker_order[ticker], len(self.ticker_groups[ticker]))
+                self.ticker_groups[ticker].append(key)
+                self.sector_groups[record["sector"]].append(key)
+            self.groups[key].append(symbol)
+            self.contracts[symbol] = record
+            self.symbol_groups[symbol] = key
+
+        # Groups are kept in full-run order so ties rank the same way
+        for keys in self.sector_groups.values():
+            keys.sort(key=self.group_order.get)
+
+        self.group_top = {}
+        self.group_stats = {}
+        self.dirty = set(self.groups)
+        self._sector_cache = {}
+        self._overall_cache = None
+        self.refresh()
+
+    # -- Market data -----------------------------------------------------
+
+    def _update_contract(self, symbol, fields):
+        record = self.contracts[symbol]
+        market_data = record["market_data"]
+        if all(market_data.get(name) == value for name, value in fields.items()):
+            return False
+        market_data.update(fields)
+        quote_data, greek_data, _ = split_market_data(market_data)
+        record["credit_spread_metrics"] = credit_spread_metrics(quote_data, greek_data)
+        self.dirty.add(self.symbol_groups[symbol])
+        return True
+
+    def update_underlying(self, ticker, price):
+        """New spot price for an underlying: every expiration of it is affected"""
+        info = self.ticker_info.get(ticker)
+        if info is None or not price or info["current_price"] == price:
+            return False
+        info["current_price"] = price
+        self.dirty.update(self.ticker_groups[ticker])
+        return True
+
+    def apply_quote(self, quote):
+        """Quote event for an option leg or an underlying; True if anything changed"""
+        symbol = quote.event_symbol
+        fields = quote_fields(quote)
+        if fields is None:
+            return False
+        if symbol in self.contracts:
+            return self._update_contract(symbol, fields)
+        return self.update_underlying(symbol, fields["mid"])
+
+    def apply_greeks(self, greek):
+        """Greeks event for an option leg; True if anything changed"""
+        if greek.event_symbol not in self.contracts:
+            return False
+        return self._update_contract(greek.event_symbol, greek_fields(greek))
+
+    @property
+    def symbols(self):
+        """Every symbol the engine depends on (option legs and underlyings)"""
+        return list(self.contracts) + list(self.ticker_info)
+
+    # -- Recompute -------------------------------------------------------
+
+    def _rebuild_group(self, key):
+        ticker, _ = key
+        ticker_data = {
+            "ticker_info": self.ticker_info[ticker],
+            "contracts": [self.contracts[symbol] for symbol in self.groups[key]],
+        }
+        spreads = construct_credit_spreads(ticker_data, **self.options)
+
+        stats = RunningStats()
+        for spread in spreads:
+            stats.add(spread["roi"], spread["pop"])
+        self.group_stats[key] = stats
+
+        # Only a group's best max(k, overall_k) spreads can reach any ranking
+        order = self.group_order[key]
+        entries = [(spread_score(spread), order + (i,), spread) for i, spread in enumerate(spreads)]
+        entries.sort(key=lambda e: e[0], reverse=True)
+        self.group_top[key] = entries[:max(self.k, self.overall_k)]
+
+    def refresh(self):
+        """Rebuild groups changed since the last refresh; returns the affected sectors"""
+        changed_sectors = set()
+        for key in self.dirty:
+            self._rebuild_group(key)
+            changed_sectors.add(self.group_sector[key])
+        self.dirty.clear()
+
+        for sector in changed_sectors:
+            self._sector_cache.pop(sector, None)
+        if changed_sectors:
+            self._overall_cache = None
+        return changed_sectors
+
+    # -- Ranking interface (see spread_analyzer.build_rankings) ---------
+
+    @staticmethod
+    def _merge(entry_lists, limit):
+        # Earliest arrival first, then a stable sort by score, as in a full run
+        entries = sorted((e for entries in entry_lists for e in entries), key=lambda e: e[1])
+        entries.sort(key=lambda e: e[0], reverse=True)
+        return [entry[2] for entry in entries[:limit]]
+
+    def _sector_entry(self, sector):
+        if sector not in self._sector_cache:
+            keys = self.sector_groups.get(sector, [])
+            stats = RunningStats()
+            for key in keys:
+                group = self.group_stats[key]
+                stats.count += group.count
+                stats.roi_sum += group.roi_sum
+                stats.pop_sum += group.pop_sum
+            top = self._merge((self.group_top[key] for key in keys), self.k)
+            self._sector_cache[sector] = (top, stats)
+        return self._sector_cache[sector]
+
+    def top(self, sector):
+        return self._sector_entry(sector)[0]
+
+    @property
+    def sector_stats(self):
+        return _SectorStats(self)
+
+    @property
+    def overall(self):
+        return self._overall()[1]
+
+    def top_overall(self):
+        return self._overall()[0]
+
+    def _overall(self):
+        if self._overall_cache is None:
+            keys = sorted(self.groups, key=self.group_order.get)
+            stats = RunningStats()
+            for key in keys:
+                group = self.group_stats[key]
+                stats.count += group.count
+                stats.roi_sum += group.roi_sum
+                stats.pop_sum += group.pop_sum
+            self._overall_cache = (self._merge((self.group_top[key] for key in keys), self.overall_k), stats)
+        return self._overall_cache
+
+    def snapshot(self, mode, sectors, verbose=False):
+        """Current rankings in the credit_spreads_{mode}.json layout"""
+        self.refresh()
+        return build_rankings(mode, sectors, self, verbose)
+
+class _SectorStats:
+    """sector -> RunningStats view over the engine's per-group aggregates"""
+
+    def __init__(self, engine):
+        self._engine = engine
+
+    def __getitem__(self, sector):
+        return self._engine._sector_entry(sector)[1]
@@ -0,0 +1,354 @@
+# stream_replay.py - DXLink Stream Recording & Replay
+"""
+RecordingStreamer wraps a live DXLinkStreamer and appends every
+subscribe/unsubscribe and every Quote/Greeks/Summary event (with its
+receive time) to a compact JSON-lines file (.gz for gzip).
+ReplayStreamer implements the same interface (subscribe, unsubscribe,
+get_event, async with) from a recording at 1x, Nx or maximum speed, so
+spot.py, ticker_ranker.py and greeks.py can be re-run offline against the
+exact same market session.
+
+Replay re-syncs with the run under test at every recorded subscribe and
+unsubscribe: the feed waits until the run has subscribed to a batch's
+symbols before replaying past the recorded subscribe, and the run's
+unsubscribe only returns once the feed reaches the recorded one (which is
+written when the live unsubscribe returned). In between, events are
+replayed in recorded bursts, the events a consumer took without any other
+task running; each burst is queued at once and drained before the next, so
+the run's own checks interleave with the feed much as they did live.
+Tickers ranked on the shared streamer and any collection that ends on its
+subscriptions reproduce exactly; a collector stopping itself on coverage
+can still stop one burst earlier than the original did. Events for symbols
+the run is not subscribed to are dropped, as the live feed would. Paced
+replays (1x, Nx) also wait out the recorded gaps between bursts.
+
+Option chains used while recording are snapshotted into <file>.chains/
+(chain_cache.py), so a recording replays without the chain cache.
+
+Select with DXLINK_RECORD=<file> or DXLINK_REPLAY=<file> (plus
+DXLINK_REPLAY_SPEED=1|N|max); streaming.create_streamer() honours them.
+"""
+import asyncio
+import gzip
+import json
+import os
+import time
+from collections import Counter, deque, namedtuple
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+RECORDING_VERSION = 2  # 2: events end with a starts-burst flag (version 1 replays one event per burst)
+MIN_SLEEP_SECONDS = 0.002  # gaps shorter than this are delivered as one burst, as they arrived
+RECORD_ENV = "DXLINK_RECORD"
+REPLAY_ENV = "DXLINK_REPLAY"
+SPEED_ENV = "DXLINK_REPLAY_SPEED"
+
+# Event attributes the pipeline reads; event_symbol is always stored first
+EVENT_FIELDS = {
+    "Quote": ("bid_price", "ask_price", "bid_size", "ask_size"),
+    "Greeks": ("volatility", "delta", "gamma", "theta", "rho", "vega", "price"),
+    "Summary": ("open_interest", "prev_day_volume", "day_high_price", "day_low_price"),
+}
+REPLAY_EVENTS = {name: namedtuple(name, ("event_symbol",) + fields) for name, fields in EVENT_FIELDS.items()}
+
+def _open(path, mode):
+    path = str(path)
+    return gzip.open(path, mode + "t") if path.endswith(".gz") else open(path, mode)
+
+def _number(value):
+    return None if value is None else float(value)
+
+def replay_path():
+    return os.environ.get(REPLAY_ENV) or None
+
+def record_path():
+    return os.environ.get(RECORD_ENV) or None
+
+def recording_chains_dir(path) -> Path:
+    """Option chain snapshots taken during a recording (see chain_cache.record_chain)"""
+    return Path(f"{path}.chains")
+
+def replay_speed(value=None):
+    """Parse a replay speed: a multiplier, or 'max' for no pacing (returns None)"""
+    value = value if value is not None else os.environ.get(SPEED_ENV, "1")
+    if str(value).lower() in ("max", "0", "inf"):
+        return None
+    return float(value)
+
+class RecordingStreamer:
+    """Pass-through DXLinkStreamer wrapper that appends the session to `path`"""
+
+    def __init__(self, streamer, path):
+        self._streamer = streamer
+        self.path = path
+        self.events_recorded = 0
+        self._file = None
+        self._start = None
+        self._burst = None
+
+    async def __aenter__(self):
+        await self._streamer.__aenter__()
+        self._file = _open(self.path, "a")
+        self._start = time.monotonic_ns()
+        self._write({
+            "format": "dxlink-recording",
+            "version": RECORDING_VERSION,
+            "started": datetime.now(timezone.utc).isoformat(),
+            "trading_date": datetime.now(timezone.utc).date().isoformat(),
+            "fields": EVENT_FIELDS,
+        })
+        return self
+
+    async def __aexit__(self, *exc):
+        try:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        finally:
+            return await self._streamer.__aexit__(*exc)
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def _elapsed_us(self):
+        return (time.monotonic_ns() - self._start) // 1000
+
+    async def subscribe(self, event_type, symbols):
+        symbols = list(symbols)
+        self._write(["sub", self._elapsed_us(), event_type.__name__, symbols])
+        return await self._streamer.subscribe(event_type, symbols)
+
+    async def unsubscribe(self, event_type, symbols):
+        # Written once it returns: replays release the run's unsubscribe at this point
+        symbols = list(symbols)
+        result = await self._streamer.unsubscribe(event_type, symbols)
+        self._write(["unsub", self._elapsed_us(), event_type.__name__, symbols])
+        return result
+
+    def _starts_burst(self):
+        # A burst ends once the loop has run the callbacks queued behind its first event;
+        # until then no other task (collector checks, unsubscribes) can have run
+        if self._burst is None or self._burst[0]:
+            self._burst = [False]
+            asyncio.get_running_loop().call_soon(self._burst.__setitem__, 0, True)
+            return 1
+        return 0
+
+    async def get_event(self, event_type):
+        event = await self._streamer.get_event(event_type)
+        fields = EVENT_FIELDS.get(event_type.__name__)
+        if event and fields is not None:
+            self._write([event_type.__name__, self._elapsed_us(), event.event_symbol]
+                        + [_number(getattr(event, name, None)) for name in fields] + [self._starts_burst()])
+            self.events_recorded += 1
+        return event
+
+def read_recording(path):
+    """Yield ops in file order: ('session', 0, header), ('sub'|'unsub', t_us, type, symbols)
+    or (type, t_us, event, starts_burst)"""
+    with _open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict):
+                yield ("session", 0, record)
+            elif record[0] in ("sub", "unsub"):
+                yield tuple(record)
+            elif record[0] in REPLAY_EVENTS:
+                end = 3 + len(EVENT_FIELDS[record[0]])
+                starts_burst = bool(record[end]) if len(record) > end else True
+                yield (record[0], record[1], REPLAY_EVENTS[record[0]](*record[2:end]), starts_burst)
+
+def recording_trading_date(path):
+    """Trading date the recording was made on (for pinning the chain cache)"""
+    for op in read_recording(path):
+        if op[0] == "session":
+            return date.fromisoformat(op[2]["trading_date"])
+    return None
+
+class ReplayStreamer:
+    """DXLinkStreamer stand-in that replays a recording.
+
+    speed: 1.0 = recorded pace, N = N times faster, None = as fast as possible.
+    sync_timeout: longest wait at a recorded op for the run to catch up.
+    """
+
+    def __init__(self, path, speed=1.0, sync_timeout=30.0):
+        self.path = path
+        self.speed = speed
+        self.sync_timeout = sync_timeout
+        self.events_replayed = 0
+        self.events_dropped = 0
+        self.finished = asyncio.Event()
+        self._queues = {}
+        self._subscribed = {}
+        self._run_subs, self._recorded_subs = Counter(), Counter()  # (type, symbol) -> subscribes
+        self._unsubscribes = []      # [(type, symbols), matched] per run unsubscribe in progress
+        self._consumers = Counter()  # type -> get_event() calls waiting on an empty queue
+        self._changed = asyncio.Condition()
+        self._feeder = None
+
+    async def __aenter__(self):
+        self._feeder = asyncio.create_task(self._feed())
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._feeder is not None:
+            self._feeder.cancel()
+            await asyncio.gather(self._feeder, return_exceptions=True)
+        return False
+
+    def _queue(self, type_name):
+        if type_name not in self._queues:
+            self._queues[type_name] = deque()
+        return self._queues[type_name]
+
+    async def _wait_until(self, predicate):
+        """Wait (up to sync_timeout) for predicate(); caller holds self._changed. False on timeout"""
+        try:
+            await asyncio.wait_for(self._changed.wait_for(predicate), timeout=self.sync_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def subscribe(self, event_type, symbols):
+        type_name, symbols = event_type.__name__, list(symbols)
+        async with self._changed:
+            self._subscribed.setdefault(type_name, set()).update(symbols)
+            self._run_subs.update((type_name, symbol) for symbol in symbols)
+            self._changed.notify_all()
+
+    async def unsubscribe(self, event_type, symbols):
+        # Returns when the replay reaches the recorded unsubscribe, i.e. after exactly the
+        # events the original run consumed before its unsubscribe returned
+        type_name, symbols = event_type.__name__, list(symbols)
+        request = [(type_name, frozenset(symbols)), False]
+        async with self._changed:
+            self._unsubscribes.append(request)
+            self._changed.notify_all()
+            try:
+                await self._wait_until(lambda: request[1] or self.finished.is_set())
+            finally:
+                self._unsubscribes.remove(request)
+                self._subscribed.get(type_name, set()).difference_update(symbols)
+                self._changed.notify_all()
+
+    async def get_event(self, event_type):
+        type_name = event_type.__name__
+        queue = self._queue(type_name)
+        while True:
+            while queue:
+                event = queue.popleft()
+                if event.event_symbol in self._subscribed.get(type_name, ()):
+                    self.events_replayed += 1
+                    return event
+                self.events_dropped += 1  # queued before the run unsubscribed
+
+            async with self._changed:
+                self._consumers[type_name] += 1
+                self._changed.notify_all()
+                try:
+                    await self._changed.wait_for(lambda: queue)
+                finally:
+                    self._consumers[type_name] -= 1
+                    self._changed.notify_all()
+
+    async def _replay_sub(self, type_name, symbols):
+        keys = [(type_name, symbol) for symbol in symbols]
+        self._recorded_subs.update(keys)
+        await self._wait_until(lambda: all(self._run_subs[key] >= self._recorded_subs[key] for key in keys))
+
+    async def _replay_unsub(self, type_name, symbols):
+        key = (type_name, frozenset(symbols))
+        request = next((r for r in self._unsubscribes if r[0] == key and not r[1]), None)
+        if request is None and await self._wait_until(lambda: any(r[0] == key and not r[1] for r in self._unsubscribes)):
+            request = next(r for r in self._unsubscribes if r[0] == key and not r[1])
+        if request is None:
+            return
+        # Let the run finish unsubscribing (and whatever it does right after) before the next burst
+        request[1] = True
+        self._changed.notify_all()
+        await self._wait_until(lambda: request not in self._unsubscribes)
+
+    async def _replay_burst(self, burst):
+        # A recorded burst is queued at once and drained before the next one, so the
+        # run's other tasks only get to run between bursts, as they did live
+        pushed = set()
+        for kind, _, event, _ in burst:
+            if event.event_symbol in self._subscribed.get(kind, ()):
+                self._queue(kind).append(event)
+                pushed.add(kind)
+            else:
+                self.events_dropped += 1
+        if not pushed:
+            return
+        self._changed.notify_all()
+
+        def drained():
+            # An unsubscribing run with no consumer waiting has stopped collecting this type
+            return all(not self._queues[kind] or (self._consumers[kind] == 0 and self._unsubscribes)
+                       for kind in pushed)
+        await self._wait_until(drained)
+        for kind in pushed:
+            self.events_dropped += len(self._queues[kind])
+            self._queues[kind].clear()
+
+    async def _feed(self):
+        base_recorded, base_wall = 0, time.monotonic()
+        ops = read_recording(self.path)
+        try:
+            op = next(ops, None)
+            while op is not None:
+                kind, t_us = op[0], op[1]
+                if kind == "session":
+                    base_recorded, base_wall = 0, time.monotonic()
+                    op = next(ops, None)
+                    continue
+                if kind in ("sub", "unsub"):
+                    async with self._changed:
+                        if kind == "sub":
+                            await self._replay_sub(op[2], op[3])
+                            base_recorded, base_wall = t_us, time.monotonic()
+                        else:
+                            await self._replay_unsub(op[2], op[3])
+                    op = next(ops, None)
+                    continue
+
+                burst, op = [op], next(ops, None)
+                while op is not None and op[0] in REPLAY_EVENTS and not op[3]:
+                    burst.append(op)
+                    op = next(ops, None)
+
+                if self.speed is not None:
+                    delay = base_wall + (t_us - base_recorded) / 1e6 / self.speed - time.monotonic()
+                    if delay > MIN_SLEEP_SECONDS:
+                        await asyncio.sleep(delay)
+                async with self._changed:
+                    await self._replay_burst(burst)
+        finally:
+            self.finished.set()
+            async with self._changed:
+                self._changed.notify_all()
+
+def summarize_recording(path):
+    """Op counts, session count, symbol total and last event time for a recording"""
+    counts, symbols, sessions, last_us = Counter(), set(), 0, 0
+    for op in read_recording(path):
+        if op[0] == "session":
+            sessions += 1
+            continue
+        counts[op[0]] += 1
+        last_us = max(last_us, op[1])
+        if op[0] in REPLAY_EVENTS:
+            symbols.add(op[2].event_symbol)
+    return {"sessions": sessions, "ops": dict(counts), "symbols": len(symbols), "last_event_seconds": last_us / 1e6}
+
+if __name__ == "__main__":
+    import sys
+    for path in sys.argv[1:]:
+        summary = summarize_recording(path)
+        print(f"🎞️ {path}: {summary['sessions']} session(s), {summary['symbols']:,} symbols, "
+              f"{summary['last_event_seconds']:.1f}s")
+        for op, count in sorted(summary["ops"].items()):
+            print(f"   {op}: {count:,}")
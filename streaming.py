@@ -0,0 +1,163 @@
+# streaming.py - Concurrent DXLink Event Collection
+"""
+Shared collector engine for every DXLinkStreamer loop in the pipeline.
+Runs one consumer task per event type (Quote, Greeks, Summary) so a quiet
+feed never stalls the others, and stops as soon as coverage is reached.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+class EventCollector:
+    """Fan events from a shared streamer into per-type handlers.
+
+    handlers: {EventType: callable(event) -> bool}. A handler returns True
+    when the event added or changed collected data; that resets the idle
+    timer and triggers a coverage check.
+    done: callable(elapsed) -> bool, checked whenever data changes and on
+    every tick. Collection stops when it returns True.
+    progress: callable(elapsed), called every `progress_every` seconds.
+    """
+
+    def __init__(self, streamer, handlers, done=None, timeout=25, idle_timeout=None,
+                 progress=None, progress_every=3, tick=0.25):
+        self.streamer = streamer
+        self.handlers = handlers
+        self.done = done
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.progress = progress
+        self.progress_every = progress_every
+        self.tick = tick
+        self.events_received = 0
+        self.events_by_type = {event_type: 0 for event_type in handlers}
+        self.handler_errors = 0
+        self.elapsed = 0.0
+        self.stop_reason = None
+        self._changed = asyncio.Event()
+        self._last_update = None
+
+    async def _consume(self, event_type, handler):
+        """Consume one event type until cancelled"""
+        while True:
+            event = await self.streamer.get_event(event_type)
+            self.events_received += 1
+            self.events_by_type[event_type] += 1
+            if not event:
+                continue
+            try:
+                if handler(event):
+                    self._last_update = time.time()
+                    self._changed.set()
+            except Exception as e:
+                self.handler_errors += 1
+                print(f"  ⚠️ {event_type.__name__} error: {e}")
+
+    async def run(self):
+        """Collect until coverage, idle timeout or time budget; returns stop reason"""
+        start_time = time.time()
+        self._last_update = start_time
+        last_report = start_time
+        tasks = [
+            asyncio.create_task(self._consume(event_type, handler))
+            for event_type, handler in self.handlers.items()
+        ]
+
+        try:
+            while True:
+                now = time.time()
+                elapsed = now - start_time
+
+                if self.done and self.done(elapsed):
+                    self.stop_reason = "coverage"
+                    break
+                if elapsed >= self.timeout:
+                    self.stop_reason = "timeout"
+                    break
+                if self.idle_timeout and now - self._last_update >= self.idle_timeout:
+                    self.stop_reason = "idle"
+                    break
+                if self.progress and now - last_report >= self.progress_every:
+                    self.progress(elapsed)
+                    last_report = now
+
+                # A consumer that died on a transport error ends the collection
+                failed = [t for t in tasks if t.done() and not t.cancelled() and t.exception()]
+                if failed:
+                    print(f"  ⚠️ Stream error: {failed[0].exception()}")
+                    self.stop_reason = "error"
+                    break
+
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait(),
+                        timeout=max(0.0, min(self.tick, self.timeout - elapsed))
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.elapsed = time.time() - start_time
+
+        return self.stop_reason
+
+@asynccontextmanager
+async def subscribed(streamer, subscriptions):
+    """Subscribe {EventType: symbols} for the duration of the block"""
+    active = {event_type: list(symbols) for event_type, symbols in subscriptions.items() if symbols}
+    for event_type, symbols in active.items():
+        await streamer.subscribe(event_type, symbols)
+    try:
+        yield streamer
+    finally:
+        for event_type, symbols in active.items():
+            await streamer.unsubscribe(event_type, symbols)
+
+async def collect_events(streamer, subscriptions, handlers, **kwargs):
+    """Subscribe, run an EventCollector, unsubscribe; returns the collector"""
+    collector = EventCollector(streamer, handlers, **kwargs)
+    async with subscribed(streamer, subscriptions):
+        await collector.run()
+    return collector
+
+def event_types():
+    """(Quote, Greeks, Summary) event classes to subscribe with.
+
+    Streamers tell event types apart by class name, so the simulator and
+    replays use the recording's event tuples and only the live feed needs
+    tastytrade.dxfeed.
+    """
+    from stream_replay import REPLAY_EVENTS, replay_path
+    from simulator import simulated
+    if replay_path() or simulated():
+        return REPLAY_EVENTS["Quote"], REPLAY_EVENTS["Greeks"], REPLAY_EVENTS["Summary"]
+    from tastytrade.dxfeed import Greeks, Quote, Summary
+    return Quote, Greeks, Summary
+
+def create_streamer(sess):
+    """DXLinkStreamer for the session, or its record/replay/simulator stand-in
+    (see stream_replay.py and simulator/)"""
+    from stream_replay import RecordingStreamer, ReplayStreamer, record_path, replay_path, replay_speed
+    from simulator import create_sim_streamer, simulated
+    if replay_path():
+        return ReplayStreamer(replay_path(), speed=replay_speed())
+    if simulated():
+        streamer = create_sim_streamer()
+    else:
+        from tastytrade import DXLinkStreamer
+        streamer = DXLinkStreamer(sess)
+    if record_path():
+        return RecordingStreamer(streamer, record_path())
+    return streamer
+
+@asynccontextmanager
+async def open_streamer(sess, streamer=None):
+    """Use a caller-provided streamer, or open one for the block"""
+    if streamer is not None:
+        yield streamer
+        return
+    async with create_streamer(sess) as own_streamer:
+        yield own_streamer
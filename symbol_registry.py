@@ -0,0 +1,74 @@
+# symbol_registry.py - Streamer Symbol Registry
+"""
+Interns DXLink streamer symbols to dense integer ids once per run and keeps
+what owns each id (ticker, contract record, batch). Event handlers resolve
+an event_symbol with one dict lookup instead of scanning a batch list, so
+the per-event cost does not grow with the batch size. QuoteBook rows use
+the same ids.
+"""
+
+class SymbolRegistry:
+    """symbol -> id, plus per-id ticker, record and batch number"""
+
+    def __init__(self, symbols=()):
+        self.ids = {}
+        self.symbols = []
+        self.tickers = []
+        self.records = []
+        self.batch_ids = []
+        for symbol in symbols:
+            self.intern(symbol)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.ids
+
+    def intern(self, symbol, ticker=None, record=None):
+        """Id for a symbol; the first call records its ticker and record"""
+        sid = self.ids.get(symbol)
+        if sid is None:
+            sid = len(self.symbols)
+            self.ids[symbol] = sid
+            self.symbols.append(symbol)
+            self.tickers.append(ticker)
+            self.records.append(record)
+            self.batch_ids.append(None)
+        return sid
+
+    def batches(self, batch_size):
+        """Split all symbols into subscription batches (in id order) and record each id's batch"""
+        batches = []
+        for batch_num, start in enumerate(range(0, len(self.symbols), batch_size)):
+            batch = self.symbols[start:start + batch_size]
+            self.batch_ids[start:start + len(batch)] = [batch_num] * len(batch)
+            batches.append(batch)
+        return batches
+
+    def dispatch(self, symbol, batch=None):
+        """Id of an event's symbol, or None if unknown (or not in `batch` when given)"""
+        sid = self.ids.get(symbol)
+        if sid is None or (batch is not None and self.batch_ids[sid] != batch):
+            return None
+        return sid
+
+    def ticker(self, symbol):
+        sid = self.ids.get(symbol)
+        return None if sid is None else self.tickers[sid]
+
+    def record(self, symbol):
+        sid = self.ids.get(symbol)
+        return None if sid is None else self.records[sid]
+
+    def set_record(self, symbol, record):
+        """Point a symbol (interned if new) at a new owner record; returns its id"""
+        sid = self.intern(symbol)
+        self.records[sid] = record
+        return sid
+
+    def clear(self, symbol):
+        """Drop a symbol's record (its id stays reserved); unknown symbols are ignored"""
+        sid = self.ids.get(symbol)
+        if sid is not None:
+            self.records[sid] = None
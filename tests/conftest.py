@@ -0,0 +1,8 @@
+import os
+import sys
+from pathlib import Path
+
+# The pipeline is flat scripts at the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Tests run offline: step modules resolve their event types for the simulator
+os.environ.setdefault("MARKET_PROVIDER", "sim")
@@ -0,0 +1,70 @@
+# tests/test_chain_cache.py - Chain cache names, invalidation, TTL, replay misses and recorded chains
+import os
+import time
+from datetime import date
+import pytest
+import chain_cache
+
+DAY = date(2025, 1, 17)
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(chain_cache, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(chain_cache, "_memory_cache", {})
+    monkeypatch.setattr(chain_cache, "_pinned_date", None)
+    return tmp_path
+
+def test_cache_paths_do_not_collide():
+    names = {chain_cache.cache_path(symbol, DAY).name for symbol in ("BRK.B", "BRK/B", "BRK_B", "BRK")}
+    assert len(names) == 4
+
+def test_invalidate_leaves_other_symbols(cache_dir):
+    for symbol in ("BRK", "BRK.B", "BRK_B"):
+        chain_cache.cache_path(symbol, DAY).touch()
+
+    chain_cache.invalidate("BRK")
+
+    assert sorted(path.name for path in cache_dir.iterdir()) == sorted(
+        chain_cache.cache_path(symbol, DAY).name for symbol in ("BRK.B", "BRK_B"))
+
+def test_memory_hits_expire_with_ttl(cache_dir, monkeypatch):
+    monkeypatch.setattr(chain_cache, "trading_date", lambda: DAY)
+    chain_cache.store_chain("SPY", {})
+    assert chain_cache.load_cached_chain("SPY", ttl=60) == {}
+
+    written = time.time() - 120
+    path = chain_cache.cache_path("SPY")
+    os.utime(path, (written, written))
+    chain_cache._memory_cache[("SPY", path.name)] = ({}, written)
+
+    assert chain_cache.load_cached_chain("SPY", ttl=60) is None
+    assert not chain_cache._memory_cache
+
+def test_replay_cache_miss_is_explicit(cache_dir, monkeypatch):
+    monkeypatch.setenv("MARKET_PROVIDER", "tastytrade")
+    monkeypatch.setenv("DXLINK_REPLAY", str(cache_dir / "session.jsonl.gz"))
+    chain_cache.pin_trading_date(DAY)
+    chain_cache.store_chain("SPY", {})
+
+    assert chain_cache.get_option_chain(None, "SPY", refresh=True) == {}
+    with pytest.raises(LookupError, match="QQQ chain not in recording/cache"):
+        chain_cache.get_option_chain(None, "QQQ")
+
+def test_recorded_chains_replay_without_cache_or_provider(cache_dir, monkeypatch):
+    recording = cache_dir / "session.jsonl.gz"
+    monkeypatch.setenv("MARKET_PROVIDER", "sim")
+    monkeypatch.setenv("DXLINK_RECORD", str(recording))
+    chain_cache.pin_trading_date(DAY)
+    recorded = chain_cache.get_option_chain(None, "SPY")
+
+    monkeypatch.setenv("MARKET_PROVIDER", "tastytrade")
+    monkeypatch.delenv("DXLINK_RECORD")
+    monkeypatch.setenv("DXLINK_REPLAY", str(recording))
+    monkeypatch.setattr(chain_cache, "_memory_cache", {})
+    replayed = chain_cache.get_option_chain(None, "SPY")
+
+    assert not list(cache_dir.glob("*.npz"))
+    assert sorted(replayed) == sorted(recorded)
+    exp_date = min(recorded)
+    assert [(o.streamer_symbol, float(o.strike_price), o.option_type.value) for o in replayed[exp_date]] == \
+           [(o.streamer_symbol, float(o.strike_price), o.option_type.value) for o in recorded[exp_date]]
@@ -0,0 +1,20 @@
+# tests/test_columnar.py - options_contracts table round trip
+import json
+from columnar import load_contracts_data, save_contracts_table, table_is_current
+from simulator.dataset import generate_contracts_data
+
+def test_contracts_table_rebuilds_the_json_payload(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    contracts_data, _ = generate_contracts_data("gpt", tickers=3, expirations=2, strikes=4, seed=3)
+    with open("options_contracts_gpt.json", "w") as f:
+        json.dump(contracts_data, f)
+    save_contracts_table(contracts_data, "options_contracts_gpt.json")
+    assert table_is_current("options_contracts_gpt.json")
+    with open("options_contracts_gpt.json") as f:
+        expected = json.load(f)
+    (tmp_path / "options_contracts_gpt.json").unlink()
+
+    loaded = load_contracts_data("gpt")
+
+    assert loaded == expected
+    assert json.dumps(loaded)
@@ -0,0 +1,19 @@
+# tests/test_greeks.py - Splitting combined market_data records
+from greeks import split_market_data
+
+def test_quote_part_keeps_extras_with_bid_and_ask():
+    quote_data, greek_data, timestamp = split_market_data({
+        "bid": 1.2, "ask": 1.3, "mid": 1.25, "open_interest": 500, "volume": 40, "delta": -0.3,
+        "timestamp": "2026-01-05T20:00:00+00:00",
+    })
+    assert quote_data == {"bid": 1.2, "ask": 1.3, "mid": 1.25, "open_interest": 500, "volume": 40}
+    assert greek_data == {"delta": -0.3}
+    assert timestamp == "2026-01-05T20:00:00+00:00"
+
+def test_extras_alone_are_not_a_quote():
+    quote_data, greek_data, _ = split_market_data({"open_interest": 500, "volume": 40, "delta": -0.3, "iv": 0.4})
+    assert quote_data == {}
+    assert greek_data == {"delta": -0.3, "iv": 0.4}
+
+def test_one_sided_market_is_not_a_quote():
+    assert split_market_data({"bid": 1.2, "open_interest": 500})[0] == {}
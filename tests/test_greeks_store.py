@@ -0,0 +1,35 @@
+# tests/test_greeks_store.py - Columnar greeks_data round trip
+import numpy as np
+from greeks import save_greeks_data
+from greeks_store import load_greeks_data
+from simulator.dataset import generate_dataset
+
+def test_default_save_loads_memory_mapped_columns(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _, greeks_data = generate_dataset("gpt", tickers=3, expirations=2, strikes=4, seed=1)
+    save_greeks_data(greeks_data, "greeks_data_gpt.json")
+
+    loaded = load_greeks_data("gpt")
+
+    assert isinstance(loaded["contracts"]["strike"], np.memmap)
+    assert isinstance(loaded["market"]["mid"], np.memmap)
+    assert loaded["contracts"]["strike"].tolist() == list(greeks_data["contracts"]["strike"])
+
+def test_json_rewritten_after_table_wins(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _, greeks_data = generate_dataset("gpt", tickers=2, expirations=1, strikes=2, seed=2)
+    save_greeks_data(greeks_data, "greeks_data_gpt.json")
+    save_greeks_data(greeks_data, "greeks_data_gpt.json", columnar=False)
+
+    assert isinstance(load_greeks_data("gpt")["contracts"]["strike"], list)
+
+def test_written_dataset_loads_from_its_tables(tmp_path):
+    from columnar import load_contracts_data, table_is_current
+    from simulator.dataset import write_dataset
+
+    contracts_data, greeks_data = generate_dataset("grok", tickers=2, expirations=2, strikes=3, seed=4)
+    contracts_path, greeks_path = write_dataset(tmp_path, contracts_data, greeks_data)
+
+    assert table_is_current(contracts_path) and table_is_current(greeks_path)
+    assert isinstance(load_greeks_data("grok", tmp_path)["market"]["iv"], np.memmap)
+    assert load_contracts_data("grok", tmp_path)["contracts_by_ticker"].keys() == contracts_data["contracts_by_ticker"].keys()
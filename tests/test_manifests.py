@@ -0,0 +1,58 @@
+# tests/test_manifests.py - Inputs hash sources, artifact hashes
+import json
+from manifests import fresh_manifest, hash_artifact, inputs_hash, local_sources, write_manifest
+
+def write(root, name, text=""):
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+def test_local_sources_follow_transitive_and_lazy_imports(tmp_path):
+    write(tmp_path, "step.py", "import json\nimport helper\n\ndef run():\n    from pkg import sub\n")
+    write(tmp_path, "helper.py", "from pkg.deep import thing\n")
+    write(tmp_path, "pkg/__init__.py")
+    write(tmp_path, "pkg/sub.py")
+    write(tmp_path, "pkg/deep.py", "import step\n")
+    write(tmp_path, "unused.py")
+
+    assert local_sources("step.py", tmp_path) == [
+        "helper.py", "pkg/__init__.py", "pkg/deep.py", "pkg/sub.py", "step.py"]
+
+def test_unparseable_module_is_still_a_source(tmp_path):
+    write(tmp_path, "step.py", "import config\n")
+    write(tmp_path, "config.py", "```python\nUSERNAME = 'x'\n```\n")
+
+    assert local_sources("step.py", tmp_path) == ["config.py", "step.py"]
+
+def test_helper_change_changes_inputs_hash(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write(tmp_path, "step.py", "import helper\n")
+    write(tmp_path, "helper.py", "SCALE = 1\n")
+    before = inputs_hash("step", {}, local_sources("step.py"))
+    write(tmp_path, "helper.py", "SCALE = 2\n")
+
+    assert inputs_hash("step", {}, local_sources("step.py")) != before
+
+def test_artifact_hash_ignores_timestamps(tmp_path):
+    artifact = tmp_path / "spot_quotes_gpt.json"
+    quotes = {"AAPL": {"bid": 1.0, "ask": 1.1, "timestamp": "2026-01-05T20:00:00+00:00"}}
+    artifact.write_text(json.dumps({"quotes": quotes, "timestamp": "2026-01-05T20:00:01+00:00"}))
+    before = hash_artifact(artifact)
+
+    quotes["AAPL"]["timestamp"] = "2026-01-05T20:10:00+00:00"
+    artifact.write_text(json.dumps({"quotes": quotes, "timestamp": "2026-01-05T20:10:01+00:00"}, indent=2))
+    assert hash_artifact(artifact) == before
+
+    quotes["AAPL"]["bid"] = 1.05
+    artifact.write_text(json.dumps({"quotes": quotes, "timestamp": "2026-01-05T20:10:01+00:00"}))
+    assert hash_artifact(artifact) != before
+
+def test_recollected_artifact_keeps_downstream_inputs_hash(tmp_path):
+    artifact = tmp_path / "spot_quotes_gpt.json"
+    artifact.write_text(json.dumps({"quotes": {"AAPL": {"bid": 1.0}}, "timestamp": "2026-01-05T20:00:00+00:00"}))
+    first = write_manifest(artifact, "inputs")["output_hash"]
+    artifact.write_text(json.dumps({"quotes": {"AAPL": {"bid": 1.0}}, "timestamp": "2026-01-05T21:00:00+00:00"}))
+    second = write_manifest(artifact, "inputs")["output_hash"]
+
+    assert inputs_hash("rank", upstream={"spot": second}) == inputs_hash("rank", upstream={"spot": first})
+    assert fresh_manifest(artifact, "inputs", None)
@@ -0,0 +1,21 @@
+# tests/test_sim_imports.py - Sim provider stays offline
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULES = ["build_universe", "spot", "ticker_ranker", "options_chains", "greeks", "spread_analyzer", "live",
+           "session_provider", "chain_cache", "streaming"]
+
+def test_sim_provider_imports_neither_tastytrade_nor_config():
+    script = (f"import sys\nfor name in {MODULES!r}:\n    __import__(name)\n"
+              "from session_provider import get_session\nfrom streaming import create_streamer\n"
+              "create_streamer(get_session())\n"
+              "print(sorted(m for m in sys.modules if m.split('.')[0] in ('tastytrade', 'config')))")
+    env = {**os.environ, "MARKET_PROVIDER": "sim"}
+    env.pop("DXLINK_REPLAY", None)
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
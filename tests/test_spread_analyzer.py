@@ -0,0 +1,96 @@
+# tests/test_spread_analyzer.py - Batch vs scalar Black-Scholes PoP, serial vs parallel spreads
+import math
+import random
+import numpy as np
+import pytest
+from datetime import date
+from simulator.dataset import generate_dataset
+from spread_analyzer import (analyze_credit_spreads_for_mode, calculate_black_scholes_pop,
+                             calculate_black_scholes_pop_batch, construct_credit_spreads, construct_spreads_parallel,
+                             get_process_pool)
+
+def random_rows(count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        spot = rng.uniform(5, 900)
+        rows.append((spot, round(spot * rng.uniform(0.6, 1.4), 2), rng.randint(1, 120),
+                     rng.uniform(0.05, 1.5), rng.choice("CP")))
+    return rows
+
+def batch(rows):
+    spot, strike, dte, iv, option_type = (np.array(column) for column in zip(*rows))
+    return calculate_black_scholes_pop_batch(spot, strike, dte, iv, option_type)
+
+def scalar(rows):
+    return [calculate_black_scholes_pop(float(spot), float(strike), float(dte), float(iv), option_type)
+            for spot, strike, dte, iv, option_type in rows]
+
+def test_batch_matches_scalar_on_random_rows():
+    rows = random_rows(2000)
+    np.testing.assert_allclose(batch(rows), scalar(rows), rtol=1e-12, atol=1e-12)
+
+@pytest.mark.parametrize("row", [
+    (100.0, 100.0, 0, 0.3, "C"),      # expired
+    (100.0, 100.0, -5, 0.3, "P"),
+    (100.0, 100.0, 30, 0.0, "C"),     # no volatility
+    (100.0, 100.0, 30, -0.2, "P"),
+    (0.0, 100.0, 30, 0.3, "C"),       # no spot
+    (-10.0, 100.0, 30, 0.3, "P"),
+    (100.0, 0.0, 30, 0.3, "C"),       # strike the scalar path can't divide by
+    (100.0, -50.0, 30, 0.3, "P"),     # or take the log of
+])
+def test_guard_rows_are_zero(row):
+    assert scalar([row]) == [0]
+    assert batch([row]).tolist() == [0.0]
+
+def test_guard_rows_do_not_disturb_neighbours():
+    rows = random_rows(50, seed=1)
+    rows[10] = (100.0, 100.0, 0, 0.3, "C")
+    rows[20] = (100.0, 0.0, 30, 0.3, "P")
+    np.testing.assert_allclose(batch(rows), scalar(rows), rtol=1e-12, atol=1e-12)
+
+@pytest.mark.parametrize("row", [
+    (math.nan, 100.0, 30, 0.3, "C"),
+    (100.0, math.nan, 30, 0.3, "P"),
+    (100.0, 100.0, math.nan, 0.3, "C"),
+    (100.0, 100.0, 30, math.nan, "P"),
+])
+def test_nan_inputs_propagate(row):
+    assert math.isnan(scalar([row])[0])
+    assert np.isnan(batch([row])).all()
+
+def test_broadcasts_scalar_arguments():
+    strikes = np.array([90.0, 100.0, 110.0])
+    result = calculate_black_scholes_pop_batch(100.0, strikes, 30, 0.25, "P")
+    expected = [calculate_black_scholes_pop(100.0, float(k), 30, 0.25, "P") for k in strikes]
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+def test_process_pool_follows_max_workers():
+    pool = get_process_pool(1)
+    assert get_process_pool(1) is pool
+
+    resized = get_process_pool(2)
+    assert resized is not pool
+    assert resized._max_workers == 2
+
+@pytest.fixture(scope="module")
+def greeks_data():
+    return generate_dataset("gpt", tickers=8, expirations=3, strikes=20, today=date(2026, 1, 5))[1]
+
+@pytest.mark.parametrize("spread_options", [{"exhaustive": False}, {"exhaustive": True, "max_width": 10}])
+def test_parallel_spreads_match_serial(greeks_data, spread_options):
+    items = list(greeks_data.by_ticker.items())
+    serial = [(ticker, construct_credit_spreads(ticker_data, **spread_options)) for ticker, ticker_data in items]
+    parallel = list(construct_spreads_parallel(items, spread_options, max_workers=2))
+    assert any(spreads for _, spreads in serial)
+    assert parallel == serial
+
+def test_parallel_analysis_matches_serial(greeks_data):
+    options = {"verbose": False, "greeks_data": greeks_data, "save": False, "keep_all_spreads": True}
+    serial = analyze_credit_spreads_for_mode("gpt", **options)
+    parallel = analyze_credit_spreads_for_mode("gpt", parallel=True, max_workers=2, **options)
+    for result in (serial, parallel):
+        result.pop("analysis_timestamp")
+    assert serial["all_spreads"]
+    assert parallel == serial
@@ -0,0 +1,53 @@
+# tests/test_stream_replay.py - Record a simulated session, replay it offline, same rankings
+import asyncio
+import pytest
+import chain_cache
+from simulator.dataset import generate_universe
+from spot import collect_quotes_for_validated_tickers
+from streaming import create_streamer
+from ticker_ranker import rank_all_tickers_for_credit_spreads
+
+async def spot_and_rank(mode):
+    async with create_streamer(None) as streamer:
+        quotes_data = await collect_quotes_for_validated_tickers(mode, universe_data=generate_universe(mode),
+                                                                 streamer=streamer, save=False)
+        rankings = await rank_all_tickers_for_credit_spreads(mode, quotes_data=quotes_data, streamer=streamer,
+                                                             save=False)
+    quotes = {ticker: (q["bid"], q["ask"]) for ticker, q in quotes_data["quotes"].items()}
+    return quotes, rankings
+
+def ranking_rows(rankings):
+    return [(r["ticker"], r["liquidity_score"], r["metrics"]) for r in rankings["ticker_rankings"]] + \
+           [(r["ticker"], r["status"]) for r in rankings["failed_tickers"]]
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(chain_cache, "CACHE_DIR", tmp_path / ".chain_cache")
+    monkeypatch.setattr(chain_cache, "_memory_cache", {})
+    monkeypatch.setattr(chain_cache, "_pinned_date", None)
+    return tmp_path
+
+def test_max_speed_replay_reproduces_recorded_rankings(offline, monkeypatch):
+    recording = offline / "session.jsonl.gz"
+    monkeypatch.setenv("MARKET_PROVIDER", "sim")
+    # Throttled, lossy feed with live updates: tickers finish at different times while their
+    # symbols keep ticking, so events must reach each ticker between the recorded (un)subscribes
+    monkeypatch.setenv("SIM_EVENTS_PER_SECOND", "3000")
+    monkeypatch.setenv("SIM_DROP_RATE", "0.2")
+    monkeypatch.setenv("SIM_UPDATE_INTERVAL", "0.05")
+    monkeypatch.setenv("DXLINK_RECORD", str(recording))
+    recorded_quotes, recorded = asyncio.run(spot_and_rank("merged"))
+
+    # Default provider, no chain cache: everything comes from the recording
+    monkeypatch.setenv("MARKET_PROVIDER", "tastytrade")
+    monkeypatch.delenv("DXLINK_RECORD")
+    monkeypatch.setenv("DXLINK_REPLAY", str(recording))
+    monkeypatch.setenv("DXLINK_REPLAY_SPEED", "max")
+    monkeypatch.setattr(chain_cache, "_memory_cache", {})
+    replayed_quotes, replayed = asyncio.run(spot_and_rank("merged"))
+
+    assert recorded["ticker_rankings"]
+    assert replayed_quotes == recorded_quotes
+    assert ranking_rows(replayed) == ranking_rows(recorded)
+    assert replayed["analysis_stats"] == recorded["analysis_stats"]
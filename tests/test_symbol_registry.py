@@ -0,0 +1,16 @@
+# tests/test_symbol_registry.py - Registry record ownership
+from symbol_registry import SymbolRegistry
+
+def test_set_record_and_clear():
+    registry = SymbolRegistry(["SPY"])
+    owner = object()
+
+    sid = registry.set_record(".QQQ250117C500", owner)
+    assert registry.record(".QQQ250117C500") is owner
+    assert registry.dispatch(".QQQ250117C500") == sid
+
+    registry.clear(".QQQ250117C500")
+    registry.clear("UNKNOWN")
+    assert registry.record(".QQQ250117C500") is None
+    assert ".QQQ250117C500" in registry
+    assert "UNKNOWN" not in registry
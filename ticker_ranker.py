@@ -5,19 +5,23 @@ Focuses on metrics that matter for credit spreads: tight spreads, high OI, good
 """
 import asyncio
 import json
-import time
 import statistics
 from datetime import datetime, timezone
 from collections import defaultdict
-from tastytrade import Session, DXLinkStreamer
-from tastytrade.dxfeed import Quote, Summary, Greeks
-from tastytrade.instruments import get_option_chain
-from config import USERNAME, PASSWORD
+from chain_cache import get_option_chain, trading_date
+from session_provider import get_session
 from sectors import get_sectors, PerfTimer
+from tracing import span
+from streaming import EventCollector, collect_events, event_types, open_streamer, subscribed
+from quote_book import GREEKS, QUOTE, SUMMARY, QuoteBook
+from symbol_registry import SymbolRegistry
+
+Quote, Greeks, Summary = event_types()
 
 # Liquidity scoring parameters for credit spreads
 LIQUID_BENCHMARK_TICKERS = ["SPY", "QQQ", "AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "META", "GOOGL"]
 HIGH_VOL_TICKERS = {"TSLA", "NVDA", "AMD", "ROKU", "SNAP", "GME", "AMC"}
+IDLE_TIMEOUT_SECONDS = 3  # Stop waiting on a ticker whose sample has gone quiet
 
 def calculate_credit_spread_liquidity_score(metrics):
     """Calculate liquidity score optimized for credit spreads (0-100)"""
@@ -77,225 +81,379 @@ def calculate_credit_spread_liquidity_score(metrics):
     
     return min(100, round(score, 1))
 
-async def analyze_ticker_for_credit_spreads(ticker, spot_price, sess, timeout=12):
-    """Analyze a ticker's suitability for credit spreads"""
-    print(f"  🔍 {ticker}: Analyzing credit spread liquidity...")
+def select_credit_spread_sample(ticker, spot_price, sess):
+    """Pick the target expiry, ATM pair and near-money sample contracts"""
+    # Get options chain
+    chain = get_option_chain(sess, ticker)
+    if not chain:
+        return {"ticker": ticker, "status": "no_chain"}
     
-    try:
-        # Get options chain
-        chain = get_option_chain(sess, ticker)
-        if not chain:
-            return {"ticker": ticker, "status": "no_chain"}
-        
-        # Find optimal expiry for credit spreads (30-45 DTE)
-        today = datetime.now(timezone.utc).date()
-        target_exp = None
+    # Find optimal expiry for credit spreads (30-45 DTE); pinned to the recording's date on replay
+    today = trading_date()
+    target_exp = None
+    for exp_date in sorted(chain.keys()):
+        dte = (exp_date - today).days
+        if 30 <= dte <= 45:
+            target_exp = exp_date
+            break
+    
+    if not target_exp:
+        # Fallback to 21-60 DTE range
         for exp_date in sorted(chain.keys()):
             dte = (exp_date - today).days
-            if 30 <= dte <= 45:
+            if 21 <= dte <= 60:
                 target_exp = exp_date
                 break
+    
+    if not target_exp:
+        return {"ticker": ticker, "status": "no_suitable_expiry"}
+    
+    options = chain[target_exp]
+    dte = (target_exp - today).days
+    
+    # Find ATM and near-money options (critical for credit spreads)
+    atm_call = min([opt for opt in options if opt.option_type.value == "C"], 
+                  key=lambda x: abs(float(x.strike_price) - spot_price), 
+                  default=None)
+    atm_put = min([opt for opt in options if opt.option_type.value == "P"],
+                 key=lambda x: abs(float(x.strike_price) - spot_price),
+                 default=None)
+    
+    if not atm_call or not atm_put:
+        return {"ticker": ticker, "status": "no_atm_options"}
+    
+    # Sample options for credit spread analysis (focus on 85%-115% of spot)
+    credit_spread_options = []
+    strike_range = (spot_price * 0.85, spot_price * 1.15)
+    for opt in options:
+        strike = float(opt.strike_price)
+        if strike_range[0] <= strike <= strike_range[1]:
+            credit_spread_options.append(opt)
+    
+    # Limit sample size for performance
+    credit_spread_options = credit_spread_options[:30]
+    
+    if len(credit_spread_options) < 8:
+        return {"ticker": ticker, "status": "insufficient_credit_spread_options"}
+    
+    return {
+        "ticker": ticker,
+        "status": "sampled",
+        "dte": dte,
+        "symbols": [opt.streamer_symbol for opt in credit_spread_options],
+        "atm_call_symbol": atm_call.streamer_symbol,
+        "atm_put_symbol": atm_put.streamer_symbol,
+        "atm_symbols": [atm_call.streamer_symbol, atm_put.streamer_symbol]
+    }
+
+class SampleData:
+    """Quotes, summaries and ATM Greeks collected for one ticker's sample.
+    
+    Rows live in a QuoteBook: the sample's symbols take ids 0..n-1 and any
+    ATM symbol outside the sample follows, so membership is an id check.
+    """
+    
+    def __init__(self, sample):
+        self.sample = sample
+        self.symbols = set(sample["symbols"])
+        self.atm_symbols = set(sample["atm_symbols"])
+        self.book = QuoteBook(sample["symbols"] + sample["atm_symbols"], capacity=64)
+        self.sample_size = len(self.book.ids) - len(self.atm_symbols - self.symbols)
+        self.atm_ids = {self.book.ids[symbol] for symbol in self.atm_symbols}
+        self.complete = asyncio.Event()
+        self.updated = asyncio.Event()
+        self.events_received = 0
+    
+    def subscriptions(self):
+        return {Quote: self.sample["symbols"], Summary: self.sample["symbols"], Greeks: self.sample["atm_symbols"]}
+    
+    def _sample_id(self, symbol):
+        sid = self.book.ids.get(symbol)
+        return sid if sid is not None and sid < self.sample_size else None
+    
+    def on_quote(self, quote):
+        # Collect quotes (bid/ask for spreads)
+        self.events_received += 1
+        sid = self._sample_id(quote.event_symbol)
+        if sid is None or not self.book.apply_quote(quote, sid):
+            return False
+        return self._updated()
+    
+    def on_summary(self, summary):
+        # Collect summaries (OI and volume)
+        self.events_received += 1
+        sid = self._sample_id(summary.event_symbol)
+        if sid is None:
+            return False
+        self.book.apply_summary(summary, sid)
+        return self._updated()
+    
+    def on_greeks(self, greek):
+        # Collect ATM Greeks (for IV analysis)
+        self.events_received += 1
+        sid = self.book.ids.get(greek.event_symbol)
+        if sid not in self.atm_ids:
+            return False
+        self.book.apply_greeks(greek, sid)
+        return self._updated()
+    
+    def coverage_reached(self, elapsed=None):
+        quote_coverage = self.book.quote_count / self.sample_size
+        summary_coverage = self.book.summary_count / self.sample_size
+        return quote_coverage >= 0.7 and summary_coverage >= 0.5 and self.book.greeks_count >= 1
+    
+    def trace_attributes(self):
+        """Subscription and coverage figures for the ticker's tracing span"""
+        return {
+            "symbols_subscribed": len(self.symbols | self.atm_symbols),
+            "events_received": self.events_received,
+            "quote_coverage": round(self.book.quote_count / self.sample_size * 100, 1),
+            "summary_coverage": round(self.book.summary_count / self.sample_size * 100, 1),
+            "greeks_collected": self.book.greeks_count,
+        }
+    
+    def _updated(self):
+        self.updated.set()
+        if self.coverage_reached():
+            self.complete.set()
+        return True
+    
+    async def wait(self, timeout, idle_timeout=IDLE_TIMEOUT_SECONDS):
+        """Wait for coverage, `idle_timeout` seconds without new data or `timeout`; returns the stop reason"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not self.complete.is_set():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return "timeout"
+            self.updated.clear()
+            try:
+                await asyncio.wait_for(self.updated.wait(), timeout=min(idle_timeout, remaining))
+            except asyncio.TimeoutError:
+                return "idle" if remaining > idle_timeout else "timeout"
+        return "coverage"
+
+def score_credit_spread_sample(ticker, spot_price, data):
+    """Turn collected sample data into liquidity metrics and a score"""
+    sample = data.sample
+    rows = data.book.snapshot()
+    dte = sample["dte"]
+    
+    # Calculate liquidity metrics
+    quoted = (rows["seen"] & QUOTE) != 0
+    if not quoted.any():
+        return {"ticker": ticker, "status": "no_quote_data"}
+    spread_pct = 100 * (rows["ask"] - rows["bid"]) / rows["mid"]
+    
+    # ATM spread analysis (critical for credit spreads)
+    atm_spreads = []
+    for symbol in (sample["atm_call_symbol"], sample["atm_put_symbol"]):
+        sid = data.book.ids[symbol]
+        if quoted[sid]:
+            atm_spreads.append(float(spread_pct[sid]))
+    atm_spread_pct = statistics.median(atm_spreads) if atm_spreads else 100
+    
+    # Average OI and volume (for credit spread liquidity)
+    summarized = (rows["seen"] & SUMMARY) != 0
+    oi_values = rows["oi"][summarized & (rows["oi"] > 0)]
+    vol_values = rows["volume"][summarized & (rows["volume"] > 0)]
+    avg_oi = float(oi_values.mean()) if oi_values.size else 0
+    avg_volume = float(vol_values.mean()) if vol_values.size else 0
+    
+    # IV analysis
+    atm_ivs = rows["iv"][((rows["seen"] & GREEKS) != 0) & (rows["iv"] > 0)]
+    avg_iv = float(atm_ivs.mean()) if atm_ivs.size else 0
+    
+    # Compile metrics for credit spread analysis
+    metrics = {
+        "atm_spread_pct": round(atm_spread_pct, 2),
+        "avg_open_interest": round(avg_oi, 0),
+        "avg_volume": round(avg_volume, 0),
+        "avg_iv": round(avg_iv, 3),
+        "contracts_analyzed": data.book.quote_count,
+        "dte_target": dte,
+        "data_quality": {
+            "quote_coverage": round(data.book.quote_count / data.sample_size * 100, 1),
+            "summary_coverage": round(data.book.summary_count / data.sample_size * 100, 1),
+            "greeks_collected": data.book.greeks_count
+        }
+    }
+    
+    # Calculate credit spread liquidity score
+    liquidity_score = calculate_credit_spread_liquidity_score(metrics)
+    
+    print(f"    🏆 {ticker} Score: {liquidity_score:.1f} | Spread: {atm_spread_pct:.1f}% | OI: {avg_oi:.0f} | Vol: {avg_volume:.0f}")
+    
+    return {
+        "ticker": ticker,
+        "status": "analyzed", 
+        "spot_price": spot_price,
+        "dte": dte,
+        "liquidity_score": liquidity_score,
+        "metrics": metrics,
+        "credit_spread_suitability": "excellent" if liquidity_score >= 80 else "good" if liquidity_score >= 60 else "fair" if liquidity_score >= 40 else "poor",
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+async def analyze_ticker_for_credit_spreads(ticker, spot_price, sess, timeout=12, streamer=None, ticker_span=None):
+    """Analyze a ticker's suitability for credit spreads (ticker_span: tracing span to annotate)"""
+    print(f"  🔍 {ticker}: Analyzing credit spread liquidity...")
+    
+    try:
+        sample = select_credit_spread_sample(ticker, spot_price, sess)
+        if sample["status"] != "sampled":
+            return sample
         
-        if not target_exp:
-            # Fallback to 21-60 DTE range
-            for exp_date in sorted(chain.keys()):
-                dte = (exp_date - today).days
-                if 21 <= dte <= 60:
-                    target_exp = exp_date
-                    break
-        
-        if not target_exp:
-            return {"ticker": ticker, "status": "no_suitable_expiry"}
-        
-        options = chain[target_exp]
-        dte = (target_exp - today).days
-        
-        # Find ATM and near-money options (critical for credit spreads)
-        atm_call = min([opt for opt in options if opt.option_type.value == "C"], 
-                      key=lambda x: abs(float(x.strike_price) - spot_price), 
-                      default=None)
-        atm_put = min([opt for opt in options if opt.option_type.value == "P"],
-                     key=lambda x: abs(float(x.strike_price) - spot_price),
-                     default=None)
-        
-        if not atm_call or not atm_put:
-            return {"ticker": ticker, "status": "no_atm_options"}
-        
-        # Sample options for credit spread analysis (focus on 85%-115% of spot)
-        credit_spread_options = []
-        strike_range = (spot_price * 0.85, spot_price * 1.15)
-        for opt in options:
-            strike = float(opt.strike_price)
-            if strike_range[0] <= strike <= strike_range[1]:
-                credit_spread_options.append(opt)
-        
-        # Limit sample size for performance
-        credit_spread_options = credit_spread_options[:30]
-        
-        if len(credit_spread_options) < 8:
-            return {"ticker": ticker, "status": "insufficient_credit_spread_options"}
-        
-        symbols = [opt.streamer_symbol for opt in credit_spread_options]
-        atm_symbols = [atm_call.streamer_symbol, atm_put.streamer_symbol]
-        
-        print(f"    📡 Analyzing {len(symbols)} credit spread candidates...")
+        print(f"    📡 Analyzing {len(sample['symbols'])} credit spread candidates...")
         
         # Collect market data
-        quotes = {}
-        summaries = {}
-        greeks = {}
-        
-        async with DXLinkStreamer(sess) as streamer:
-            # Subscribe to data feeds
-            await streamer.subscribe(Quote, symbols)
-            await streamer.subscribe(Summary, symbols) 
-            await streamer.subscribe(Greeks, atm_symbols)
-            
-            start_time = time.time()
-            no_data_count = 0
-            
-            while time.time() - start_time < timeout:
-                try:
-                    # Collect quotes (bid/ask for spreads)
-                    quote = await asyncio.wait_for(streamer.get_event(Quote), timeout=0.3)
-                    if quote and quote.event_symbol in symbols:
-                        bid, ask = float(quote.bid_price or 0), float(quote.ask_price or 0)
-                        if bid > 0 and ask > 0 and ask >= bid:
-                            quotes[quote.event_symbol] = {
-                                "bid": bid, "ask": ask, "mid": (bid + ask) / 2,
-                                "spread": ask - bid, "spread_pct": 100 * (ask - bid) / ((bid + ask) / 2)
-                            }
-                            no_data_count = 0
-                except asyncio.TimeoutError:
-                    no_data_count += 1
-                    if no_data_count > 10:
-                        break
-                    continue
-                
-                try:
-                    # Collect summaries (OI and volume)
-                    summary = await asyncio.wait_for(streamer.get_event(Summary), timeout=0.3)
-                    if summary and summary.event_symbol in symbols:
-                        summaries[summary.event_symbol] = {
-                            "open_interest": int(summary.open_interest or 0),
-                            "volume": int(summary.prev_day_volume or 0)
-                        }
-                except asyncio.TimeoutError:
-                    continue
-                
-                try:
-                    # Collect ATM Greeks (for IV analysis)
-                    greek = await asyncio.wait_for(streamer.get_event(Greeks), timeout=0.3)
-                    if greek and greek.event_symbol in atm_symbols:
-                        greeks[greek.event_symbol] = {
-                            "iv": float(greek.volatility or 0),
-                            "delta": float(greek.delta or 0)
-                        }
-                except asyncio.TimeoutError:
-                    continue
-                
-                # Early exit if we have good coverage
-                quote_coverage = len(quotes) / len(symbols)
-                summary_coverage = len(summaries) / len(symbols)
-                if quote_coverage >= 0.7 and summary_coverage >= 0.5 and len(greeks) >= 1:
-                    print(f"    ✅ Good coverage achieved early")
-                    break
-            
-            # Cleanup subscriptions
-            await streamer.unsubscribe(Quote, symbols)
-            await streamer.unsubscribe(Summary, symbols)
-            await streamer.unsubscribe(Greeks, atm_symbols)
+        data = SampleData(sample)
+        async with open_streamer(sess, streamer) as streamer:
+            collector = await collect_events(
+                streamer,
+                data.subscriptions(),
+                {Quote: data.on_quote, Summary: data.on_summary, Greeks: data.on_greeks},
+                done=data.coverage_reached,
+                timeout=timeout,
+                idle_timeout=IDLE_TIMEOUT_SECONDS
+            )
         
-        # Calculate liquidity metrics
-        if not quotes:
-            return {"ticker": ticker, "status": "no_quote_data"}
-        
-        # ATM spread analysis (critical for credit spreads)
-        atm_call_quote = quotes.get(atm_call.streamer_symbol, {})
-        atm_put_quote = quotes.get(atm_put.streamer_symbol, {})
-        atm_spreads = []
-        if atm_call_quote:
-            atm_spreads.append(atm_call_quote["spread_pct"])
-        if atm_put_quote:
-            atm_spreads.append(atm_put_quote["spread_pct"])
-        atm_spread_pct = statistics.median(atm_spreads) if atm_spreads else 100
-        
-        # Average OI and volume (for credit spread liquidity)
-        oi_values = [s.get("open_interest", 0) for s in summaries.values() if s.get("open_interest", 0) > 0]
-        vol_values = [s.get("volume", 0) for s in summaries.values() if s.get("volume", 0) > 0]
-        avg_oi = statistics.mean(oi_values) if oi_values else 0
-        avg_volume = statistics.mean(vol_values) if vol_values else 0
-        
-        # IV analysis
-        atm_ivs = [g["iv"] for g in greeks.values() if g["iv"] > 0]
-        avg_iv = statistics.mean(atm_ivs) if atm_ivs else 0
-        
-        # Compile metrics for credit spread analysis
-        metrics = {
-            "atm_spread_pct": round(atm_spread_pct, 2),
-            "avg_open_interest": round(avg_oi, 0),
-            "avg_volume": round(avg_volume, 0),
-            "avg_iv": round(avg_iv, 3),
-            "contracts_analyzed": len(quotes),
-            "dte_target": dte,
-            "data_quality": {
-                "quote_coverage": round(len(quotes) / len(symbols) * 100, 1),
-                "summary_coverage": round(len(summaries) / len(symbols) * 100, 1),
-                "greeks_collected": len(greeks)
-            }
-        }
+        if collector.stop_reason == "coverage":
+            print(f"    ✅ Good coverage achieved early")
         
-        # Calculate credit spread liquidity score
-        liquidity_score = calculate_credit_spread_liquidity_score(metrics)
-        
-        print(f"    🏆 Score: {liquidity_score:.1f} | Spread: {atm_spread_pct:.1f}% | OI: {avg_oi:.0f} | Vol: {avg_volume:.0f}")
-        
-        return {
-            "ticker": ticker,
-            "status": "analyzed", 
-            "spot_price": spot_price,
-            "dte": dte,
-            "liquidity_score": liquidity_score,
-            "metrics": metrics,
-            "credit_spread_suitability": "excellent" if liquidity_score >= 80 else "good" if liquidity_score >= 60 else "fair" if liquidity_score >= 40 else "poor",
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+        if ticker_span is not None:
+            ticker_span.set(**data.trace_attributes())
+        return score_credit_spread_sample(ticker, spot_price, data)
         
     except Exception as e:
         print(f"    ❌ Error: {str(e)[:60]}")
         return {"ticker": ticker, "status": f"error: {str(e)[:60]}"}
 
-async def rank_all_tickers_for_credit_spreads(mode):
+async def analyze_tickers_concurrently(tickers, spot_quotes, sess, max_concurrent=8, timeout=12, streamer=None):
+    """Analyze tickers in parallel over a single shared DXLinkStreamer.
+    
+    Up to `max_concurrent` tickers hold subscriptions at once. Events are
+    routed to the owning ticker by symbol, and each ticker is scored as soon
+    as its coverage thresholds are met (or it goes IDLE_TIMEOUT_SECONDS
+    without new data, or its timeout expires).
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+    registry = SymbolRegistry()  # record = the SampleData currently owning the symbol
+    all_done = asyncio.Event()
+    
+    def route(method):
+        def handler(event):
+            data = registry.record(event.event_symbol)
+            return getattr(data, method)(event) if data else False
+        return handler
+    
+    async def sample_and_score(i, ticker, streamer, ticker_span):
+        spot_price = spot_quotes[ticker]["mid"]
+        print(f"\n[{i}/{len(tickers)}] {ticker}")
+        try:
+            # Chain lookups are blocking HTTP calls; keep them off the event loop
+            sample = await asyncio.to_thread(select_credit_spread_sample, ticker, spot_price, sess)
+            if sample["status"] != "sampled":
+                print(f"    ⚠️ {ticker}: {sample['status']}")
+                return sample
+            
+            data = SampleData(sample)
+            for symbol in data.symbols | data.atm_symbols:
+                registry.set_record(symbol, data)
+            try:
+                async with subscribed(streamer, data.subscriptions()):
+                    # Same coverage / idle / time budget as the serial path
+                    await data.wait(timeout)
+            finally:
+                for symbol in data.symbols | data.atm_symbols:
+                    registry.clear(symbol)
+            
+            ticker_span.set(**data.trace_attributes())
+            return score_credit_spread_sample(ticker, spot_price, data)
+        except Exception as e:
+            print(f"    ❌ {ticker} error: {str(e)[:60]}")
+            return {"ticker": ticker, "status": f"error: {str(e)[:60]}"}
+    
+    async def analyze_one(i, ticker, streamer):
+        async with semaphore:
+            with span("rank ticker", "ticker", ticker=ticker, index=i) as ticker_span:
+                result = await sample_and_score(i, ticker, streamer, ticker_span)
+                ticker_span.set(status=result["status"], liquidity_score=result.get("liquidity_score"))
+                return result
+    
+    async with open_streamer(sess, streamer) as streamer:
+        collector = EventCollector(
+            streamer,
+            {Quote: route("on_quote"), Summary: route("on_summary"), Greeks: route("on_greeks")},
+            done=lambda elapsed: all_done.is_set(),
+            timeout=float("inf")
+        )
+        collector_task = asyncio.create_task(collector.run())
+        try:
+            results = await asyncio.gather(*(
+                analyze_one(i, ticker, streamer) for i, ticker in enumerate(tickers, 1)
+            ))
+        finally:
+            all_done.set()
+            await collector_task
+    
+    return list(results)
+
+async def rank_all_tickers_for_credit_spreads(mode, concurrent=True, max_concurrent=8, quotes_data=None,
+                                             streamer=None, save=True, prefetched_results=None):
     """Rank all tickers in mode by credit spread liquidity"""
     print(f"📊 Ranking {mode.upper()} Tickers for Credit Spread Liquidity")
     print("=" * 70)
     
-    # Load spot quotes from previous step
-    try:
-        with open(f"spot_quotes_{mode}.json", "r") as f:
-            quotes_data = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ spot_quotes_{mode}.json not found. Run spot.py first.")
-        return None
+    # Load spot quotes from previous step (unless passed in memory)
+    if quotes_data is None:
+        try:
+            with open(f"spot_quotes_{mode}.json", "r") as f:
+                quotes_data = json.load(f)
+        except FileNotFoundError:
+            print(f"❌ spot_quotes_{mode}.json not found. Run spot.py first.")
+            return None
     
     quotes = quotes_data["quotes"]
     tickers = list(quotes.keys())
     
     print(f"📋 Analyzing {len(tickers)} tickers for credit spread opportunities...")
     
-    sess = Session(USERNAME, PASSWORD)
-    results = []
+    sess = get_session()
     
-    with PerfTimer(f"{mode.upper()} credit spread liquidity ranking"):
-        for i, ticker in enumerate(tickers, 1):
-            print(f"\n[{i}/{len(tickers)}] {ticker}")
-            spot_price = quotes[ticker]["mid"]
-            
-            result = await analyze_ticker_for_credit_spreads(ticker, spot_price, sess)
-            results.append(result)
-            
-            # Brief pause to avoid overwhelming the API
-            await asyncio.sleep(0.2)
+    # Reuse per-ticker analyses already done for another mode
+    reused = {}
+    if prefetched_results:
+        prefetched = {r["ticker"]: r for r in prefetched_results}
+        reused = {
+            ticker: {k: v for k, v in prefetched[ticker].items() if k != "sector"}
+            for ticker in tickers if ticker in prefetched
+        }
+        print(f"♻️ Reusing shared analysis for {len(reused)} tickers")
+    to_analyze = [ticker for ticker in tickers if ticker not in reused]
+    analyzed = []
+    
+    with PerfTimer(f"{mode.upper()} credit spread liquidity ranking", "mode", mode=mode):
+        if concurrent and to_analyze:
+            print(f"⚡ Concurrent mode: up to {max_concurrent} tickers on one streamer")
+            analyzed = await analyze_tickers_concurrently(to_analyze, quotes, sess, max_concurrent=max_concurrent,
+                                                         streamer=streamer)
+        else:
+            for i, ticker in enumerate(to_analyze, 1):
+                print(f"\n[{i}/{len(to_analyze)}] {ticker}")
+                spot_price = quotes[ticker]["mid"]
+                
+                with span("rank ticker", "ticker", ticker=ticker, index=i) as ticker_span:
+                    result = await analyze_ticker_for_credit_spreads(ticker, spot_price, sess, streamer=streamer,
+                                                                     ticker_span=ticker_span)
+                    ticker_span.set(status=result["status"], liquidity_score=result.get("liquidity_score"))
+                analyzed.append(result)
+                
+                # Brief pause to avoid overwhelming the API
+                await asyncio.sleep(0.2)
+    
+    analyzed_by_ticker = dict(zip(to_analyze, analyzed))
+    results = [reused.get(ticker) or analyzed_by_ticker[ticker] for ticker in tickers]
     
     # Separate successful vs failed analyses
     successful = [r for r in results if r["status"] == "analyzed"]
@@ -339,8 +497,9 @@ async def rank_all_tickers_for_credit_spreads(mode):
     
     # Save results
     filename = f"ticker_rankings_{mode}.json"
-    with open(filename, "w") as f:
-        json.dump(output, f, indent=2)
+    if save:
+        with open(filename, "w") as f:
+            json.dump(output, f, indent=2)
     
     print(f"\n📊 {mode.upper()} Credit Spread Liquidity Analysis Complete:")
     print(f"  ✅ Analyzed: {len(successful)}/{len(results)} ({output['analysis_stats']['success_rate']:.1f}%)")
@@ -349,7 +508,8 @@ async def rank_all_tickers_for_credit_spreads(mode):
     print(f"  ✅ Good (60-79): {output['analysis_stats']['good_tickers']}")
     print(f"  ⚠️ Fair (40-59): {output['analysis_stats']['fair_tickers']}")
     print(f"  ❌ Poor (<40): {output['analysis_stats']['poor_tickers']}")
-    print(f"  📁 Saved: {filename}")
+    if save:
+        print(f"  📁 Saved: {filename}")
     
     # Show top performers
     if successful:
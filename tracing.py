@@ -0,0 +1,205 @@
+# tracing.py - Hierarchical Span Tracer
+"""
+Nested timing spans with attributes, exported as Chrome trace event JSON
+(open it in https://ui.perfetto.dev or chrome://tracing).
+
+    with span("greeks batch", "batch", batch=3, symbols_subscribed=800) as batch_span:
+        ...
+        batch_span.set(events_received=n, quote_coverage=92.5)
+
+The open span lives in a ContextVar, so spans started inside asyncio tasks
+(and asyncio.to_thread calls) nest under the span that created the task,
+and concurrent tasks never see each other's spans. Plain worker threads
+start new root spans.
+
+Spans always measure their elapsed time but are only recorded after
+enable() (master.py --trace FILE), so instrumented code costs little when
+tracing is off. Overlapping siblings, such as tickers ranked concurrently,
+are laid out on separate lanes (trace "threads") so every lane nests
+properly in the viewer; span_id/parent_id args keep the real hierarchy.
+"""
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_tracer = None
+_span_ids = itertools.count(1)
+
+class Tracer:
+    """Finished spans of one trace, plus the lane each span was drawn on"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.started = time.time()
+        self.spans = []
+        self._lane_tops = []  # lane -> innermost open span, None when free
+        self._lock = threading.Lock()
+
+    @property
+    def lanes(self):
+        return len(self._lane_tops)
+
+    def _open(self, span):
+        with self._lock:
+            parent = span.parent
+            if parent is not None and parent.lane is not None and self._lane_tops[parent.lane] is parent:
+                span.lane = parent.lane
+            else:
+                free = [lane for lane, top in enumerate(self._lane_tops) if top is None]
+                span.lane = free[0] if free else len(self._lane_tops)
+                if not free:
+                    self._lane_tops.append(None)
+            self._lane_tops[span.lane] = span
+
+    def _close(self, span):
+        with self._lock:
+            if self._lane_tops[span.lane] is span:
+                parent = span.parent
+                still_open = parent is not None and parent.lane == span.lane and parent.end is None
+                self._lane_tops[span.lane] = parent if still_open else None
+            self.spans.append(span)
+
+class Span:
+    """Context manager timing a block; attributes become the trace event's args"""
+
+    __slots__ = ("name", "category", "attributes", "echo", "id", "parent", "lane", "start", "end",
+                 "_token", "_tracer")
+
+    def __init__(self, name, category="", echo=False, **attributes):
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.echo = echo
+        self.id = None
+        self.parent = None
+        self.lane = None
+        self.start = None
+        self.end = None
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        self._tracer = _tracer
+        self._token = _current_span.set(self)
+        if self._tracer is not None:
+            self.id = next(_span_ids)
+            self._tracer._open(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Closed from another context (e.g. a generator finalized elsewhere)
+            _current_span.set(self.parent)
+        if exc_type is not None:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"[:200]
+        if self._tracer is not None:
+            self._tracer._close(self)
+        if self.echo:
+            print(f"⏱️ {self.name}: {self.elapsed:.2f}s")
+        return False
+
+    @property
+    def elapsed(self):
+        if self.start is None:
+            return 0.0
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def increment(self, key, amount=1):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+        return self
+
+def span(name, category="", **attributes):
+    """A Span to use as `with span(...) as s:`"""
+    return Span(name, category, **attributes)
+
+def current_span():
+    return _current_span.get()
+
+def enable():
+    """Start recording spans into a fresh Tracer"""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+def disable():
+    """Stop recording; returns the tracer that was active"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+def active_tracer():
+    return _tracer
+
+def _jsonable(value):
+    try:
+        return value.item()  # numpy scalars
+    except AttributeError:
+        return str(value)
+
+def chrome_trace(tracer, metadata=None):
+    """Chrome trace event payload: one complete ("X") event per finished span"""
+    pid = os.getpid()
+    events = [{"ph": "M", "name": "process_name", "pid": pid, "tid": 0, "args": {"name": "credit spread pipeline"}}]
+    events.extend({"ph": "M", "name": "thread_name", "pid": pid, "tid": lane, "args": {"name": f"lane {lane}"}}
+                  for lane in range(tracer.lanes))
+
+    for s in sorted(tracer.spans, key=lambda s: (s.start, s.start - s.end)):
+        args = dict(s.attributes, span_id=s.id)
+        if s.parent is not None and s.parent.id is not None:
+            args["parent_id"] = s.parent.id
+        events.append({
+            "name": s.name,
+            "cat": s.category or "span",
+            "ph": "X",
+            "ts": round((s.start - tracer.origin) * 1e6, 3),
+            "dur": round((s.end - s.start) * 1e6, 3),
+            "pid": pid,
+            "tid": s.lane,
+            "args": args,
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms",
+            "otherData": {"started": tracer.started, **(metadata or {})}}
+
+def export_chrome_trace(path, tracer=None, metadata=None):
+    """Write the active (or given) tracer's spans; returns the number of spans written"""
+    tracer = tracer or _tracer
+    if tracer is None:
+        raise RuntimeError("Tracing is not enabled")
+    with open(path, "w") as f:
+        json.dump(chrome_trace(tracer, metadata), f, default=_jsonable)
+    return len(tracer.spans)
+
+def summarize_trace(path):
+    """{(category, name): [count, total_ms, max_ms]} from an exported trace"""
+    with open(path, "r") as f:
+        events = json.load(f)["traceEvents"]
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for event in events:
+        if event.get("ph") == "X":
+            entry = totals[(event["cat"], event["name"])]
+            entry[0] += 1
+            entry[1] += event["dur"] / 1000
+            entry[2] = max(entry[2], event["dur"] / 1000)
+    return dict(totals)
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        summary = summarize_trace(path)
+        print(f"🔎 {path}: {sum(count for count, _, _ in summary.values()):,} spans")
+        print(f"   {'CATEGORY':<10} {'SPAN':<44} {'COUNT':>7} {'TOTAL ms':>12} {'MEAN ms':>10} {'MAX ms':>10}")
+        for (category, name), (count, total, longest) in sorted(summary.items(), key=lambda item: -item[1][1]):
+            print(f"   {category:<10} {name[:44]:<44} {count:>7,} {total:>12,.1f} {total / count:>10,.2f} "
+                  f"{longest:>10,.1f}")